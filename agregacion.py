@@ -0,0 +1,81 @@
+import time
+import datetime
+import threading
+
+
+class _Cubeta:
+    """Cubeta de tokens de una cámara."""
+    __slots__ = ("tokens", "momento")
+
+    def __init__(self, tokens, momento):
+        self.tokens = tokens
+        self.momento = momento
+
+
+class AgregadorAlertas:
+    def __init__(self, ventana=30, rafaga=5, alertas_por_minuto=6):
+        """Agrupa eventos repetidos y limita cuántas alertas nuevas genera cada cámara.
+
+        Un evento de la misma cámara y el mismo tipo que una alerta todavía sin revisar,
+        ocurrido a menos de ventana segundos del evento anterior, no crea una alerta:
+        suma uno a la cuenta de esa alerta y extiende su intervalo. Las alertas nuevas
+        gastan un token de la cubeta de su cámara, que admite rafaga alertas seguidas y
+        se recarga a alertas_por_minuto; sin tokens, el evento se descarta y se cuenta
+        en suprimidas. Así una tormenta de eventos no llena la interfaz ni el diario.
+        """
+        self.ventana = ventana
+        self.rafaga = rafaga
+        self.alertas_por_minuto = alertas_por_minuto
+
+        self.suprimidas = {}  # id_camara -> eventos descartados por el límite
+        self._abiertas = {}  # (id_camara, tipo_anomalia) -> (alerta, momento del último evento)
+        self._cubetas = {}  # id_camara -> _Cubeta
+        self._lock = threading.Lock()
+
+    def registrar(self, id_camara, tipo_anomalia, nivel_confianza, crear, ahora=None):
+        """Agrupa un evento o crea su alerta con crear().
+
+        Devuelve (alerta, nueva); alerta es None si el evento se suprimió.
+        """
+        if ahora is None:
+            ahora = time.monotonic()
+        clave = (id_camara, tipo_anomalia)
+
+        with self._lock:
+            abierta = self._abiertas.get(clave)
+            if abierta is not None:
+                alerta, ultimo = abierta
+                if alerta.estado == "Nueva" and ahora - ultimo <= self.ventana:
+                    alerta.fusionar(nivel_confianza, datetime.datetime.now())
+                    self._abiertas[clave] = (alerta, ahora)
+                    return alerta, False
+
+            if not self._tomar_token(id_camara, ahora):
+                self.suprimidas[id_camara] = self.suprimidas.get(id_camara, 0) + 1
+                return None, False
+
+            alerta = crear()
+            self._abiertas[clave] = (alerta, ahora)
+            return alerta, True
+
+    def quitar_camara(self, id_camara):
+        """Olvida las alertas abiertas y la cubeta de una cámara."""
+        with self._lock:
+            self._cubetas.pop(id_camara, None)
+            for clave in [c for c in self._abiertas if c[0] == id_camara]:
+                del self._abiertas[clave]
+
+    def _tomar_token(self, id_camara, ahora):
+        """Recarga la cubeta de la cámara y gasta un token si hay (con el candado tomado)."""
+        cubeta = self._cubetas.get(id_camara)
+        if cubeta is None:
+            cubeta = self._cubetas[id_camara] = _Cubeta(self.rafaga, ahora)
+        else:
+            recarga = (ahora - cubeta.momento) * self.alertas_por_minuto / 60.0
+            cubeta.tokens = min(self.rafaga, cubeta.tokens + recarga)
+            cubeta.momento = ahora
+
+        if cubeta.tokens < 1:
+            return False
+        cubeta.tokens -= 1
+        return True
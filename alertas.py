@@ -0,0 +1,173 @@
+import sys
+import bisect
+import datetime
+import threading
+from array import array
+
+
+class Alerta:
+    """Registro compacto de una alerta."""
+    __slots__ = ("id_alerta", "id_camara", "tipo_anomalia", "nivel_confianza", "timestamp", "estado", "clip",
+                 "cantidad", "ultimo")
+
+    def __init__(self, id_alerta, id_camara, tipo_anomalia, nivel_confianza, timestamp, estado="Nueva",
+                 clip=None, cantidad=1, ultimo=None):
+        self.id_alerta = id_alerta
+        self.id_camara = id_camara
+        self.tipo_anomalia = tipo_anomalia
+        self.nivel_confianza = nivel_confianza
+        self.timestamp = timestamp
+        self.estado = estado
+        self.clip = clip  # Ruta del video grabado alrededor de la alerta
+        self.cantidad = cantidad  # Eventos agrupados en esta alerta
+        self.ultimo = ultimo or timestamp  # Momento del último evento agrupado
+
+    def fusionar(self, nivel_confianza, timestamp):
+        """Suma un evento repetido a la alerta."""
+        self.cantidad += 1
+        self.ultimo = timestamp
+        self.nivel_confianza = max(self.nivel_confianza, nivel_confianza)
+
+
+class AlmacenAlertas:
+    def __init__(self):
+        """Almacén de alertas seguro entre hilos con índices secundarios.
+
+        Los IDs salen de un contador protegido por el mismo candado que los índices,
+        así dos cámaras nunca reciben el mismo ID. La búsqueda por ID es O(1) y hay
+        índices por cámara, tipo y estado, que usa seleccionar() para los filtros y
+        el orden del historial; los de cámara y tipo son arreglos compactos de IDs en
+        orden de creación. Las consultas por fecha van al diario (DiarioAlertas).
+        """
+        self._lock = threading.Lock()
+        self._siguiente_id = 1
+
+        self._por_id = {}
+        self._ids = array("q")  # Todos los IDs en orden de creación
+        self._por_camara = {}  # id_camara -> array de IDs
+        self._por_tipo = {}  # tipo_anomalia -> array de IDs
+        self._por_estado = {}  # estado -> set de IDs
+
+    def crear(self, id_camara, tipo_anomalia, nivel_confianza, timestamp=None, estado="Nueva"):
+        """Crea una alerta con un ID nuevo y la registra en todos los índices."""
+        if timestamp is None:
+            timestamp = datetime.datetime.now()
+        # Los textos repetidos se comparten entre todas las alertas
+        id_camara = sys.intern(id_camara)
+        tipo_anomalia = sys.intern(tipo_anomalia)
+
+        with self._lock:
+            alerta = Alerta(self._siguiente_id, id_camara, tipo_anomalia, nivel_confianza, timestamp, estado)
+            self._siguiente_id += 1
+            self._indexar(alerta)
+        return alerta
+
+    def agregar(self, alerta):
+        """Registra una alerta que ya tiene ID (por ejemplo, cargada desde disco).
+
+        Una alerta más vieja que las que ya están se inserta en su lugar, así los
+        índices siguen en orden de ID.
+        """
+        with self._lock:
+            if alerta.id_alerta in self._por_id:
+                return False
+            self._siguiente_id = max(self._siguiente_id, alerta.id_alerta + 1)
+            self._indexar(alerta)
+        return True
+
+    def primer_id(self):
+        """Devuelve el menor ID en memoria (None si el almacén está vacío)."""
+        with self._lock:
+            return self._ids[0] if self._ids else None
+
+    def obtener(self, id_alerta):
+        """Devuelve la alerta con ese ID o None."""
+        return self._por_id.get(id_alerta)
+
+    def cambiar_estado(self, id_alerta, estado):
+        """Cambia el estado de una alerta y actualiza el índice por estado."""
+        with self._lock:
+            alerta = self._por_id.get(id_alerta)
+            if alerta is None:
+                return False
+            self._por_estado[alerta.estado].discard(id_alerta)
+            alerta.estado = estado
+            self._por_estado.setdefault(estado, set()).add(id_alerta)
+        return True
+
+    def marcar_revisada(self, id_alerta):
+        """Marca una alerta como revisada."""
+        return self.cambiar_estado(id_alerta, "Revisada")
+
+    def seleccionar(self, id_camara=None, tipo_anomalia=None, estado=None, orden="id"):
+        """Devuelve los IDs que cumplen los filtros, ordenados de forma ascendente.
+
+        orden puede ser "id" (equivale al orden por fecha), "camara", "tipo" o
+        "estado". Ordenar por una columna es concatenar los grupos de su índice, así
+        que nunca hace falta comparar alertas una por una.
+        """
+        with self._lock:
+            candidatos = None
+            for indice, clave in ((self._por_camara, id_camara), (self._por_tipo, tipo_anomalia),
+                                  (self._por_estado, estado)):
+                if clave is None:
+                    continue
+                ids = indice.get(clave, ())
+                candidatos = set(ids) if candidatos is None else candidatos.intersection(ids)
+
+            if orden == "id" and candidatos is not None:
+                # Los IDs crecen con el tiempo: basta con ordenar los candidatos
+                return array("q", sorted(candidatos))
+
+            if orden == "camara":
+                grupos = [self._por_camara[c] for c in sorted(self._por_camara)]
+            elif orden == "tipo":
+                grupos = [self._por_tipo[t] for t in sorted(self._por_tipo)]
+            elif orden == "estado":
+                grupos = [sorted(self._por_estado[e]) for e in sorted(self._por_estado)]
+            else:
+                grupos = [self._ids]
+
+            seleccion = array("q")
+            for grupo in grupos:
+                if candidatos is None:
+                    seleccion.extend(grupo)
+                else:
+                    seleccion.extend(i for i in grupo if i in candidatos)
+        return seleccion
+
+    def camaras(self):
+        """Devuelve las cámaras que tienen alertas."""
+        with self._lock:
+            return sorted(self._por_camara)
+
+    def tipos(self):
+        """Devuelve los tipos de anomalía registrados."""
+        with self._lock:
+            return sorted(self._por_tipo)
+
+    def estados(self):
+        """Devuelve los estados que tienen al menos una alerta."""
+        with self._lock:
+            return sorted(e for e, ids in self._por_estado.items() if ids)
+
+    def __len__(self):
+        return len(self._por_id)
+
+    def __iter__(self):
+        with self._lock:
+            alertas = list(self._por_id.values())
+        return iter(alertas)
+
+    def _indexar(self, alerta):
+        """Agrega la alerta a todos los índices (se llama con el candado tomado)."""
+        id_alerta = alerta.id_alerta
+        self._por_id[id_alerta] = alerta
+        for ids in (self._ids, self._por_camara.setdefault(alerta.id_camara, array("q")),
+                    self._por_tipo.setdefault(alerta.tipo_anomalia, array("q"))):
+            if ids and id_alerta < ids[-1]:
+                # Alerta vieja traída del diario
+                ids.insert(bisect.bisect_left(ids, id_alerta), id_alerta)
+            else:
+                ids.append(id_alerta)
+        self._por_estado.setdefault(alerta.estado, set()).add(id_alerta)
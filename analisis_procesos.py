@@ -0,0 +1,307 @@
+import os
+import time
+import queue
+import threading
+import traceback
+import multiprocessing as mp
+from collections import deque
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+from deteccion import DetectorMovimiento
+
+
+def _proceso_analisis(tareas, resultados):
+    """Bucle de un proceso de análisis: lee frames de memoria compartida y los analiza.
+
+    Un error en una tarea no termina el proceso: se imprime y el frame se devuelve
+    igual con confianza 0, así su ranura se libera en el proceso principal.
+    """
+    detectores = {}  # id_camara -> DetectorMovimiento
+    memorias = {}  # id_camara -> (SharedMemory, arreglo del anillo)
+
+    while True:
+        tarea = tareas.get()
+        if tarea is None:
+            break
+        try:
+            _atender_tarea(tarea, detectores, memorias, resultados)
+        except Exception:
+            traceback.print_exc()
+            if tarea[0] == "frame":
+                _, id_camara, nombre, _, ranura, enviado = tarea
+                resultados.put(("frame", id_camara, nombre, ranura, 0, enviado))
+
+    for shm, _ in memorias.values():
+        shm.close()
+
+
+def _atender_tarea(tarea, detectores, memorias, resultados):
+    """Atiende una tarea del proceso de análisis."""
+    tipo, id_camara = tarea[0], tarea[1]
+    if tipo == "camara":
+        detectores[id_camara] = DetectorMovimiento(rois=tarea[2])
+        return
+    if tipo == "quitar":
+        # El aviso de vuelta confirma que ya no queda ningún frame de la cámara en
+        # la cola, así el proceso principal puede borrar sus anillos
+        try:
+            detectores.pop(id_camara, None)
+            memoria = memorias.pop(id_camara, None)
+            if memoria is not None:
+                memoria[0].close()
+        finally:
+            resultados.put(("quitada", id_camara, tarea[2]))
+        return
+
+    _, id_camara, nombre, forma, ranura, enviado = tarea
+    memoria = memorias.get(id_camara)
+    if memoria is None or memoria[0].name != nombre:
+        # Primer frame de la cámara o el anillo cambió de tamaño
+        if memoria is not None:
+            memorias.pop(id_camara)
+            memoria[0].close()
+        shm = shared_memory.SharedMemory(name=nombre)
+        memoria = (shm, np.ndarray(forma, dtype=np.uint8, buffer=shm.buf))
+        memorias[id_camara] = memoria
+
+    detector = detectores.get(id_camara)
+    confianza = detector.analizar(memoria[1][ranura]) if detector is not None else 0
+    resultados.put(("frame", id_camara, nombre, ranura, confianza, enviado))
+
+
+class _AnilloCamara:
+    def __init__(self, id_camara, forma_frame, ranuras, indice):
+        """Anillo de frames en memoria compartida para una cámara."""
+        forma = (ranuras,) + tuple(forma_frame)
+        self.id_camara = id_camara
+        self.indice = indice  # Proceso que lee el anillo
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(forma)))
+        self.nombre = self.shm.name
+        self.forma = forma
+        self.frames = np.ndarray(forma, dtype=np.uint8, buffer=self.shm.buf)
+        self.ranuras = ranuras
+        self.libres = deque(range(ranuras))
+
+    def completo(self):
+        """Indica si ningún frame del anillo está en análisis."""
+        return len(self.libres) == self.ranuras
+
+    def vaciar(self):
+        """Da por libres todas las ranuras (sus frames se perdieron con el proceso)."""
+        self.libres = deque(range(self.ranuras))
+
+    def liberar(self):
+        """Libera la memoria compartida del anillo."""
+        del self.frames
+        self.shm.close()
+        self.shm.unlink()
+
+
+class BackendProcesos:
+    def __init__(self, al_resultado, num_procesos=None, ranuras=3, telemetria=None, intervalo_vigilancia=1.0):
+        """Backend de análisis en procesos separados con transferencia por memoria compartida.
+
+        Cada cámara tiene un anillo de ranuras en multiprocessing.shared_memory. enviar()
+        copia el frame a una ranura libre y manda al proceso de la cámara solo el nombre
+        de la memoria y el número de ranura, así el frame nunca se serializa. Cada cámara
+        se asigna siempre al mismo proceso para que su detector conserve el fondo
+        aprendido; con más cámaras que núcleos el trabajo se reparte por turnos. Los
+        procesos devuelven registros pequeños que un hilo entrega a al_resultado. Con
+        telemetria, la latencia de ida y vuelta se registra en la etapa "deteccion".
+
+        Un anillo reemplazado o de una cámara quitada no se borra mientras algún frame
+        encolado lo use: se retira y se borra cuando vuelven todas sus ranuras o cuando
+        el proceso confirma que quitó la cámara. El mismo hilo de resultados revisa cada
+        intervalo_vigilancia segundos que los procesos sigan vivos y reinicia los que
+        murieron, con sus cámaras y sus ranuras liberadas.
+        """
+        self.al_resultado = al_resultado  # al_resultado(id_camara, confianza)
+        self.num_procesos = num_procesos or os.cpu_count() or 1
+        self.ranuras = ranuras
+        self.telemetria = telemetria
+        self.intervalo_vigilancia = intervalo_vigilancia
+
+        self._anillos = {}  # id_camara -> _AnilloCamara
+        self._retirados = {}  # nombre de la memoria -> _AnilloCamara que espera para borrarse
+        self._asignacion = {}  # id_camara -> índice de proceso
+        self._rois = {}  # id_camara -> rois, para volver a registrarla si su proceso se reinicia
+        self._lock = threading.Lock()
+        self._cerrando = False
+        self.frames_descartados = 0
+        self.reinicios = 0  # Procesos de análisis reiniciados porque murieron
+        self.latencias = {}  # id_camara -> última latencia de análisis (s)
+
+        # Los procesos deben heredar el rastreador de recursos del padre; si arrancan
+        # uno propio, al terminar borran la memoria compartida que solo abrieron
+        if os.name == "posix":
+            resource_tracker.ensure_running()
+
+        self._resultados = mp.Queue()
+        self._tareas = []
+        self._procesos = []
+        for i in range(self.num_procesos):
+            cola, proceso = self._crear_proceso(i)
+            self._tareas.append(cola)
+            self._procesos.append(proceso)
+
+        self._hilo_resultados = threading.Thread(target=self._bucle_resultados, name="resultados-analisis", daemon=True)
+        self._hilo_resultados.start()
+
+    def registrar_camara(self, id_camara, rois=None):
+        """Asigna una cámara a un proceso de análisis."""
+        with self._lock:
+            if id_camara not in self._asignacion:
+                self._asignacion[id_camara] = len(self._asignacion) % self.num_procesos
+            self._rois[id_camara] = rois
+            self._tareas[self._asignacion[id_camara]].put(("camara", id_camara, rois))
+
+    def quitar_camara(self, id_camara):
+        """Deja de analizar una cámara; su anillo se borra cuando el proceso lo confirma."""
+        with self._lock:
+            indice = self._asignacion.pop(id_camara, None)
+            self._rois.pop(id_camara, None)
+            anillo = self._anillos.pop(id_camara, None)
+            if anillo is not None:
+                self._retirados[anillo.nombre] = anillo
+            if indice is None:
+                return
+            nombres = [nombre for nombre, retirado in self._retirados.items() if retirado.id_camara == id_camara]
+            self._tareas[indice].put(("quitar", id_camara, nombres))
+
+    def enviar(self, id_camara, frame):
+        """Copia un frame al anillo de la cámara y lo encola para análisis.
+
+        Si el proceso de la cámara todavía tiene ocupadas todas las ranuras, el frame
+        se descarta en lugar de acumular retraso. Devuelve True si se envió.
+        """
+        with self._lock:
+            indice = self._asignacion.get(id_camara)
+            if indice is None:
+                return False
+
+            anillo = self._anillos.get(id_camara)
+            if anillo is None or anillo.forma[1:] != frame.shape:
+                if anillo is not None:
+                    self._retirar(anillo)
+                anillo = _AnilloCamara(id_camara, frame.shape, self.ranuras, indice)
+                self._anillos[id_camara] = anillo
+
+            if not anillo.libres:
+                self.frames_descartados += 1
+                return False
+            ranura = anillo.libres.popleft()
+            # La copia se hace con el candado para que el anillo no se libere a la mitad;
+            # encolar no bloquea y así la tarea no puede ir a un proceso ya reemplazado
+            np.copyto(anillo.frames[ranura], frame)
+            self._tareas[indice].put(("frame", id_camara, anillo.nombre, anillo.forma, ranura, time.monotonic()))
+        return True
+
+    def cerrar(self, timeout=2):
+        """Detiene los procesos de análisis y libera la memoria compartida."""
+        with self._lock:
+            self._cerrando = True
+            procesos = list(self._procesos)
+            for cola in self._tareas:
+                cola.put(None)
+        for proceso in procesos:
+            proceso.join(timeout)
+            if proceso.is_alive():
+                proceso.terminate()
+        self._resultados.put(None)
+        self._hilo_resultados.join(timeout)
+
+        with self._lock:
+            anillos = list(self._anillos.values()) + list(self._retirados.values())
+            self._anillos, self._retirados = {}, {}
+        for anillo in anillos:
+            anillo.liberar()
+
+    def _crear_proceso(self, indice):
+        """Crea y arranca un proceso de análisis con su cola de tareas."""
+        cola = mp.Queue()
+        proceso = mp.Process(target=_proceso_analisis, args=(cola, self._resultados), name=f"analisis-{indice}",
+                             daemon=True)
+        proceso.start()
+        return cola, proceso
+
+    def _retirar(self, anillo):
+        """Retira un anillo reemplazado; se borra en cuanto no quede ningún frame suyo en análisis."""
+        if anillo.completo():
+            anillo.liberar()
+        else:
+            self._retirados[anillo.nombre] = anillo
+
+    def _vigilar_procesos(self):
+        """Reinicia los procesos de análisis que murieron."""
+        for indice, proceso in enumerate(list(self._procesos)):
+            if self._cerrando or proceso.is_alive():
+                continue
+            print(f"El proceso {proceso.name} terminó inesperadamente (código {proceso.exitcode}); se reinicia",
+                  flush=True)
+            self._reiniciar_proceso(indice)
+
+    def _reiniciar_proceso(self, indice):
+        """Reemplaza un proceso muerto, libera las ranuras que tenía y le vuelve a registrar sus cámaras."""
+        cola, proceso = self._crear_proceso(indice)
+        with self._lock:
+            if self._cerrando:
+                cola.put(None)
+                return
+            self._tareas[indice] = cola
+            self._procesos[indice] = proceso
+            self.reinicios += 1
+
+            # Los frames que tenía el proceso no van a volver
+            for id_camara, anillo in self._anillos.items():
+                if self._asignacion.get(id_camara) == indice:
+                    anillo.vaciar()
+            for nombre, anillo in list(self._retirados.items()):
+                if anillo.indice == indice:
+                    del self._retirados[nombre]
+                    anillo.liberar()
+            for id_camara, asignado in self._asignacion.items():
+                if asignado == indice:
+                    cola.put(("camara", id_camara, self._rois.get(id_camara)))
+
+    def _bucle_resultados(self):
+        """Recibe los resultados de los procesos, libera las ranuras usadas y vigila los procesos."""
+        proxima_vigilancia = time.monotonic() + self.intervalo_vigilancia
+        while True:
+            try:
+                resultado = self._resultados.get(timeout=self.intervalo_vigilancia)
+            except queue.Empty:
+                resultado = ()
+            if resultado is None:
+                return
+            if time.monotonic() >= proxima_vigilancia:
+                proxima_vigilancia = time.monotonic() + self.intervalo_vigilancia
+                self._vigilar_procesos()
+            if not resultado:
+                continue
+
+            if resultado[0] == "quitada":
+                _, id_camara, nombres = resultado
+                with self._lock:
+                    anillos = [self._retirados.pop(nombre) for nombre in nombres if nombre in self._retirados]
+                for anillo in anillos:
+                    anillo.liberar()
+                continue
+
+            _, id_camara, nombre, ranura, confianza, enviado = resultado
+            with self._lock:
+                anillo = self._anillos.get(id_camara)
+                if anillo is None or anillo.nombre != nombre:
+                    anillo = self._retirados.get(nombre)
+                if anillo is not None and ranura not in anillo.libres:
+                    anillo.libres.append(ranura)
+                    if anillo.completo() and self._retirados.get(nombre) is anillo:
+                        del self._retirados[nombre]
+                        anillo.liberar()
+            self.latencias[id_camara] = time.monotonic() - enviado
+            if self.telemetria is not None:
+                self.telemetria.observar("deteccion", id_camara, self.latencias[id_camara])
+
+            try:
+                self.al_resultado(id_camara, confianza)
+            except Exception:
+                traceback.print_exc()
@@ -0,0 +1,479 @@
+"""Benchmarks del sistema de seguridad.
+
+Uso:
+    python benchmark.py conversion [--repeticiones N]
+    python benchmark.py deteccion [--frames N] [--video RUTA]
+    python benchmark.py procesos [--camaras N] [--segundos S]
+    python benchmark.py sistema [--camaras 4,16,64] [--resoluciones 320x240,720p] [--segundos S]
+                                [--fps F] [--procesos N] [--archivo RUTA]
+    python benchmark.py comparar [--archivo RUTA] [--base COMMIT] [--nuevo COMMIT]
+    python benchmark.py arranque [--repeticiones N] [--archivo RUTA]
+
+La memoria reportada en conversion es la que registra tracemalloc (arreglos de NumPy
+y OpenCV); los buffers internos de Pillow no aparecen en esa cuenta. En sistema, cada
+caso corre en un proceso nuevo y se reporta su RSS máximo.
+"""
+import os
+import sys
+import json
+import argparse
+import datetime
+import platform
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+import multiprocessing as mp
+import cv2
+import numpy as np
+from PIL import Image
+from conversion import ConversorDisplay
+from deteccion import DetectorMovimiento
+from simulacion import FuenteSimulada
+from analisis_procesos import BackendProcesos
+
+try:
+    import resource
+except ImportError:  # Windows: no hay getrusage
+    resource = None
+
+ARCHIVO_RESULTADOS = os.path.join("benchmarks", "resultados.jsonl")
+ARCHIVO_ARRANQUE = os.path.join("benchmarks", "arranque.jsonl")
+
+# Tiempo extra sobre --segundos para el arranque, la ráfaga de alertas y el cierre
+# de un caso de sistema; pasado ese tiempo el caso se da por fallido
+MARGEN_CASO = 120
+
+RESOLUCIONES = {
+    "320x240": (320, 240),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+
+
+def conversion_original(frame):
+    """Ruta de conversión anterior: RGB a resolución completa y reducción con PIL."""
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    img = Image.fromarray(frame_rgb)
+    return img.resize((200, 150))
+
+
+def medir(funcion, frame, repeticiones):
+    """Devuelve los µs por frame y los bytes asignados por frame de una función."""
+    funcion(frame)  # Calentamiento (reserva de buffers reutilizables)
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion(frame)
+    us_por_frame = (time.perf_counter() - inicio) / repeticiones * 1e6
+
+    muestras = min(repeticiones, 50)
+    tracemalloc.start()
+    asignado = 0
+    for _ in range(muestras):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        funcion(frame)
+        _, pico = tracemalloc.get_traced_memory()
+        asignado += pico - base
+    tracemalloc.stop()
+
+    return us_por_frame, asignado / muestras
+
+
+def benchmark_conversion(repeticiones):
+    """Compara la conversión para pantalla anterior con ConversorDisplay."""
+    conversor = ConversorDisplay(200, 150)
+    print(f"{'Resolución':<10} {'Ruta':<12} {'µs/frame':>10} {'KiB asignados/frame':>20}")
+
+    for nombre, (ancho, alto) in RESOLUCIONES.items():
+        frame = np.random.randint(0, 256, (alto, ancho, 3), dtype=np.uint8)
+        rutas = {
+            "original": conversion_original,
+            "conversor": lambda f: Image.fromarray(conversor.convertir("bench", f)),
+        }
+        for ruta, funcion in rutas.items():
+            us, asignado = medir(funcion, frame, repeticiones)
+            print(f"{nombre:<10} {ruta:<12} {us:>10.1f} {asignado / 1024:>20.1f}")
+        conversor.olvidar("bench")
+
+
+def clip_simulado(ancho, alto, frames):
+    """Genera en memoria un clip simulado con eventos de movimiento."""
+    fuente = FuenteSimulada("Bench", "Clip", ancho, alto, prob_intruso=0.02, buffers=1)
+    return [fuente.leer().copy() for _ in range(frames)]
+
+
+def clip_grabado(ruta, frames):
+    """Carga en memoria los primeros frames de un video grabado."""
+    cap = cv2.VideoCapture(ruta)
+    clip = []
+    while len(clip) < frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        clip.append(frame)
+    cap.release()
+    return clip
+
+
+def benchmark_deteccion(frames, ruta_video=None):
+    """Mide el rendimiento del detector de movimiento en frames/s por núcleo."""
+    # Un solo hilo: el tiempo de CPU del proceso equivale al de un núcleo
+    cv2.setNumThreads(1)
+    if ruta_video:
+        clips = {ruta_video: clip_grabado(ruta_video, frames)}
+    else:
+        clips = {nombre: clip_simulado(ancho, alto, frames) for nombre, (ancho, alto) in RESOLUCIONES.items()}
+
+    print(f"{'Clip':<20} {'Frames':>7} {'frames/s/núcleo':>16} {'µs/frame':>10} {'Con movimiento':>15}")
+    for nombre, clip in clips.items():
+        if not clip:
+            print(f"{nombre:<20} sin frames")
+            continue
+        detector = DetectorMovimiento()
+        detector.analizar(clip[0])  # Calentamiento e inicialización del fondo
+
+        con_movimiento = 0
+        inicio = time.process_time()
+        for frame in clip:
+            if detector.analizar(frame) >= 80:
+                con_movimiento += 1
+        cpu = time.process_time() - inicio
+
+        fps = len(clip) / cpu if cpu > 0 else float("inf")
+        print(f"{nombre:<20} {len(clip):>7} {fps:>16.0f} {cpu / len(clip) * 1e6:>10.1f} {con_movimiento:>15}")
+
+
+def benchmark_procesos(camaras, segundos):
+    """Mide cómo escala el backend de procesos con el número de núcleos."""
+    clip = clip_simulado(1280, 720, 30)
+    print(f"{'Procesos':>8} {'Cámaras':>8} {'frames/s':>10} {'Descartados':>12}")
+
+    for num_procesos in range(1, (os.cpu_count() or 1) + 1):
+        analizados = []
+        lock = threading.Lock()
+
+        def al_resultado(id_camara, confianza):
+            with lock:
+                analizados.append(confianza)
+
+        backend = BackendProcesos(al_resultado, num_procesos=num_procesos)
+        ids = [f"bench{i}" for i in range(camaras)]
+        for id_camara in ids:
+            backend.registrar_camara(id_camara)
+
+        # Enviar frames lo más rápido posible; los que no caben se descartan
+        inicio = time.perf_counter()
+        i = 0
+        while time.perf_counter() - inicio < segundos:
+            for id_camara in ids:
+                backend.enviar(id_camara, clip[i % len(clip)])
+            i += 1
+        transcurrido = time.perf_counter() - inicio
+        with lock:
+            total = len(analizados)
+        backend.cerrar()
+
+        print(f"{num_procesos:>8} {camaras:>8} {total / transcurrido:>10.0f} {backend.frames_descartados:>12}")
+
+
+def _caso_sistema(camaras, ancho, alto, segundos, fps, procesos, eventos_alerta, resultados):
+    """Corre el motor completo sin interfaz en este proceso y devuelve sus mediciones."""
+    from motor import MotorMonitoreo
+    from agregacion import AgregadorAlertas
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        motor = MotorMonitoreo(ruta_diario=os.path.join(carpeta, "alertas.db"), procesos_analisis=procesos,
+                               carpeta_clips=os.path.join(carpeta, "clips"))
+        # Frecuencia fija para que todas las cámaras pidan lo mismo durante la medición
+        planificador = motor.planificador
+        planificador.fps_activa = planificador.fps_normal = planificador.fps_inactiva = fps
+        for i in range(1, camaras + 1):
+            motor.agregar_camara_simulada(f"sim{i}", f"Cam {i}", "Benchmark", ancho=ancho, alto=alto,
+                                          prob_intruso=0.01)
+
+        motor.iniciar()
+        time.sleep(1)  # Calentamiento: fondos de los detectores y buffers
+
+        telemetria = motor.telemetria
+        frames_inicio = telemetria.frames_totales()
+        alertas_inicio = len(motor.modelo.historial_alertas)
+        cpu_inicio = os.times()
+        inicio = time.monotonic()
+        time.sleep(segundos)
+        transcurrido = time.monotonic() - inicio
+        frames = telemetria.frames_totales() - frames_inicio
+        alertas = len(motor.modelo.historial_alertas) - alertas_inicio
+
+        # Ráfaga de eventos por el camino completo de alertas (agregación, almacén,
+        # diario, clip y avisos): cada evento tiene su propio tipo y el agregador
+        # admite toda la ráfaga, así ninguno se queda en la agrupación o el límite
+        motor.modelo.agregador = AgregadorAlertas(rafaga=eventos_alerta)
+        creadas_inicio = len(motor.modelo.historial_alertas)
+        suprimidas = 0
+        inicio_alertas = time.monotonic()
+        for i in range(eventos_alerta):
+            if motor.generar_alerta(f"sim{i % camaras + 1}", f"Benchmark {i}", 90) is None:
+                suprimidas += 1
+        duracion_alertas = time.monotonic() - inicio_alertas
+        creadas = len(motor.modelo.historial_alertas) - creadas_inicio
+
+        latencia = telemetria.histograma("extremo_a_extremo")
+        motor.detener()
+        motor.cerrar()
+        cpu_fin = os.times()
+
+    # Los procesos de análisis cuentan en children_* una vez que terminaron
+    cpu = ((cpu_fin.user + cpu_fin.system + cpu_fin.children_user + cpu_fin.children_system)
+           - (cpu_inicio.user + cpu_inicio.system + cpu_inicio.children_user + cpu_inicio.children_system))
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource is not None else None
+    resultados.put({
+        "fps_total": round(frames / transcurrido, 1),
+        "fps_por_camara": round(frames / transcurrido / camaras, 2),
+        "latencia_p50_ms": round(latencia.percentil(50) * 1000, 2),
+        "latencia_p95_ms": round(latencia.percentil(95) * 1000, 2),
+        "latencia_p99_ms": round(latencia.percentil(99) * 1000, 2),
+        # Porcentaje de un núcleo por cámara (incluye el cierre del motor)
+        "cpu_por_camara": round(cpu / transcurrido / camaras * 100, 2),
+        "rss_max_mib": round(rss, 1) if rss is not None else None,
+        "alertas_detectadas": alertas,
+        "eventos_alerta_por_s": round(eventos_alerta / duracion_alertas) if duracion_alertas > 0 else None,
+        # Si la ráfaga no crea todas sus alertas, eventos_alerta_por_s no mide el camino completo
+        "eventos_creados": creadas,
+        "eventos_fusionados": eventos_alerta - creadas - suprimidas,
+        "eventos_suprimidos": suprimidas,
+    })
+
+
+def _commit_actual():
+    """Devuelve el commit actual (con "+" si hay cambios sin guardar) o None fuera de git."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        cambios = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                                 text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("+" if cambios else "")
+
+
+def _esperar_caso(proceso, cola, limite):
+    """Espera el resultado de un caso de sistema. Devuelve (resultados, None) o (None, motivo).
+
+    Un caso que termina sin resultados (una excepción, falta de memoria) o que no
+    responde en limite segundos se informa como fallido en lugar de bloquear el
+    benchmark.
+    """
+    tope = time.monotonic() + limite
+    while True:
+        try:
+            resultados = cola.get(timeout=1)
+        except queue.Empty:
+            if not proceso.is_alive():
+                try:
+                    # Pudo terminar justo después de publicar sus resultados
+                    resultados = cola.get(timeout=1)
+                except queue.Empty:
+                    proceso.join()
+                    return None, f"el proceso terminó sin resultados (código {proceso.exitcode})"
+            elif time.monotonic() >= tope:
+                proceso.terminate()
+                proceso.join()
+                return None, f"sin resultados en {limite:.0f} s"
+            else:
+                continue
+        proceso.join()
+        return resultados, None
+
+
+def benchmark_sistema(lista_camaras, resoluciones, segundos, fps, procesos, eventos_alerta, archivo):
+    """Mide el motor completo con N cámaras simuladas y guarda los resultados.
+
+    Devuelve cuántos casos fallaron.
+    """
+    commit = _commit_actual()
+    contexto = mp.get_context("spawn")  # Cada caso empieza con la memoria limpia
+
+    print(f"{'Cámaras':>7} {'Resolución':>10} {'fps':>8} {'fps/cám':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'CPU%/cám':>9} {'RSS MiB':>8} {'Alertas':>8} {'eventos/s':>10} {'creados/fus./supr.':>19}")
+    fallidos = 0
+    for camaras in lista_camaras:
+        for resolucion in resoluciones:
+            ancho, alto = RESOLUCIONES[resolucion]
+            cola = contexto.Queue()
+            proceso = contexto.Process(target=_caso_sistema, args=(camaras, ancho, alto, segundos, fps, procesos,
+                                                                   eventos_alerta, cola))
+            proceso.start()
+            r, falla = _esperar_caso(proceso, cola, segundos + MARGEN_CASO)
+            if falla is not None:
+                fallidos += 1
+                print(f"{camaras:>7} {resolucion:>10} falló: {falla}", flush=True)
+                continue
+
+            eventos = f"{r['eventos_creados']}/{r['eventos_fusionados']}/{r['eventos_suprimidos']}"
+            print(f"{camaras:>7} {resolucion:>10} {r['fps_total']:>8} {r['fps_por_camara']:>8} "
+                  f"{r['latencia_p50_ms']:>8} {r['latencia_p95_ms']:>8} {r['latencia_p99_ms']:>8} "
+                  f"{r['cpu_por_camara']:>9} {r['rss_max_mib']!s:>8} {r['alertas_detectadas']:>8} "
+                  f"{r['eventos_alerta_por_s']!s:>10} {eventos:>19}", flush=True)
+
+            registro = {
+                "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+                "commit": commit,
+                "maquina": {"sistema": platform.platform(), "python": platform.python_version(),
+                            "nucleos": os.cpu_count()},
+                "caso": {"camaras": camaras, "resolucion": resolucion, "segundos": segundos, "fps": fps,
+                         "procesos": procesos},
+                "resultados": r,
+            }
+            if archivo:
+                os.makedirs(os.path.dirname(archivo) or ".", exist_ok=True)
+                with open(archivo, "a", encoding="utf-8") as salida:
+                    salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    if archivo:
+        print(f"Resultados agregados a {archivo}")
+    return fallidos
+
+
+def comparar_resultados(archivo, base=None, nuevo=None):
+    """Compara las mediciones de dos commits (por omisión, los dos últimos del archivo)."""
+    with open(archivo, encoding="utf-8") as entrada:
+        registros = [json.loads(linea) for linea in entrada if linea.strip()]
+
+    commits = []
+    for registro in registros:
+        if registro["commit"] not in commits:
+            commits.append(registro["commit"])
+    if nuevo is None:
+        nuevo = commits[-1] if commits else None
+    if base is None:
+        anteriores = [c for c in commits if c != nuevo]
+        base = anteriores[-1] if anteriores else None
+    if base is None or nuevo is None:
+        print("Hacen falta resultados de dos commits para comparar")
+        return
+
+    def ultimos(commit):
+        # El último registro de cada caso en ese commit
+        casos = {}
+        for registro in registros:
+            if registro["commit"] == commit:
+                caso = registro["caso"]
+                casos[(caso["camaras"], caso["resolucion"], caso["fps"], caso["procesos"])] = registro["resultados"]
+        return casos
+
+    antes, despues = ultimos(base), ultimos(nuevo)
+    print(f"{base} -> {nuevo}")
+    print(f"{'Cámaras':>7} {'Resolución':>10} {'fps':>18} {'p95 ms':>18} {'CPU%/cám':>18} {'RSS MiB':>18}")
+    for clave in sorted(set(antes) & set(despues)):
+        a, d = antes[clave], despues[clave]
+        columnas = []
+        for campo in ("fps_total", "latencia_p95_ms", "cpu_por_camara", "rss_max_mib"):
+            if a[campo] is None or d[campo] is None:
+                columnas.append(f"{'-':>18}")
+                continue
+            cambio = (d[campo] - a[campo]) / a[campo] * 100 if a[campo] else 0.0
+            columnas.append(f"{f'{a[campo]} -> {d[campo]} ({cambio:+.0f}%)':>18}")
+        print(f"{clave[0]:>7} {clave[1]:>10} " + " ".join(columnas))
+
+
+def benchmark_arranque(repeticiones, archivo):
+    """Mide el arranque de la interfaz (necesita pantalla) y guarda la mediana de cada hito."""
+    main = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    corridas = []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, main, "--medir-arranque"], capture_output=True, text=True,
+                                timeout=60)
+        lineas = [linea for linea in salida.stdout.splitlines() if linea.startswith("{")]
+        if salida.returncode != 0 or not lineas:
+            print(salida.stderr.strip() or "La interfaz no informó los tiempos de arranque")
+            return
+        corridas.append(json.loads(lineas[-1]))
+
+    hitos = sorted(corridas[0], key=corridas[0].get)
+    medianas = {hito: sorted(c[hito] for c in corridas)[len(corridas) // 2] for hito in hitos}
+    print(f"{'Hito':<14} {'ms (mediana)':>12}")
+    for hito in hitos:
+        print(f"{hito:<14} {medianas[hito]:>12}")
+
+    if archivo:
+        os.makedirs(os.path.dirname(archivo) or ".", exist_ok=True)
+        with open(archivo, "a", encoding="utf-8") as salida:
+            salida.write(json.dumps({
+                "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+                "commit": _commit_actual(),
+                "repeticiones": repeticiones,
+                "arranque_ms": medianas,
+            }, ensure_ascii=False) + "\n")
+        print(f"Resultados agregados a {archivo}")
+
+
+def _lista_enteros(texto):
+    """Convierte "4,16,64" en [4, 16, 64]."""
+    return [int(valor) for valor in texto.split(",") if valor]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del sistema de seguridad")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    parser_conversion = subparsers.add_parser("conversion", help="Conversión de frames para los paneles")
+    parser_conversion.add_argument("--repeticiones", type=int, default=200)
+
+    parser_deteccion = subparsers.add_parser("deteccion", help="Rendimiento del detector de movimiento")
+    parser_deteccion.add_argument("--frames", type=int, default=300)
+    parser_deteccion.add_argument("--video", help="Video grabado a usar en lugar de clips simulados")
+
+    parser_procesos = subparsers.add_parser("procesos", help="Escalabilidad del backend de procesos")
+    parser_procesos.add_argument("--camaras", type=int, default=8)
+    parser_procesos.add_argument("--segundos", type=float, default=3)
+
+    parser_sistema = subparsers.add_parser("sistema", help="Motor completo con N cámaras simuladas")
+    parser_sistema.add_argument("--camaras", type=_lista_enteros, default=[4, 16, 64])
+    parser_sistema.add_argument("--resoluciones", default="320x240,720p",
+                                help=f"Separadas por comas, entre: {', '.join(RESOLUCIONES)}")
+    parser_sistema.add_argument("--segundos", type=float, default=10)
+    parser_sistema.add_argument("--fps", type=float, default=10, help="Frecuencia pedida a cada cámara")
+    parser_sistema.add_argument("--procesos", type=int, default=0, help="Procesos de análisis (0 = hilos)")
+    parser_sistema.add_argument("--eventos-alerta", type=int, default=200,
+                                help="Alertas nuevas para medir el camino de alertas (cada una abre un clip)")
+    parser_sistema.add_argument("--archivo", default=ARCHIVO_RESULTADOS,
+                                help="Archivo JSONL donde se agregan los resultados ('' = no guardar)")
+
+    parser_comparar = subparsers.add_parser("comparar", help="Compara los resultados de dos commits")
+    parser_comparar.add_argument("--archivo", default=ARCHIVO_RESULTADOS)
+    parser_comparar.add_argument("--base", help="Commit de referencia (por omisión, el penúltimo)")
+    parser_comparar.add_argument("--nuevo", help="Commit a comparar (por omisión, el último)")
+
+    parser_arranque = subparsers.add_parser("arranque", help="Tiempo de arranque de la interfaz")
+    parser_arranque.add_argument("--repeticiones", type=int, default=5)
+    parser_arranque.add_argument("--archivo", default=ARCHIVO_ARRANQUE,
+                                 help="Archivo JSONL donde se agregan los resultados ('' = no guardar)")
+
+    args = parser.parse_args()
+    if args.benchmark == "conversion":
+        benchmark_conversion(args.repeticiones)
+    elif args.benchmark == "deteccion":
+        benchmark_deteccion(args.frames, args.video)
+    elif args.benchmark == "procesos":
+        benchmark_procesos(args.camaras, args.segundos)
+    elif args.benchmark == "sistema":
+        resoluciones = [r for r in args.resoluciones.split(",") if r]
+        desconocidas = [r for r in resoluciones if r not in RESOLUCIONES]
+        if desconocidas:
+            parser.error(f"resoluciones desconocidas: {', '.join(desconocidas)}")
+        if benchmark_sistema(args.camaras, resoluciones, args.segundos, args.fps, args.procesos,
+                             args.eventos_alerta, args.archivo):
+            sys.exit(1)
+    elif args.benchmark == "comparar":
+        if not os.path.exists(args.archivo):
+            sys.exit(f"No existe {args.archivo}")
+        comparar_resultados(args.archivo, args.base, args.nuevo)
+    elif args.benchmark == "arranque":
+        benchmark_arranque(args.repeticiones, args.archivo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import os
+import time
+import threading
+import cv2
+from procesamiento import FIN_CAMARA
+
+
+class FuenteCaptura:
+    def __init__(self, origen, timeout=3.0, reintento_inicial=0.5, reintento_maximo=30.0, repetir=False,
+                 ancho=None, alto=None):
+        """Fuente de video sobre cv2.VideoCapture con un hilo de lectura propio.
+
+        origen puede ser el índice de una cámara web, la ruta de un video o la URL de
+        un stream. El hilo de lectura conserva solo el frame más reciente, así un
+        dispositivo lento nunca acumula frames viejos ni bloquea al pipeline. Si pasan
+        timeout segundos sin frames, la conexión se da por perdida y se reabre con
+        espera exponencial (de reintento_inicial hasta reintento_maximo segundos).
+
+        Los videos se leen a su propio ritmo (CAP_PROP_FPS); al terminar, la fuente
+        termina, salvo con repetir=True, en cuyo caso vuelven a empezar. ancho y alto
+        piden esa resolución al dispositivo (los videos se leen a la suya).
+        """
+        self.origen = origen
+        self.timeout = timeout
+        self.reintento_inicial = reintento_inicial
+        self.reintento_maximo = reintento_maximo
+        self.es_archivo = isinstance(origen, str) and os.path.isfile(origen)
+        self.repetir = repetir
+        self.ancho = ancho
+        self.alto = alto
+
+        self.estado = "Desconectada"
+        self.frames_leidos = 0
+        self.frames_descartados = 0  # Frames reemplazados antes de que alguien los leyera
+        self.reconexiones = 0
+        self.latencia = 0.0  # Promedio móvil entre la lectura del dispositivo y leer() (s)
+        self.conectada = threading.Event()
+
+        self._frame = None
+        self._momento_frame = 0.0
+        self._ultimo_frame = 0.0
+        self._terminada = False
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._generacion = 0  # Cambia cada vez que se abandona un hilo de lectura
+        self._hilo = None
+
+    def iniciar(self):
+        """Arranca el hilo de lectura (un video terminado vuelve a empezar)."""
+        if self._hilo is None:
+            self._detener.clear()
+            with self._lock:
+                self._terminada = False
+                self._frame = None
+            self._lanzar_hilo()
+
+    def detener(self, timeout=1.0):
+        """Detiene el hilo de lectura y libera el dispositivo.
+
+        Espera al hilo como mucho timeout segundos y devuelve True si terminó. Un hilo
+        trabado dentro de read() libera el dispositivo cuando esa lectura vuelve.
+        """
+        self._detener.set()
+        hilo, self._hilo = self._hilo, None
+        if hilo is not None:
+            hilo.join(timeout)
+        self.estado = "Desconectada"
+        self.conectada.clear()
+        return hilo is None or not hilo.is_alive()
+
+    def leer(self):
+        """Devuelve el frame más reciente sin leer, None si no hay uno nuevo o FIN_CAMARA."""
+        ahora = time.monotonic()
+        with self._lock:
+            frame, self._frame = self._frame, None
+            momento = self._momento_frame
+            terminada = self._terminada
+            ultimo = self._ultimo_frame
+
+        if frame is not None:
+            self.latencia += 0.1 * ((ahora - momento) - self.latencia)
+            return frame
+        if terminada:
+            return FIN_CAMARA
+
+        # Un dispositivo trabado en read() no vuelve nunca: se abandona su hilo
+        if self.conectada.is_set() and ahora - ultimo > self.timeout:
+            self._reconectar()
+        return None
+
+    def estadisticas(self):
+        """Devuelve los contadores de la fuente."""
+        return {
+            "estado": self.estado,
+            "frames_leidos": self.frames_leidos,
+            "frames_descartados": self.frames_descartados,
+            "reconexiones": self.reconexiones,
+            "latencia_ms": round(self.latencia * 1000, 1),
+        }
+
+    def _lanzar_hilo(self):
+        """Crea un nuevo hilo de lectura con su propia generación."""
+        with self._lock:
+            self._generacion += 1
+            generacion = self._generacion
+        self._hilo = threading.Thread(target=self._bucle_lectura, args=(generacion,),
+                                      name=f"captura-{self.origen}", daemon=True)
+        self._hilo.start()
+
+    def _reconectar(self):
+        """Abandona el hilo actual (que puede estar bloqueado) y lanza otro."""
+        self.conectada.clear()
+        self.estado = "Reconectando"
+        self.reconexiones += 1
+        self._lanzar_hilo()
+
+    def _vigente(self, generacion):
+        """Indica si el hilo de esa generación debe seguir corriendo."""
+        return not self._detener.is_set() and generacion == self._generacion
+
+    def _bucle_lectura(self, generacion):
+        """Abre el dispositivo, lee frames y reconecta con espera exponencial."""
+        espera = self.reintento_inicial
+        while self._vigente(generacion):
+            cap = cv2.VideoCapture(self.origen)
+            if not cap.isOpened():
+                cap.release()
+                self.estado = "Reconectando"
+                self._detener.wait(espera)
+                espera = min(espera * 2, self.reintento_maximo)
+                continue
+
+            if self.ancho is not None and not self.es_archivo:
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.ancho)
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.alto)
+
+            periodo = 0.0
+            if self.es_archivo:
+                fps = cap.get(cv2.CAP_PROP_FPS)
+                periodo = 1.0 / fps if fps and fps > 0 else 1.0 / 30
+
+            self.estado = "Conectada"
+            with self._lock:
+                self._ultimo_frame = time.monotonic()
+            self.conectada.set()
+            espera = self.reintento_inicial
+            siguiente = time.monotonic()
+
+            while self._vigente(generacion):
+                ret, frame = cap.read()
+                if not self._vigente(generacion):
+                    break
+                if not ret:
+                    break
+
+                ahora = time.monotonic()
+                with self._lock:
+                    if self._frame is not None:
+                        self.frames_descartados += 1
+                    self._frame = frame
+                    self._momento_frame = ahora
+                    self._ultimo_frame = ahora
+                self.frames_leidos += 1
+
+                if periodo:
+                    # Los videos se entregan a su velocidad real
+                    siguiente = max(siguiente + periodo, ahora - periodo)
+                    self._detener.wait(max(siguiente - time.monotonic(), 0))
+
+            cap.release()
+            if not self._vigente(generacion):
+                return
+
+            self.conectada.clear()
+            if self.es_archivo:
+                if self.repetir:
+                    continue  # Volver a empezar el video sin espera
+                # Fin del video
+                with self._lock:
+                    self._terminada = True
+                self.estado = "Terminada"
+                return
+
+            self.estado = "Reconectando"
+            self.reconexiones += 1
+            self._detener.wait(espera)
+            espera = min(espera * 2, self.reintento_maximo)
@@ -0,0 +1,67 @@
+import time
+import threading
+from PIL import ImageTk
+
+
+class CompositorVideo:
+    def __init__(self, root, paneles, fps_display=10, telemetria=None):
+        """Agrupa la actualización de todos los paneles de video en un solo tick de Tkinter.
+
+        Los hilos del pipeline publican imágenes con publicar(); solo se guarda la más
+        reciente de cada cámara. En cada tick se construye un PhotoImage únicamente
+        para las cámaras que cambiaron, de modo que los frames reemplazados antes de
+        mostrarse nunca llegan a convertirse. Con telemetria se mide la duración de
+        cada tick en la etapa "tk_dibujo".
+        """
+        self.root = root
+        self.paneles = paneles  # id_camara -> tk.Label (vista.video_captures)
+        self.fps_display = fps_display
+        self.telemetria = telemetria
+
+        self._ultimos = {}  # id_camara -> imagen PIL pendiente de mostrar
+        self._lock = threading.Lock()
+        self._id_tick = None
+        self.frames_reemplazados = 0  # Frames que se sustituyeron antes de mostrarse
+
+    def publicar(self, id_camara, imagen):
+        """Guarda la imagen más reciente de una cámara (seguro desde cualquier hilo)."""
+        with self._lock:
+            if id_camara in self._ultimos:
+                self.frames_reemplazados += 1
+            self._ultimos[id_camara] = imagen
+
+    def cambiar_fps(self, fps_display):
+        """Cambia la frecuencia con la que se refrescan los paneles."""
+        if fps_display > 0:
+            self.fps_display = fps_display
+
+    def iniciar(self):
+        """Programa el primer tick de refresco."""
+        if self._id_tick is None:
+            self._id_tick = self.root.after(0, self._tick)
+
+    def detener(self):
+        """Cancela el tick de refresco y descarta las imágenes pendientes."""
+        if self._id_tick is not None:
+            self.root.after_cancel(self._id_tick)
+            self._id_tick = None
+        with self._lock:
+            self._ultimos.clear()
+
+    def _tick(self):
+        """Lleva a la interfaz todas las imágenes que cambiaron desde el último tick."""
+        inicio = time.monotonic()
+        with self._lock:
+            pendientes, self._ultimos = self._ultimos, {}
+
+        for id_camara, imagen in pendientes.items():
+            panel = self.paneles.get(id_camara)
+            if panel is None:
+                continue
+            img_tk = ImageTk.PhotoImage(image=imagen)
+            panel.imgtk = img_tk  # Mantener referencia para evitar garbage collection
+            panel.configure(image=img_tk)
+
+        if self.telemetria is not None and pendientes:
+            self.telemetria.observar("tk_dibujo", "", time.monotonic() - inicio)
+        self._id_tick = self.root.after(max(1, int(1000 / self.fps_display)), self._tick)
@@ -0,0 +1,231 @@
+import os
+import json
+import threading
+import traceback
+
+# Campos que, si cambian, obligan a reabrir la fuente de la cámara
+CAMPOS_FUENTE = ("origen", "ancho", "alto")
+
+
+class ConfigCamara:
+    """Configuración de una cámara tal como figura en el archivo."""
+    __slots__ = ("id_camara", "nombre", "ubicacion", "origen", "fps", "ancho", "alto", "roi", "umbral",
+                 "umbrales")
+
+    def __init__(self, id_camara, nombre=None, ubicacion="", origen=None, fps=None, ancho=None, alto=None,
+                 roi=None, umbral=None, umbrales=None):
+        self.id_camara = id_camara
+        self.nombre = nombre or id_camara
+        self.ubicacion = ubicacion
+        self.origen = origen  # None = cámara simulada; índice, ruta de video o URL = cámara real
+        self.fps = fps  # Frecuencia normal de la cámara (None = la del planificador)
+        self.ancho = ancho
+        self.alto = alto
+        self.roi = roi  # Lista de rectángulos (x, y, ancho, alto) relativos, None = todo el frame
+        self.umbral = umbral  # Umbral de confianza propio (None = el global)
+        self.umbrales = umbrales  # Umbrales propios por tipo de anomalía ({tipo: umbral})
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """Crea la configuración desde un objeto del archivo; ValueError si no es válido."""
+        if not isinstance(datos, dict) or not datos.get("id"):
+            raise ValueError(f"Cada cámara necesita un \"id\": {datos!r}")
+        desconocidos = set(datos) - {"id"} - set(cls.__slots__[1:])
+        if desconocidos:
+            raise ValueError(f"Cámara {datos['id']}: campos desconocidos {sorted(desconocidos)}")
+
+        config = cls(str(datos["id"]), **{campo: datos[campo] for campo in cls.__slots__[1:] if campo in datos})
+        camara = f"Cámara {config.id_camara}"
+        for campo in ("nombre", "ubicacion"):
+            if not isinstance(getattr(config, campo), str):
+                raise ValueError(f"{camara}: {campo} debe ser un texto")
+        if config.origen is not None and (isinstance(config.origen, bool) or
+                                          not isinstance(config.origen, (int, str))):
+            raise ValueError(f"{camara}: origen es un índice, una ruta o una URL")
+        if config.fps is not None and not (_es_numero(config.fps) and config.fps > 0):
+            raise ValueError(f"{camara}: fps debe ser un número positivo")
+        if config.umbral is not None and not (_es_numero(config.umbral) and 0 <= config.umbral <= 100):
+            raise ValueError(f"{camara}: el umbral debe estar entre 0 y 100")
+        if config.umbrales is not None:
+            validar_umbrales(config.umbrales, camara)
+        if (config.ancho is None) != (config.alto is None):
+            raise ValueError(f"{camara}: ancho y alto van juntos")
+        if config.ancho is not None and not all(isinstance(lado, int) and not isinstance(lado, bool) and lado > 0
+                                                for lado in (config.ancho, config.alto)):
+            raise ValueError(f"{camara}: ancho y alto deben ser enteros positivos")
+        if config.roi is not None:
+            if not isinstance(config.roi, list) or not all(
+                    isinstance(rectangulo, list) and len(rectangulo) == 4 and all(map(_es_numero, rectangulo))
+                    for rectangulo in config.roi):
+                raise ValueError(f"{camara}: roi es una lista de rectángulos [x, y, ancho, alto]")
+            config.roi = [tuple(rectangulo) for rectangulo in config.roi]
+        return config
+
+    def opciones_fuente(self):
+        """Devuelve las opciones de resolución para la fuente, si se indicaron."""
+        return {} if self.ancho is None else {"ancho": self.ancho, "alto": self.alto}
+
+    def cambia_fuente(self, otra):
+        """Indica si pasar de esta configuración a otra obliga a reabrir la fuente."""
+        return any(getattr(self, campo) != getattr(otra, campo) for campo in CAMPOS_FUENTE)
+
+    def __eq__(self, otra):
+        if not isinstance(otra, ConfigCamara):
+            return NotImplemented
+        return all(getattr(self, campo) == getattr(otra, campo) for campo in self.__slots__)
+
+    __hash__ = None
+
+
+def _es_numero(valor):
+    """Indica si un valor del archivo es un número (los booleanos de JSON no cuentan)."""
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def validar_umbrales(umbrales, origen):
+    """Comprueba un objeto {tipo_anomalia: umbral}; ValueError si no es válido."""
+    if not isinstance(umbrales, dict):
+        raise ValueError(f"{origen}: \"umbrales\" debe ser un objeto {{tipo: umbral}}")
+    for tipo, umbral in umbrales.items():
+        if not _es_numero(umbral) or not 0 <= umbral <= 100:
+            raise ValueError(f"{origen}: el umbral de \"{tipo}\" debe estar entre 0 y 100")
+
+
+def cargar_configuracion(ruta):
+    """Lee el archivo JSON de cámaras y devuelve (dict id_camara -> ConfigCamara, umbrales por tipo).
+
+    El archivo es un objeto con la lista "camaras"; el orden de la lista es el de
+    la interfaz. El objeto "umbrales", opcional, fija el umbral de cada tipo de
+    anomalía para todas las cámaras. Lanza OSError, json.JSONDecodeError o
+    ValueError si no es válido.
+    """
+    with open(ruta, encoding="utf-8") as archivo:
+        datos = json.load(archivo)
+    if not isinstance(datos, dict) or not isinstance(datos.get("camaras"), list):
+        raise ValueError(f"{ruta}: se esperaba un objeto con la lista \"camaras\"")
+    umbrales = datos.get("umbrales", {})
+    validar_umbrales(umbrales, ruta)
+
+    configuraciones = {}
+    for item in datos["camaras"]:
+        config = ConfigCamara.desde_dict(item)
+        if config.id_camara in configuraciones:
+            raise ValueError(f"{ruta}: la cámara {config.id_camara} está repetida")
+        configuraciones[config.id_camara] = config
+    return configuraciones, umbrales
+
+
+class RegistroCamaras:
+    def __init__(self, motor, ruta, intervalo=1.0, al_avisar=None):
+        """Mantiene las cámaras de un motor iguales a las de un archivo de configuración.
+
+        Cada carga compara el archivo con lo aplicado por ID: solo se agregan las
+        cámaras nuevas, se quitan las que ya no están y se reconfiguran las que
+        cambiaron; las demás siguen corriendo sin enterarse. Con iniciar() un hilo
+        revisa cada intervalo segundos la fecha y el tamaño del archivo y lo vuelve a
+        cargar cuando cambian. Un archivo inválido no toca nada: se informa y se
+        conserva la última configuración buena. Las recargas y los errores del hilo se
+        informan con al_avisar(mensaje, error); sin al_avisar, por la salida estándar.
+        """
+        self.motor = motor
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.al_avisar = al_avisar
+        self.configuraciones = {}  # id_camara -> ConfigCamara aplicada
+        self.umbrales = {}  # tipo_anomalia -> umbral aplicado a todas las cámaras
+        self.recargas = 0
+        self.errores = 0
+        self.ultimo_error = None
+
+        self._firma = None
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def cargar(self):
+        """Lee el archivo y aplica las diferencias. Devuelve (agregadas, quitadas, cambiadas)."""
+        with self._lock:
+            self._firma = self._firma_archivo()
+            nuevas, umbrales = cargar_configuracion(self.ruta)
+            actuales = self.configuraciones
+            if umbrales != self.umbrales:
+                self.motor.modelo.umbrales.fijar_tipos(umbrales)
+                self.umbrales = umbrales
+
+            quitadas = [c for c in actuales if c not in nuevas]
+            agregadas = [c for c in nuevas if c not in actuales]
+            cambiadas = [c for c in nuevas if c in actuales and nuevas[c] != actuales[c]]
+
+            for id_camara in quitadas:
+                self.motor.quitar_camara(id_camara)
+                del actuales[id_camara]
+            for id_camara in cambiadas:
+                self.motor.reconfigurar_camara(actuales[id_camara], nuevas[id_camara])
+                actuales[id_camara] = nuevas[id_camara]
+            for id_camara in agregadas:
+                if self.motor.agregar_camara_config(nuevas[id_camara]):
+                    actuales[id_camara] = nuevas[id_camara]
+
+            self.recargas += 1
+            self.ultimo_error = None
+        return agregadas, quitadas, cambiadas
+
+    def iniciar(self):
+        """Arranca el hilo que vigila el archivo."""
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._vigilar, name="configuracion", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout=1.0):
+        """Deja de vigilar el archivo. Devuelve True si el hilo terminó."""
+        self._detener.set()
+        if self._hilo is None:
+            return True
+        self._hilo.join(timeout)
+        return not self._hilo.is_alive()
+
+    def _firma_archivo(self):
+        """Fecha de modificación y tamaño del archivo (None si no existe)."""
+        try:
+            estado = os.stat(self.ruta)
+        except OSError:
+            return None
+        return estado.st_mtime_ns, estado.st_size
+
+    def _vigilar(self):
+        """Recarga el archivo cada vez que cambia."""
+        while not self._detener.wait(self.intervalo):
+            firma = self._firma_archivo()
+            if firma is None or firma == self._firma:
+                continue
+            try:
+                agregadas, quitadas, cambiadas = self.cargar()
+            except (OSError, ValueError) as e:
+                # json.JSONDecodeError es un ValueError
+                self._firma = firma
+                self.errores += 1
+                self.ultimo_error = str(e)
+                self._avisar(f"Configuración de cámaras no aplicada: {e}", True)
+                continue
+            except Exception as e:
+                self._firma = firma
+                self.errores += 1
+                self.ultimo_error = repr(e)
+                traceback.print_exc()
+                self._avisar(f"Error al recargar la configuración de cámaras: {e!r}", True)
+                continue
+            if agregadas or quitadas or cambiadas:
+                self._avisar(f"Configuración de cámaras recargada: {len(agregadas)} agregadas, "
+                             f"{len(quitadas)} quitadas, {len(cambiadas)} cambiadas", False)
+
+    def _avisar(self, mensaje, error):
+        """Informa una recarga o un error del archivo."""
+        if self.al_avisar is None:
+            print(mensaje, flush=True)
+            return
+        try:
+            self.al_avisar(mensaje, error)
+        except Exception:
+            traceback.print_exc()
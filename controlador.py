@@ -1,19 +1,42 @@
 import tkinter as tk
-import threading
-import cv2
-import random
-import datetime
 import time
-import numpy as np
-from PIL import Image, ImageTk
-from modelo import SistemaSeguridad
+import queue
+import random
+import threading
+import traceback
 from vista import SistemaSeguridadVista
+from diagnostico import OverlayDiagnostico, SondaBucleTk
 
 class SistemaSeguridadControlador:
-    def __init__(self, root):
-        """Inicializa el controlador y conecta la vista con el modelo."""
-        self.modelo = SistemaSeguridad()
+    def __init__(self, root, motor=None, procesos_analisis=0, inicio=None, al_arrancar=None, escuchar=None,
+                 ruta_config=None):
+        """Inicializa el controlador y conecta la vista con el motor de monitoreo.
+
+        La vista es solo un suscriptor del motor: recibe frames, alertas y cambios
+        de estado, y los lleva al hilo de Tkinter. Con procesos_analisis > 0 el motor
+        corre la detección en ese número de procesos.
+
+        La ventana se dibuja antes de cargar nada pesado: OpenCV, NumPy, Pillow y el
+        motor se importan y se crean en un hilo aparte, y las cámaras de la
+        demostración se agregan de a una mientras el monitoreo ya corre. Los tiempos
+        de arranque desde inicio (time.monotonic() al comenzar el programa) quedan
+        en tiempos_arranque; al_arrancar(tiempos) se llama al mostrarse el primer frame.
+
+        Con escuchar=(host, puerto) la ventana también es consola central: las cámaras
+        de los nodos de borde aparecen en el muro con sus miniaturas y sus alertas.
+        Con ruta_config las cámaras salen de ese archivo JSON, que se recarga en
+        caliente; sin él se usan las de la demostración.
+        """
+        self.inicio = inicio if inicio is not None else time.monotonic()
+        self.al_arrancar = al_arrancar
+        self.escuchar = escuchar
+        self.ruta_config = ruta_config
+        self.tiempos_arranque = {}  # hito -> ms desde el inicio del programa
+        self.motor = None
+        self.modelo = None
         self.vista = SistemaSeguridadVista(root)
+        root.protocol("WM_DELETE_WINDOW", self.cerrar)
+        root.after_idle(self._marcar_arranque, "ventana")
         
         # Conectar eventos de la vista con métodos del controlador
         self.vista.iniciar_monitoreo = self.iniciar_monitoreo
@@ -21,26 +44,140 @@ class SistemaSeguridadControlador:
         self.vista.aplicar_umbral = self.aplicar_umbral
         self.vista.agregar_camara = self.agregar_camara
         self.vista.marcar_revisada = self.marcar_revisada
+        self.vista.alternar_camara = self.alternar_camara
         
-        # Variables de control
-        self.monitoreo_activo = False
-        self.hilos_camara = {}
+        # Los avisos que tocan widgets pasan por una cola que se atiende en el hilo de
+        # Tkinter: los hilos del motor nunca llaman a Tk, así detener el motor desde la
+        # interfaz no puede trabarse esperando a un hilo que a su vez espera al bucle de Tk
+        self._avisos = queue.SimpleQueue()
+        self._id_avisos = root.after(50, self._atender_avisos)
         
         # Añadir una lista para guardar los IDs de las alertas programadas
         self.alertas_programadas = []
+        self._primer_frame = False
+        self.compositor = None
+        self.frames_ocultos = 0  # Frames de cámaras fuera de la vista que no se convirtieron
+        self.sonda_tk = None
         
-        # Añadir cámaras simuladas al inicio
-        self.agregar_camara_simulada("sim1", "Cam1", "Caja")
-        self.agregar_camara_simulada("sim2", "Cam 2", "Pasillo 1")
-        self.agregar_camara_simulada("sim3", "Cam 3", "Pasillo 2")
-        self.agregar_camara_simulada("sim4", "Cam 4", "Pasillo 3")
+        # El motor y las dependencias pesadas se cargan sin frenar la ventana
+        threading.Thread(target=self._cargar_motor, args=(motor, procesos_analisis),
+                         name="arranque", daemon=True).start()
+
+    def _cargar_motor(self, motor, procesos_analisis):
+        """Importa los módulos pesados y crea el motor (hilo de arranque)."""
+        try:
+            from motor import MotorMonitoreo, CAMARAS_DEMO
+            from compositor import CompositorVideo
+            from conversion import ConversorDisplay
+            from PIL import Image
+            if motor is None:
+                motor = MotorMonitoreo(procesos_analisis=procesos_analisis)
+        except Exception:
+            traceback.print_exc()
+            return
+        self._avisos.put((self._motor_listo, (motor, list(CAMARAS_DEMO), CompositorVideo, ConversorDisplay,
+                                              Image.fromarray)))
+
+    def _motor_listo(self, motor, camaras_demo, CompositorVideo, ConversorDisplay, desde_arreglo):
+        """Conecta la interfaz con el motor recién creado (hilo de Tkinter)."""
+        root = self.vista.root
+        self.motor = motor
+        self.modelo = motor.modelo
+        self._desde_arreglo = desde_arreglo
+        self.vista.tabla_historial.conectar(self.modelo.historial_alertas, self.modelo.cargar_anteriores)
+        self.vista.threshold_var.set(self.modelo.umbral_confianza)
+        self._marcar_arranque("motor")
+        
+        # Reducción y conversión de color con buffers reutilizables por cámara
+        self.conversor = ConversorDisplay(200, 150)
+        
+        # Todos los paneles de video se refrescan juntos en un solo tick de Tkinter
+        self.telemetria = self.motor.telemetria
+        self.compositor = CompositorVideo(root, self.vista.video_captures, fps_display=10, telemetria=self.telemetria)
+        self.compositor.iniciar()
+        self.telemetria.registrar_medidor("frames_reemplazados_display", lambda: self.compositor.frames_reemplazados)
+        self.telemetria.registrar_medidor("frames_ocultos_display", lambda: self.frames_ocultos)
+        self.telemetria.registrar_medidor("camaras_visibles", lambda: len(self.vista.muro_video.tamanos))
+        self.telemetria.registrar_medidor("arranque_ms", lambda: dict(self.tiempos_arranque), etiqueta="etapa")
+        
+        # Retraso del bucle de Tkinter y panel de diagnóstico (F12)
+        self.sonda_tk = SondaBucleTk(root, self.telemetria)
+        self.sonda_tk.iniciar()
+        self.overlay = OverlayDiagnostico(root, self.telemetria, estadisticas_umbrales=self.motor.estadisticas_umbrales)
         
-        # Iniciar monitoreo automáticamente después de un breve retraso
-        root.after(1000, self.iniciar_demostracion)
+        # Suscribir la interfaz a los eventos del motor
+        self.motor.suscribir("frame", self.recibir_frame)
+        self.motor.suscribir("alerta", lambda alerta: self._avisos.put((self.mostrar_alerta, (alerta,))))
+        self.motor.suscribir("alerta_actualizada",
+                             lambda alerta: self._avisos.put((self.vista.actualizar_alerta, (alerta,))))
+        self.motor.suscribir("estado", lambda estado: self._avisos.put((self.vista.actualizar_estado, (estado,))))
+        self.motor.suscribir("camara", lambda id_camara, estado: self._avisos.put(
+            (self.camara_cambiada, (id_camara, estado))))
+        self.motor.suscribir("nodo", lambda id_nodo, camaras, estado: self._avisos.put(
+            (self.nodo_cambiado, (id_nodo, camaras, estado))))
+        self.motor.suscribir("configuracion", lambda mensaje, error: self._avisos.put(
+            (self.vista.mostrar_aviso_configuracion, (mensaje, error))))
+        if self.escuchar is not None:
+            self.motor.aceptar_nodos(self.escuchar)
+        
+        # El monitoreo arranca de inmediato y las cámaras se suman de a una; las del
+        # archivo se cargan en otro hilo y sus paneles aparecen con el aviso "Agregada"
+        self.iniciar_demostracion()
+        if self.ruta_config is not None:
+            threading.Thread(target=self._cargar_configuracion, name="carga-camaras", daemon=True).start()
+        else:
+            root.after(0, self._agregar_camaras_demo, camaras_demo)
+
+    def _cargar_configuracion(self):
+        """Carga las cámaras del archivo de configuración y lo deja vigilado."""
+        try:
+            self.motor.cargar_configuracion(self.ruta_config)
+        except (OSError, ValueError) as e:
+            self._avisos.put((self.vista.mostrar_mensaje, ("Error", f"No se pudo cargar {self.ruta_config}: {e}")))
+            return
+        self._avisos.put((self._marcar_arranque, ("camaras",)))
+
+    def _agregar_camaras_demo(self, camaras):
+        """Agrega una cámara de la demostración por tick para no frenar la interfaz."""
+        if self.motor is None or not camaras:
+            return
+        id_camara, nombre, ubicacion = camaras[0]
+        self.agregar_camara_simulada(id_camara, nombre, ubicacion)
+        if len(camaras) > 1:
+            self.vista.root.after(0, self._agregar_camaras_demo, camaras[1:])
+        else:
+            self._marcar_arranque("camaras")
+
+    def _marcar_arranque(self, hito):
+        """Registra cuánto tardó el programa en llegar a un hito del arranque."""
+        self.tiempos_arranque[hito] = round((time.monotonic() - self.inicio) * 1000, 1)
+        if hito == "primer_frame" and self.al_arrancar is not None:
+            self.al_arrancar(dict(self.tiempos_arranque))
+
+    def _atender_avisos(self):
+        """Aplica en la interfaz los avisos del motor acumulados desde la última vez."""
+        while True:
+            try:
+                funcion, args = self._avisos.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                funcion(*args)
+            except Exception:
+                traceback.print_exc()
+        self._id_avisos = self.vista.root.after(50, self._atender_avisos)
+
+    @property
+    def monitoreo_activo(self):
+        """Indica si el motor está monitoreando."""
+        return self.motor is not None and self.motor.monitoreo_activo
 
     def iniciar_demostracion(self):
         """Inicia el monitoreo automáticamente y programa alertas simuladas."""
-        self.iniciar_monitoreo()
+        if self.al_arrancar is not None:
+            self.motor.iniciar()  # Midiendo el arranque no se abre el aviso modal
+        else:
+            self.iniciar_monitoreo()
         
         # Simular alertas con retrasos y guardar sus IDs
         id1 = self.vista.root.after(3000, self.generar_alerta_simulada, "sim1", "Intruso")
@@ -52,140 +189,107 @@ class SistemaSeguridadControlador:
 
     def iniciar_monitoreo(self):
         """Inicia el monitoreo de todas las cámaras."""
-        if self.monitoreo_activo:
-            return
-        
-        self.monitoreo_activo = True
-        self.modelo.estado_sistema = "Monitoreo"
-        self.vista.actualizar_estado("Monitoreo")
-        
-        # Iniciar un hilo para cada cámara
-        for camara in self.modelo.camaras_activas:
-            id_camara = camara["id"]
-            hilo = threading.Thread(target=self.procesar_video, args=(id_camara,))
-            hilo.daemon = True
-            hilo.start()
-            self.hilos_camara[id_camara] = hilo
-        
-        self.vista.mostrar_mensaje("Monitoreo", "El monitoreo se ha iniciado")
+        if self.motor is not None and self.motor.iniciar():
+            self.vista.mostrar_mensaje("Monitoreo", "El monitoreo se ha iniciado")
 
     def detener_monitoreo(self):
         """Detiene el monitoreo de todas las cámaras."""
-        if not self.monitoreo_activo:
+        if self.motor is None or not self.motor.detener():
             return
         
-        self.monitoreo_activo = False
-        self.modelo.estado_sistema = "Detenido"
-        self.vista.actualizar_estado("Detenido")
-        
         # Cancelar todas las alertas programadas
         for id_alerta in self.alertas_programadas:
             self.vista.root.after_cancel(id_alerta)
         self.alertas_programadas = []
         
-        # Los hilos terminarán automáticamente al salir del bucle
-        self.hilos_camara.clear()
-        
         self.vista.mostrar_mensaje("Monitoreo", "El monitoreo se ha detenido")
 
-    def agregar_camara_simulada(self, id_camara, nombre, ubicacion):
-        """Agrega una cámara simulada al sistema."""
-        if any(cam["id"] == id_camara for cam in self.modelo.camaras_activas):
-            return
-        
-        self.modelo.agregar_camara(id_camara, nombre, ubicacion)
-        self.vista.crear_feed_video(id_camara, f"{nombre} ({ubicacion})")
+    def cerrar(self):
+        """Detiene el monitoreo, guarda las alertas pendientes y cierra la ventana."""
+        self.vista.root.after_cancel(self._id_avisos)
+        if self.motor is not None:
+            self.compositor.detener()
+            self.sonda_tk.detener()
+            self.motor.cerrar()
+        self.vista.root.destroy()
 
-    def procesar_video(self, id_camara):
-        """Procesa el video de una cámara, ya sea real o simulada."""
-        while self.monitoreo_activo:
-            if id_camara.startswith("sim"):
-                # Generar imagen simulada
-                frame = self.generar_frame_simulado(id_camara)
+    def agregar_camara_simulada(self, id_camara, nombre, ubicacion, roi=None):
+        """Agrega una cámara simulada al sistema (su panel llega con el aviso "Agregada")."""
+        self.motor.agregar_camara_simulada(id_camara, nombre, ubicacion, roi)
+
+    def camara_cambiada(self, id_camara, estado):
+        """Refleja en el muro el alta, los cambios o la baja de una cámara."""
+        if estado in ("Agregada", "Actualizada"):
+            camara = self.motor.modelo.camaras_activas.get(id_camara)
+            if camara is None:
+                return  # Se quitó antes de que llegara el aviso
+            nombre = f"{camara['nombre']} ({camara['ubicacion']})"
+            if id_camara in self.vista.video_captures:
+                self.vista.actualizar_feed_video(id_camara, nombre)
             else:
-                # Leer de la cámara real
-                if id_camara not in self.vista.video_captures:
-                    break
-                cap = self.vista.video_captures[id_camara]
-                ret, frame = cap.read()
-                if not ret:
-                    break
-            
-            # Convertir a formato para mostrar en Tkinter
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(frame_rgb)
-            img = img.resize((200, 150))
-            img_tk = ImageTk.PhotoImage(image=img)
-            
-            # Actualizar la etiqueta de video en la interfaz
-            self.vista.root.after(0, self.actualizar_label_video, id_camara, img_tk)
-            
-            # Simular detección de anomalías con baja probabilidad
-            if random.random() < 0.001 and self.monitoreo_activo:  # Verificación adicional
-                tipos_anomalia = ["Movimiento sospechoso", "Objeto abandonado", "Intruso", "Exceso de personas"]
-                self.generar_alerta_simulada(id_camara, random.choice(tipos_anomalia))
-            
-            time.sleep(0.1)  # Reducir la carga de CPU
+                self.vista.crear_feed_video(id_camara, nombre)
+        elif estado == "Quitada":
+            self.vista.quitar_feed_video(id_camara)
+            self.conversor.olvidar(id_camara)
+        else:
+            self.vista.marcar_camara(id_camara, estado)
 
-    def actualizar_label_video(self, id_camara, img_tk):
-        """Actualiza la etiqueta de video en la interfaz."""
-        if id_camara in self.vista.video_captures:
-            label = self.vista.video_captures[id_camara]
-            label.imgtk = img_tk  # Mantener referencia para evitar garbage collection
-            label.configure(image=img_tk)
+    def nodo_cambiado(self, id_nodo, camaras, estado):
+        """Muestra las cámaras de un nodo de borde que se conectó o las marca desconectadas."""
+        for id_camara, nombre, ubicacion in camaras:
+            if estado == "Conectado" and id_camara not in self.vista.video_captures:
+                # Las cámaras remotas se pausan en su nodo, no desde la consola
+                self.vista.crear_feed_video(id_camara, f"{nombre} ({ubicacion}) - {id_nodo}", pausable=False)
+            self.vista.marcar_camara(id_camara, "Activa" if estado == "Conectado" else "Desconectada")
 
-    def generar_frame_simulado(self, id_camara):
-        """Genera un frame simulado para una cámara."""
-        # Crear un marco negro de 320x240
-        frame = np.zeros((240, 320, 3), dtype=np.uint8)
-        
-        # Añadir texto según la cámara
-        texto = ""
-        for camara in self.modelo.camaras_activas:
-            if camara["id"] == id_camara:
-                texto = f"{camara['nombre']} - {camara['ubicacion']}"
-                break
-        
-        # Añadir fecha y hora
-        tiempo = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Colocar texto en el marco
-        cv2.putText(frame, texto, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        cv2.putText(frame, tiempo, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+    def alternar_camara(self, id_camara):
+        """Detiene o reanuda una sola cámara sin afectar a las demás."""
+        if self.motor is None:
+            return
+        if id_camara in self.motor.camaras_detenidas:
+            self.motor.iniciar_camara(id_camara)
+        else:
+            self.motor.detener_camara(id_camara)
+
+    def recibir_frame(self, id_camara, frame):
+        """Convierte un frame del motor para su panel de video (corre en el pipeline)."""
+        # Solo se convierte al tamaño del panel, y nada si la cámara no está a la vista
+        tamano = self.vista.muro_video.tamanos.get(id_camara)
+        if tamano is None:
+            self.frames_ocultos += 1
+            return
         
-        # Simular movimiento aleatorio (puntos brillantes)
-        for _ in range(10):
-            x = random.randint(0, 319)
-            y = random.randint(0, 239)
-            cv2.circle(frame, (x, y), 1, (0, 255, 0), 1)
+        # Reducir y convertir a RGB para mostrar en Tkinter
+        inicio = time.monotonic()
+        img = self._desde_arreglo(self.conversor.convertir(id_camara, frame, tamano=tamano))
+        self.telemetria.observar("conversion", id_camara, time.monotonic() - inicio)
         
-        return frame
+        # El compositor construye el PhotoImage solo si este frame llega a mostrarse
+        self.compositor.publicar(id_camara, img)
+        if not self._primer_frame:
+            self._primer_frame = True
+            self._avisos.put((self._marcar_arranque, ("primer_frame",)))
+
+    def estadisticas_fps(self):
+        """Devuelve por cámara los fps objetivo y logrados del planificador."""
+        return self.motor.estadisticas_fps()
 
     def generar_alerta_simulada(self, id_camara, tipo_anomalia):
         """Genera una alerta simulada para demostración."""
-        if not self.monitoreo_activo:
-            return
-        
-        confianza = random.randint(75, 95)
-        alerta = {
-            "id_alerta": len(self.modelo.historial_alertas) + 1,
-            "id_camara": id_camara,
-            "tipo_anomalia": tipo_anomalia,
-            "nivel_confianza": confianza,
-            "timestamp": datetime.datetime.now(),
-            "estado": "Nueva"
-        }
-        
-        self.modelo.historial_alertas.append(alerta)
-        self.modelo.estado_sistema = "Alerta"
-        
+        self.motor.generar_alerta(id_camara, tipo_anomalia, random.randint(75, 95))
+
+    def mostrar_alerta(self, alerta):
+        """Muestra en la interfaz una alerta generada por el motor."""
+        inicio = time.monotonic()
         self.vista.mostrar_alerta(alerta)
-        self.vista.actualizar_estado("Alerta")
+        self.telemetria.observar("tk_alerta", "", time.monotonic() - inicio)
 
     def aplicar_umbral(self):
         """Aplica el nuevo umbral de confianza para alertas."""
         nuevo_umbral = self.vista.threshold_var.get()
-        if self.modelo.cambiar_umbral(nuevo_umbral):
+        if self.motor is None:
+            return
+        if self.motor.cambiar_umbral(nuevo_umbral):
             self.vista.mostrar_mensaje("Umbral actualizado", 
                                       f"Nuevo umbral de alerta: {nuevo_umbral}%")
         else:
@@ -193,6 +297,8 @@ class SistemaSeguridadControlador:
 #Esto esta en pendiente, es por si se llega a necesitar pero hay que hacer modificaciones
     def agregar_camara(self): 
         """Agrega una nueva cámara al sistema."""
+        if self.motor is None:
+            return
         opciones = {
             "0": "Cámara web (si está disponible)",
             "sim5": "Cámara simulada 5 (Almacén)",
@@ -217,32 +323,23 @@ class SistemaSeguridadControlador:
             nombre = opciones[id_camara].split('(')[0].strip()
             ubicacion = opciones[id_camara].split('(')[1].rstrip(')') if "(" in opciones[id_camara] else "Desconocida"
 
-            if any(cam["id"] == id_camara for cam in self.modelo.camaras_activas):
+            if self.motor.existe_camara(id_camara):
                 self.vista.mostrar_mensaje("Error", "Esta cámara ya está agregada")
                 dialog.destroy()
                 return
             
             if id_camara.isdigit():
                 try:
-                    cap = cv2.VideoCapture(int(id_camara))
-                    if not cap.isOpened():
+                    if not self.motor.agregar_camara_real(id_camara, nombre, ubicacion, int(id_camara)):
                         self.vista.mostrar_mensaje("Error", "No se pudo conectar a la cámara web")
                         dialog.destroy()
                         return
-                    self.vista.video_captures[id_camara] = cap
                 except Exception as e:
                     self.vista.mostrar_mensaje("Error", f"Error al conectar: {str(e)}")
                     dialog.destroy()
                     return
-            
-            self.modelo.agregar_camara(id_camara, nombre, ubicacion)
-            self.vista.crear_feed_video(id_camara, f"{nombre} ({ubicacion})")
-            
-            if self.monitoreo_activo:
-                hilo = threading.Thread(target=self.procesar_video, args=(id_camara,))
-                hilo.daemon = True
-                hilo.start()
-                self.hilos_camara[id_camara] = hilo
+            else:
+                self.motor.agregar_camara_simulada(id_camara, nombre, ubicacion)
             
             dialog.destroy()
         
@@ -253,30 +350,24 @@ class SistemaSeguridadControlador:
 
     def marcar_revisada(self, id_alerta=None):
         """Marca una alerta seleccionada como revisada."""
+        if self.motor is None:
+            return
         if id_alerta is not None:
-            # Cuando se llama directamente desde el botón de revisar
-            if self.modelo.marcar_alerta_revisada(id_alerta):
-                # Actualizar estado del árbol de historial
-                for item in self.vista.history_tree.get_children():
-                    valores = self.vista.history_tree.item(item)['values']
-                    if valores[0] == id_alerta:
-                        # No es necesario actualizar el estado visualmente
-                        # ya que el frame de alerta ya se eliminó
-                        break
-            else:
+            # Cuando se llama directamente desde el botón de revisar; el panel de
+            # alertas activas ya quitó la alerta
+            if not self.motor.marcar_alerta_revisada(id_alerta):
                 self.vista.mostrar_mensaje("Error", "No se pudo marcar la alerta como revisada")
         else:
             # Cuando se llama desde el botón general (selección en la tabla)
-            seleccion = self.vista.history_tree.selection()
-            if not seleccion:
+            id_alerta = self.vista.tabla_historial.id_seleccionado()
+            if id_alerta is None:
                 self.vista.mostrar_mensaje("Error", "Debe seleccionar una alerta")
                 return
             
-            item = self.vista.history_tree.item(seleccion[0])
-            id_alerta = int(item['values'][0])
-            
-            if self.modelo.marcar_alerta_revisada(id_alerta):
-                # No es necesario actualizar el estado visualmente en la tabla
-                pass
-            else:
+            if not self.motor.marcar_alerta_revisada(id_alerta):
                 self.vista.mostrar_mensaje("Error", "No se pudo marcar la alerta como revisada")
+                return
+            self.vista.panel_alertas.quitar(id_alerta)
+        
+        # La tabla mueve la alerta según su nuevo estado y la redibuja en el próximo refresco
+        self.vista.tabla_historial.actualizar_estado(self.modelo.historial_alertas.obtener(id_alerta))
\ No newline at end of file
@@ -0,0 +1,58 @@
+import threading
+import cv2
+import numpy as np
+
+
+class ConversorDisplay:
+    def __init__(self, ancho=200, alto=150, interpolacion=cv2.INTER_AREA):
+        """Convierte frames de cámara al tamaño y formato de los paneles de video.
+
+        Primero se reduce el frame con cv2.resize y luego se intercambian los canales
+        sobre la imagen pequeña, así la resolución completa se recorre una sola vez.
+        Cada cámara tiene un único par de buffers reutilizables: el resultado se pasa
+        enseguida a Image.fromarray, que lo copia, así que el siguiente frame puede
+        escribir en el mismo buffer. El resultado solo es válido hasta la próxima
+        conversión de esa cámara.
+        ancho y alto son el tamaño por omisión; cada llamada puede pedir otro (el del
+        panel de esa cámara) y los buffers se vuelven a crear solo cuando cambia.
+        """
+        self.ancho = ancho
+        self.alto = alto
+        self.interpolacion = interpolacion
+        self._buffers = {}  # id_camara -> (reducido, rgb)
+        self._lock = threading.Lock()
+
+    def convertir(self, id_camara, frame, es_rgb=False, tamano=None):
+        """Devuelve el frame reducido en RGB usando los buffers de la cámara.
+
+        tamano es (ancho, alto) del destino; sin él se usa el tamaño por omisión.
+        """
+        ancho, alto = tamano if tamano is not None else (self.ancho, self.alto)
+        reducido, rgb = self._buffers_camara(id_camara, ancho, alto)
+
+        # Al agrandar (modo de enfoque) INTER_AREA no aporta nada y es más caro
+        interpolacion = self.interpolacion if ancho <= frame.shape[1] else cv2.INTER_LINEAR
+
+        if es_rgb:
+            # La fuente ya está en RGB: basta con reducir directamente al destino
+            cv2.resize(frame, (ancho, alto), dst=rgb, interpolation=interpolacion)
+            return rgb
+
+        cv2.resize(frame, (ancho, alto), dst=reducido, interpolation=interpolacion)
+        cv2.cvtColor(reducido, cv2.COLOR_BGR2RGB, dst=rgb)
+        return rgb
+
+    def olvidar(self, id_camara):
+        """Libera los buffers de una cámara que ya no se muestra."""
+        with self._lock:
+            self._buffers.pop(id_camara, None)
+
+    def _buffers_camara(self, id_camara, ancho, alto):
+        """Devuelve los buffers de la cámara, creándolos si cambió el tamaño."""
+        forma = (alto, ancho, 3)
+        with self._lock:
+            buffers = self._buffers.get(id_camara)
+            if buffers is None or buffers[1].shape != forma:
+                buffers = (np.empty(forma, dtype=np.uint8), np.empty(forma, dtype=np.uint8))
+                self._buffers[id_camara] = buffers
+            return buffers
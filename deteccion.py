@@ -0,0 +1,72 @@
+import cv2
+import numpy as np
+
+
+class DetectorMovimiento:
+    def __init__(self, ancho=160, alto=120, aprendizaje=0.05, umbral_pixel=25,
+                 area_referencia=0.1, rois=None):
+        """Detector de movimiento por sustracción de fondo para una cámara.
+
+        Cada frame se reduce a ancho x alto y se pasa a escala de grises; el fondo es
+        un promedio móvil de esos frames. Los píxeles que difieren del fondo más de
+        umbral_pixel cuentan como movimiento, solo dentro de las regiones de interés.
+        La confianza (0-100) es la fracción del área vigilada que cambió, donde
+        area_referencia equivale a 100 %.
+
+        rois es una lista de rectángulos (x, y, ancho, alto) en coordenadas relativas
+        (0 a 1); sin rois se vigila todo el frame.
+        """
+        self.ancho = ancho
+        self.alto = alto
+        self.aprendizaje = aprendizaje
+        self.umbral_pixel = umbral_pixel
+        self.area_referencia = area_referencia
+
+        # Buffers reutilizables a la resolución de análisis
+        self._reducido = np.empty((alto, ancho, 3), dtype=np.uint8)
+        self._gris = np.empty((alto, ancho), dtype=np.uint8)
+        self._fondo_u8 = np.empty((alto, ancho), dtype=np.uint8)
+        self._diferencia = np.empty((alto, ancho), dtype=np.uint8)
+        self._fondo = None
+
+        self.cambiar_rois(rois)
+
+    def cambiar_rois(self, rois):
+        """Define las regiones de interés del detector."""
+        self.rois = rois
+        if not rois:
+            self._mascara_roi = None
+            self._area = self.ancho * self.alto
+            return
+
+        self._mascara_roi = np.zeros((self.alto, self.ancho), dtype=np.uint8)
+        for x, y, ancho, alto in rois:
+            x0, y0 = int(x * self.ancho), int(y * self.alto)
+            x1, y1 = int((x + ancho) * self.ancho), int((y + alto) * self.alto)
+            self._mascara_roi[y0:y1, x0:x1] = 255
+        self._area = max(1, cv2.countNonZero(self._mascara_roi))
+
+    def reiniciar(self):
+        """Olvida el fondo aprendido (por ejemplo, tras mover la cámara)."""
+        self._fondo = None
+
+    def analizar(self, frame):
+        """Devuelve la confianza (0-100) de que haya movimiento en el frame (BGR)."""
+        cv2.resize(frame, (self.ancho, self.alto), dst=self._reducido, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._reducido, cv2.COLOR_BGR2GRAY, dst=self._gris)
+        cv2.GaussianBlur(self._gris, (5, 5), 0, dst=self._gris)
+
+        if self._fondo is None:
+            self._fondo = self._gris.astype(np.float32)
+            return 0
+
+        cv2.convertScaleAbs(self._fondo, dst=self._fondo_u8)
+        cv2.absdiff(self._gris, self._fondo_u8, dst=self._diferencia)
+        cv2.threshold(self._diferencia, self.umbral_pixel, 255, cv2.THRESH_BINARY, dst=self._diferencia)
+        if self._mascara_roi is not None:
+            cv2.bitwise_and(self._diferencia, self._mascara_roi, dst=self._diferencia)
+
+        cv2.accumulateWeighted(self._gris, self._fondo, self.aprendizaje)
+
+        fraccion = cv2.countNonZero(self._diferencia) / self._area
+        return min(100, int(fraccion / self.area_referencia * 100))
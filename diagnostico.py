@@ -0,0 +1,124 @@
+import time
+import tkinter as tk
+
+
+class SondaBucleTk:
+    def __init__(self, root, telemetria, intervalo=100):
+        """Mide el retraso del bucle de eventos de Tkinter.
+
+        Programa una llamada cada intervalo milisegundos y registra en la etapa
+        "tk_retraso" cuánto tarde llegó respecto de lo pedido: si la interfaz está
+        ocupada dibujando o atendiendo eventos, el retraso sube.
+        """
+        self.root = root
+        self.telemetria = telemetria
+        self.intervalo = intervalo
+        self._esperado = None
+        self._id_after = None
+
+    def iniciar(self):
+        """Programa la primera medición."""
+        if self._id_after is None:
+            self._programar()
+
+    def detener(self):
+        """Cancela las mediciones."""
+        if self._id_after is not None:
+            self.root.after_cancel(self._id_after)
+            self._id_after = None
+
+    def _programar(self):
+        """Programa la siguiente medición."""
+        self._esperado = time.monotonic() + self.intervalo / 1000
+        self._id_after = self.root.after(self.intervalo, self._medir)
+
+    def _medir(self):
+        """Registra el retraso de esta llamada y programa la siguiente."""
+        self.telemetria.observar("tk_retraso", "", max(time.monotonic() - self._esperado, 0.0))
+        self._programar()
+
+
+class OverlayDiagnostico:
+    def __init__(self, root, telemetria, intervalo=1000, estadisticas_umbrales=None):
+        """Panel de diagnóstico superpuesto a la ventana principal.
+
+        Muestra fps por cámara, percentiles de latencia por etapa y los medidores de
+        la telemetría. Solo se actualiza mientras está visible, así que oculto no
+        cuesta nada. F12 lo muestra u oculta y Ctrl+D exporta las mediciones a
+        telemetria.json y telemetria.prom en la carpeta actual. Con
+        estadisticas_umbrales (como MotorMonitoreo.estadisticas_umbrales) también
+        muestra los umbrales que más candidatos suprimen.
+        """
+        self.root = root
+        self.telemetria = telemetria
+        self.intervalo = intervalo
+        self.estadisticas_umbrales = estadisticas_umbrales
+        self._id_after = None
+
+        self.etiqueta = tk.Label(root, justify=tk.LEFT, anchor="nw", font=("Courier", 9),
+                                 bg="#202020", fg="#00ff00", padx=6, pady=4)
+        root.bind("<F12>", lambda e: self.alternar())
+        root.bind("<Control-d>", lambda e: self.exportar())
+
+    def visible(self):
+        """Indica si el panel se está mostrando."""
+        return self._id_after is not None
+
+    def alternar(self):
+        """Muestra u oculta el panel."""
+        if self.visible():
+            self.root.after_cancel(self._id_after)
+            self._id_after = None
+            self.etiqueta.place_forget()
+        else:
+            self.etiqueta.place(relx=0.01, rely=0.99, anchor="sw")
+            self.etiqueta.lift()
+            self._actualizar()
+
+    def exportar(self, ruta_base="telemetria"):
+        """Escribe las mediciones en JSON y en texto de Prometheus."""
+        self.telemetria.exportar(ruta_base + ".json")
+        self.telemetria.exportar(ruta_base + ".prom")
+
+    def _actualizar(self):
+        """Vuelve a escribir el texto del panel."""
+        texto = formatear(self.telemetria.instantanea())
+        if self.estadisticas_umbrales is not None:
+            texto += formatear_umbrales(self.estadisticas_umbrales())
+        self.etiqueta.config(text=texto)
+        self._id_after = self.root.after(self.intervalo, self._actualizar)
+
+
+def formatear(instantanea, max_claves=6):
+    """Devuelve una instantánea de la telemetría como texto de pocas líneas.
+
+    Un medidor con varios valores (por cámara o por fase) muestra cada uno si son a
+    lo sumo max_claves; si son más, su total, el máximo y la clave del máximo.
+    """
+    lineas = ["fps: " + "  ".join(f"{c}={d['fps']}" for c, d in sorted(instantanea["camaras"].items()))]
+    for etapa, por_camara in sorted(instantanea["etapas"].items()):
+        # Una línea por etapa con el peor p95 entre cámaras
+        peor = max(por_camara.values(), key=lambda d: d["p95_ms"])
+        total = sum(d["n"] for d in por_camara.values())
+        lineas.append(f"{etapa:<14} p50={peor['p50_ms']:>7.2f}ms p95={peor['p95_ms']:>7.2f}ms "
+                      f"p99={peor['p99_ms']:>7.2f}ms n={total}")
+    for nombre, valor in sorted(instantanea["medidores"].items()):
+        if isinstance(valor, dict):
+            if not valor:
+                valor = "-"
+            elif len(valor) <= max_claves:
+                valor = " ".join(f"{clave}={v}" for clave, v in valor.items())
+            else:
+                mayor = max(valor, key=valor.get)
+                valor = f"total={sum(valor.values())} max={valor[mayor]} ({mayor}) n={len(valor)}"
+        lineas.append(f"{nombre}: {valor}")
+    return "\n".join(lineas)
+
+
+def formatear_umbrales(estadisticas, maximo=5):
+    """Devuelve una línea por umbral con más candidatos suprimidos (a lo sumo maximo)."""
+    filas = [(d["suprimidos"], id_camara, tipo, d) for id_camara, tipos in estadisticas.items()
+             for tipo, d in tipos.items() if d["suprimidos"]]
+    filas.sort(key=lambda fila: fila[0], reverse=True)
+    return "".join(f"\numbral {id_camara}/{tipo} {d['umbral']}%: {d['suprimidos']}/{d['candidatos']} suprimidos"
+                   for _, id_camara, tipo, d in filas[:maximo])
@@ -0,0 +1,208 @@
+import os
+import time
+import queue
+import threading
+import traceback
+from collections import deque
+import cv2
+import numpy as np
+
+
+class _AnilloClips:
+    """Frames comprimidos recientes de una cámara."""
+    __slots__ = ("frames", "bytes", "ultimo")
+
+    def __init__(self):
+        self.frames = deque()  # (momento, jpeg)
+        self.bytes = 0
+        self.ultimo = 0.0
+
+
+class _Evento:
+    """Clip en curso: frames previos a la alerta más los que llegan hasta fin."""
+    __slots__ = ("alerta", "frames", "fin")
+
+    def __init__(self, alerta, frames, fin):
+        self.alerta = alerta
+        self.frames = frames
+        self.fin = fin
+
+
+class GrabadorEventos:
+    def __init__(self, carpeta="clips", segundos_previos=5, segundos_posteriores=5, fps=10,
+                 ancho=320, alto=240, calidad=80, memoria_maxima=64 * 1024 * 1024, num_escritores=2,
+                 al_guardar=None, intervalo_revision=1.0):
+        """Graba un clip alrededor de cada alerta a partir de un anillo de frames en memoria.
+
+        Cada cámara conserva los últimos segundos_previos segundos de frames reducidos
+        a ancho x alto y comprimidos en JPEG, a lo sumo fps por segundo. Todas las
+        cámaras juntas nunca superan memoria_maxima bytes: si se llega al límite, se
+        descartan los frames más viejos de la cámara que agrega. Al llegar una alerta
+        se toman los frames previos, se siguen juntando los de los siguientes
+        segundos_posteriores y el clip se codifica en un grupo de hilos escritores,
+        de modo que la captura y la interfaz nunca esperan al codificador ni al disco.
+        Un clip se cierra con el primer frame posterior a su fin; si la cámara deja de
+        entregar frames, los escritores lo cierran igual cuando vence su plazo (revisan
+        cada intervalo_revision segundos) o al llamar a cerrar_clips().
+        al_guardar(alerta, ruta) se llama desde el hilo escritor al terminar cada clip.
+        """
+        self.carpeta = carpeta
+        self.segundos_previos = segundos_previos
+        self.segundos_posteriores = segundos_posteriores
+        self.fps = fps
+        self.ancho = ancho
+        self.alto = alto
+        self.calidad = calidad
+        self.memoria_maxima = memoria_maxima
+        self.al_guardar = al_guardar
+        self.intervalo_revision = intervalo_revision
+
+        self.clips_guardados = 0
+        self.frames_descartados = 0  # Frames sacados del anillo por el límite de memoria
+        self._anillos = {}  # id_camara -> _AnilloClips
+        self._eventos = {}  # id_camara -> [_Evento]
+        self._memoria = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(carpeta, exist_ok=True)
+        self._cola = queue.Queue()
+        self._hilos = [threading.Thread(target=self._bucle_escritura, name=f"clips-{i}", daemon=True)
+                       for i in range(num_escritores)]
+        for hilo in self._hilos:
+            hilo.start()
+
+    def agregar_frame(self, id_camara, frame):
+        """Guarda el frame en el anillo de la cámara (corre en el pipeline)."""
+        ahora = time.monotonic()
+        anillo = self._anillos.get(id_camara)
+        if anillo is not None and ahora - anillo.ultimo < 1.0 / self.fps:
+            return
+
+        # La reducción y la compresión se hacen fuera del candado
+        reducido = cv2.resize(frame, (self.ancho, self.alto), interpolation=cv2.INTER_AREA)
+        ok, jpeg = cv2.imencode(".jpg", reducido, (cv2.IMWRITE_JPEG_QUALITY, self.calidad))
+        if not ok:
+            return
+        jpeg = jpeg.tobytes()
+
+        listos = []
+        with self._lock:
+            anillo = self._anillos.setdefault(id_camara, _AnilloClips())
+            anillo.ultimo = ahora
+            anillo.frames.append((ahora, jpeg))
+            anillo.bytes += len(jpeg)
+            self._memoria += len(jpeg)
+
+            limite = ahora - self.segundos_previos
+            while anillo.frames and (anillo.frames[0][0] < limite or self._memoria > self.memoria_maxima):
+                if anillo.frames[0][0] >= limite:
+                    self.frames_descartados += 1
+                _, viejo = anillo.frames.popleft()
+                anillo.bytes -= len(viejo)
+                self._memoria -= len(viejo)
+
+            eventos = self._eventos.get(id_camara)
+            if eventos:
+                for evento in eventos:
+                    if ahora <= evento.fin:
+                        evento.frames.append((ahora, jpeg))
+                    else:
+                        listos.append(evento)
+                if listos:
+                    self._eventos[id_camara] = [e for e in eventos if e not in listos]
+
+        for evento in listos:
+            self._cola.put(evento)
+
+    def iniciar_clip(self, alerta):
+        """Empieza el clip de una alerta con los frames previos de su cámara."""
+        with self._lock:
+            anillo = self._anillos.get(alerta.id_camara)
+            previos = list(anillo.frames) if anillo is not None else []
+            evento = _Evento(alerta, previos, time.monotonic() + self.segundos_posteriores)
+            self._eventos.setdefault(alerta.id_camara, []).append(evento)
+
+    def cerrar_clips(self, id_camara):
+        """Manda a escribir los clips pendientes de una cámara (por ejemplo, al pausarla)."""
+        with self._lock:
+            eventos = self._eventos.pop(id_camara, [])
+        for evento in eventos:
+            self._cola.put(evento)
+
+    def quitar_camara(self, id_camara):
+        """Libera el anillo de una cámara y manda a escribir sus clips pendientes."""
+        with self._lock:
+            anillo = self._anillos.pop(id_camara, None)
+            if anillo is not None:
+                self._memoria -= anillo.bytes
+            eventos = self._eventos.pop(id_camara, [])
+        for evento in eventos:
+            self._cola.put(evento)
+
+    def cerrar(self, timeout=10):
+        """Escribe los clips pendientes, aunque no hayan completado su duración."""
+        with self._lock:
+            eventos = [e for lista in self._eventos.values() for e in lista]
+            self._eventos = {}
+        for evento in eventos:
+            self._cola.put(evento)
+        for _ in self._hilos:
+            self._cola.put(None)
+        for hilo in self._hilos:
+            hilo.join(timeout)
+
+    def memoria_usada(self):
+        """Devuelve los bytes ocupados por los anillos de todas las cámaras."""
+        return self._memoria
+
+    def _bucle_escritura(self):
+        """Codifica los clips encolados y los guarda en disco."""
+        while True:
+            try:
+                evento = self._cola.get(timeout=self.intervalo_revision)
+            except queue.Empty:
+                self._cerrar_vencidos()
+                continue
+            if evento is None:
+                return
+            if not evento.frames:
+                continue
+            try:
+                ruta = self._escribir(evento)
+                self.clips_guardados += 1
+                if self.al_guardar is not None:
+                    self.al_guardar(evento.alerta, ruta)
+            except Exception:
+                traceback.print_exc()
+
+    def _cerrar_vencidos(self):
+        """Encola los clips cuyo plazo venció sin que llegara otro frame de su cámara."""
+        ahora = time.monotonic()
+        vencidos = []
+        with self._lock:
+            for id_camara, eventos in list(self._eventos.items()):
+                if any(ahora > e.fin for e in eventos):
+                    vencidos.extend(e for e in eventos if ahora > e.fin)
+                    restantes = [e for e in eventos if ahora <= e.fin]
+                    if restantes:
+                        self._eventos[id_camara] = restantes
+                    else:
+                        del self._eventos[id_camara]
+        for evento in vencidos:
+            self._cola.put(evento)
+
+    def _escribir(self, evento):
+        """Escribe un clip MJPG con la frecuencia real de sus frames."""
+        alerta = evento.alerta
+        frames = evento.frames
+        duracion = frames[-1][0] - frames[0][0]
+        fps = (len(frames) - 1) / duracion if duracion > 0 else self.fps
+
+        ruta = os.path.join(self.carpeta, f"alerta_{alerta.id_alerta}_{alerta.id_camara}.avi")
+        escritor = cv2.VideoWriter(ruta, cv2.VideoWriter_fourcc(*"MJPG"), fps, (self.ancho, self.alto))
+        try:
+            for _, jpeg in frames:
+                escritor.write(cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR))
+        finally:
+            escritor.release()
+        return ruta
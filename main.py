@@ -1,7 +1,69 @@
-import tkinter as tk
-from controlador import SistemaSeguridadControlador
+import time
+
+INICIO = time.monotonic()  # Referencia para medir el arranque
+
+import os
+import json
+import argparse
+
+
+def direccion(texto):
+    """Convierte "host:puerto" o "puerto" en (host, puerto); el host por omisión es 127.0.0.1."""
+    host, _, puerto = texto.rpartition(":")
+    return host or "127.0.0.1", int(puerto)
+
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = SistemaSeguridadControlador(root)
-    root.mainloop()
+    parser = argparse.ArgumentParser(description="Sistema de Seguridad con IA")
+    parser.add_argument("--procesos", type=int, default=0,
+                        help="Procesos de análisis con memoria compartida (0 = análisis en hilos)")
+    parser.add_argument("--headless", action="store_true",
+                        help="Corre el monitoreo sin interfaz gráfica")
+    parser.add_argument("--camaras", type=int, default=None,
+                        help="Número de cámaras simuladas en modo headless (por omisión, las de la demostración)")
+    parser.add_argument("--duracion", type=float, default=None,
+                        help="Segundos que corre el modo headless (por omisión, hasta Ctrl+C)")
+    parser.add_argument("--fuente", action="append", default=[],
+                        help="Cámara web, video o URL a monitorear en modo headless (se puede repetir)")
+    parser.add_argument("--telemetria", default=None,
+                        help="Archivo donde el modo headless exporta la telemetría (.prom = Prometheus, si no JSON)")
+    parser.add_argument("--medir-arranque", action="store_true",
+                        help="Abre la interfaz, imprime los tiempos de arranque en JSON al ver el primer frame y sale")
+    parser.add_argument("--config", default=None, metavar="RUTA",
+                        help="Archivo JSON de cámaras, recargado en caliente (por omisión camaras.json si existe)")
+    parser.add_argument("--escuchar", type=direccion, default=None, metavar="[HOST:]PUERTO",
+                        help="Hace de consola central y recibe alertas y miniaturas de nodos de borde")
+    parser.add_argument("--nodo", default=None, metavar="ID",
+                        help="Corre sin interfaz como nodo de borde con este ID y envía todo a --central")
+    parser.add_argument("--central", type=direccion, default=("127.0.0.1", 8765), metavar="[HOST:]PUERTO",
+                        help="Consola central a la que se conecta el nodo (por omisión 127.0.0.1:8765)")
+    args = parser.parse_args()
+    if args.config is None and os.path.exists("camaras.json"):
+        args.config = "camaras.json"
+
+    if args.nodo:
+        # El nodo no lleva diario propio: la consola central guarda las alertas
+        from motor import ejecutar_sin_interfaz
+        ejecutar_sin_interfaz(args.camaras, args.duracion, procesos_analisis=args.procesos, ruta_diario=None,
+                              fuentes=args.fuente, ruta_telemetria=args.telemetria,
+                              carpeta_clips=os.path.join("clips", args.nodo), central=args.central,
+                              id_nodo=args.nodo, ruta_config=args.config)
+    elif args.headless:
+        from motor import ejecutar_sin_interfaz
+        ejecutar_sin_interfaz(args.camaras, args.duracion, procesos_analisis=args.procesos,
+                              fuentes=args.fuente, ruta_telemetria=args.telemetria, escuchar=args.escuchar,
+                              ruta_config=args.config)
+    else:
+        import tkinter as tk
+        from controlador import SistemaSeguridadControlador
+
+        al_arrancar = None
+        if args.medir_arranque:
+            def al_arrancar(tiempos):
+                print(json.dumps(tiempos), flush=True)
+                root.after(0, app.cerrar)
+
+        root = tk.Tk()
+        app = SistemaSeguridadControlador(root, procesos_analisis=args.procesos, inicio=INICIO,
+                                          al_arrancar=al_arrancar, escuchar=args.escuchar, ruta_config=args.config)
+        root.mainloop()
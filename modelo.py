@@ -1,28 +1,105 @@
 import datetime
 import random  # Solo para simular detecciones, pendiente el banco de datos
+from alertas import AlmacenAlertas
+from agregacion import AgregadorAlertas
+from umbrales import TablaUmbrales
 class SistemaSeguridad:
-    def __init__(self):
+    def __init__(self, diario=None, alertas_recientes=200):
         """Inicializa el sistema de seguridad con valores predeterminados."""
-        self.historial_alertas = []  # Lista de alertas generadas
+        self.historial_alertas = AlmacenAlertas()  # Alertas generadas, indexadas por ID
+        self.diario = diario  # DiarioAlertas opcional para conservar las alertas en disco
         self.estado_sistema = "Monitoreo"  # Estado del sistema (Monitoreo, Alerta, etc.)
-        self.camaras_activas = []  # Lista de cámaras activas en el sistema (4)
-        self.umbral_confianza = 80  # Umbral mínimo de confianza para alertas (en %)
+        self.camaras_activas = {}  # id_camara -> datos de la cámara, en orden de alta
+        self.umbrales = TablaUmbrales(umbral_global=80)  # Umbrales de confianza (en %) por cámara y tipo
+        self.agregador = AgregadorAlertas()  # Agrupa eventos repetidos y limita alertas por cámara
+
+        # Solo se cargan las alertas más recientes; las anteriores se traen del diario
+        # por páginas con cargar_anteriores() cuando el historial llega a ellas
+        self.historial_completo = diario is None  # Ya no quedan alertas viejas en el diario
+        if diario is not None:
+            for alerta in diario.cargar_recientes(alertas_recientes):
+                self.historial_alertas.agregar(alerta)
+
+    def cargar_anteriores(self, limite=200):
+        """Trae del diario hasta limite alertas anteriores a las que están en memoria.
+
+        Devuelve cuántas agregó al historial (0 si ya no quedan).
+        """
+        if self.historial_completo:
+            return 0
+        primero = self.historial_alertas.primer_id()
+        if primero is None:
+            self.historial_completo = True  # Diario vacío al arrancar
+            return 0
+        alertas = self.diario.cargar_anteriores(primero, limite)
+        if len(alertas) < limite:
+            self.historial_completo = True
+        for alerta in alertas:
+            self.historial_alertas.agregar(alerta)
+        return len(alertas)
+
+    @property
+    def umbral_confianza(self):
+        """Umbral global de confianza para las alertas (en %)."""
+        return self.umbrales.umbral_global
 
     def cambiar_umbral(self, nuevo_umbral):
-        """Cambia el umbral de confianza para las alertas si está en el rango permitido."""
+        """Cambia el umbral global de confianza si está en el rango permitido."""
         if 50 <= nuevo_umbral <= 100:
-            self.umbral_confianza = nuevo_umbral
+            self.umbrales.cambiar_global(nuevo_umbral)
             return True
         return False
 
-    def agregar_camara(self, id_camara, nombre, ubicacion):
-        """Añade una nueva cámara al sistema."""
-        self.camaras_activas.append({"id": id_camara, "nombre": nombre, "ubicacion": ubicacion})
+    def agregar_camara(self, id_camara, nombre, ubicacion, roi=None):
+        """Añade una nueva cámara al sistema (roi: regiones vigiladas, None = todo el frame)."""
+        self.camaras_activas[id_camara] = {"id": id_camara, "nombre": nombre, "ubicacion": ubicacion, "roi": roi}
+
+    def quitar_camara(self, id_camara):
+        """Saca una cámara de las cámaras activas."""
+        self.camaras_activas.pop(id_camara, None)
+
+    def registrar_alerta(self, id_camara, tipo_anomalia, nivel_confianza):
+        """Registra un evento: crea una alerta con un ID único o lo suma a una repetida.
+
+        Devuelve (alerta, nueva); alerta es None si el límite de la cámara lo suprimió.
+        """
+        alerta, nueva = self.agregador.registrar(
+            id_camara, tipo_anomalia, nivel_confianza,
+            lambda: self.historial_alertas.crear(id_camara, tipo_anomalia, nivel_confianza))
+        if alerta is not None and self.diario is not None:
+            self.diario.guardar(alerta)
+        return alerta, nueva
+
+    def registrar_alerta_remota(self, id_camara, tipo_anomalia, nivel_confianza, timestamp, cantidad, ultimo,
+                                alerta=None):
+        """Crea (o actualiza, si se pasa alerta) la copia de una alerta de otro nodo.
+
+        El nodo ya agrupó y limitó sus eventos, así que no se pasa por el agregador.
+        """
+        if alerta is None:
+            alerta = self.historial_alertas.crear(id_camara, tipo_anomalia, nivel_confianza, timestamp)
+        else:
+            alerta.nivel_confianza = nivel_confianza
+        alerta.cantidad = cantidad
+        alerta.ultimo = ultimo
+        if self.diario is not None:
+            self.diario.guardar(alerta)
+        return alerta
 
     def marcar_alerta_revisada(self, id_alerta):
         """Marca una alerta específica como revisada."""
-        for alerta in self.historial_alertas:
-            if alerta["id_alerta"] == id_alerta:
-                alerta["estado"] = "Revisada"
-                return True
-        return False
+        if not self.historial_alertas.marcar_revisada(id_alerta):
+            return False
+        if self.diario is not None:
+            self.diario.guardar(self.historial_alertas.obtener(id_alerta))
+        return True
+
+    def asociar_clip(self, id_alerta, ruta):
+        """Guarda en la alerta la ruta del clip grabado a su alrededor."""
+        alerta = self.historial_alertas.obtener(id_alerta)
+        if alerta is None:
+            return False
+        alerta.clip = ruta
+        if self.diario is not None:
+            self.diario.guardar(alerta)
+        return True
\ No newline at end of file
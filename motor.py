@@ -0,0 +1,671 @@
+import time
+import datetime
+import threading
+import traceback
+from collections import OrderedDict
+from captura import FuenteCaptura
+from modelo import SistemaSeguridad
+from procesamiento import PipelineVideo, FIN_CAMARA
+from simulacion import FuenteSimulada
+from persistencia import DiarioAlertas
+from deteccion import DetectorMovimiento
+from grabacion import GrabadorEventos
+from analisis_procesos import BackendProcesos
+from planificador import PlanificadorAdaptativo
+from telemetria import Telemetria
+from nodos import ConsolaCentral, NodoBorde, PUERTO_NODOS, decodificar_miniatura
+from configuracion import RegistroCamaras
+
+# Cámaras simuladas con las que arranca la demostración
+CAMARAS_DEMO = [
+    ("sim1", "Cam1", "Caja"),
+    ("sim2", "Cam 2", "Pasillo 1"),
+    ("sim3", "Cam 3", "Pasillo 2"),
+    ("sim4", "Cam 4", "Pasillo 3"),
+]
+
+# Tipo de anomalía de las alertas del detector de movimiento
+TIPO_MOVIMIENTO = "Movimiento sospechoso"
+
+# Copias locales de alertas remotas que todavía pueden recibir actualizaciones;
+# las menos recientes se olvidan primero
+MAXIMO_ALERTAS_REMOTAS = 10000
+
+EVENTOS = ("frame", "alerta", "alerta_actualizada", "estado", "camara", "nodo", "configuracion")
+
+
+class MotorMonitoreo:
+    def __init__(self, ruta_diario="alertas.db", procesos_analisis=0, num_trabajadores=2, carpeta_clips="clips"):
+        """Núcleo de monitoreo independiente de la interfaz gráfica.
+
+        Maneja las cámaras, el pipeline de captura y análisis, el planificador y el
+        almacén de alertas. Las interfaces (o cualquier otro consumidor) se suscriben a
+        los eventos "frame" (id_camara, frame), "alerta" (alerta nueva), "alerta_actualizada"
+        (alerta que agrupó otro evento repetido), "estado" (estado) y "camara"
+        (id_camara, estado) cuando una cámara se agrega, se reconfigura ("Actualizada"),
+        se detiene, se reanuda o se quita.
+        Como consola central (aceptar_nodos), "nodo" (id_nodo, camaras, estado) avisa
+        la conexión de un nodo de borde con sus cámaras [(id_camara, nombre, ubicacion)];
+        sus alertas y miniaturas llegan por los mismos eventos que las locales, con
+        IDs de cámara "id_nodo/id_camara".
+        Con cargar_configuracion, "configuracion" (mensaje, error) avisa cada recarga
+        en caliente del archivo de cámaras y cada archivo que no se pudo aplicar.
+        Los avisos se entregan en el hilo que los produce; si nadie está suscrito a
+        "frame", los frames no se convierten para pantalla.
+
+        Con ruta_diario=None las alertas solo se guardan en memoria, y con
+        procesos_analisis > 0 la detección corre en BackendProcesos. Cada alerta queda
+        con un clip de lo ocurrido antes y después en carpeta_clips (None = sin clips).
+        """
+        # Las alertas se conservan en disco; al iniciar solo se cargan las recientes
+        self.diario = DiarioAlertas(ruta_diario) if ruta_diario else None
+        self.modelo = SistemaSeguridad(self.diario)
+
+        self.monitoreo_activo = False
+        self.capturas_reales = {}  # id_camara -> FuenteCaptura
+        self.fuentes_simuladas = {}  # id_camara -> FuenteSimulada
+        self.camaras_detenidas = set()  # Cámaras pausadas individualmente
+        self.detectores = {}  # id_camara -> DetectorMovimiento
+        self.eventos_movimiento = {}  # id_camara -> True si el movimiento en curso ya generó su alerta
+        self.registro = None  # RegistroCamaras si las cámaras salen de un archivo
+        self.camaras_remotas = {}  # id_camara -> id_nodo de las cámaras de nodos de borde
+        self.consola = None  # ConsolaCentral si el motor recibe nodos
+        self._alertas_remotas = OrderedDict()  # (id_nodo, sesion, id_alerta del nodo) -> alerta local
+        self._lock_remotas = threading.Lock()
+        self._suscriptores = {evento: [] for evento in EVENTOS}
+
+        # Mediciones de rendimiento por etapa, siempre activas
+        self.telemetria = Telemetria()
+
+        # Anillo de frames comprimidos por cámara para grabar clips de las alertas
+        self.grabador = None
+        if carpeta_clips:
+            self.grabador = GrabadorEventos(carpeta_clips, al_guardar=self._clip_guardado)
+
+        # Backend opcional de análisis en varios procesos con memoria compartida
+        self.backend_analisis = None
+        if procesos_analisis > 0:
+            self.backend_analisis = BackendProcesos(self.evaluar_confianza, num_procesos=procesos_analisis,
+                                                    telemetria=self.telemetria)
+
+        # Frecuencia de captura adaptativa: más fps con movimiento, menos en reposo
+        # o cuando el procesamiento se atrasa
+        self.planificador = PlanificadorAdaptativo(fps_activa=15, fps_normal=10, fps_inactiva=2)
+
+        # Pipeline compartido: un hilo de captura y un grupo pequeño de hilos de trabajo
+        self.pipeline = PipelineVideo(self.capturar_frame, self.procesar_frame, num_trabajadores=num_trabajadores,
+                                      intervalo=0.1, planificador=self.planificador, telemetria=self.telemetria)
+        self._registrar_medidores()
+
+    def _registrar_medidores(self):
+        """Expone en la telemetría los contadores que ya llevan los componentes."""
+        t = self.telemetria
+        t.registrar_medidor("cola_frames", self.pipeline.profundidades)
+        t.registrar_medidor("frames_descartados_pipeline", self.pipeline.frames_descartados)
+        t.registrar_medidor("fps_objetivo", lambda: {c: e["fps_objetivo"] for c, e in self.estadisticas_fps().items()})
+        t.registrar_medidor("frames_descartados_captura", lambda: {
+            c: e["frames_descartados"] for c, e in self.estadisticas_capturas().items()})
+        t.registrar_medidor("reconexiones_captura", lambda: {
+            c: e["reconexiones"] for c, e in self.estadisticas_capturas().items()})
+        t.registrar_medidor("alertas_suprimidas", self.alertas_suprimidas)
+        t.registrar_medidor("candidatos_bajo_umbral", self.modelo.umbrales.suprimidos_por_camara)
+        t.registrar_medidor("alertas_total", lambda: len(self.modelo.historial_alertas))
+        if self.backend_analisis is not None:
+            t.registrar_medidor("frames_descartados_analisis", lambda: self.backend_analisis.frames_descartados)
+            t.registrar_medidor("reinicios_analisis", lambda: self.backend_analisis.reinicios)
+        if self.grabador is not None:
+            t.registrar_medidor("memoria_clips_bytes", self.grabador.memoria_usada)
+        if self.diario is not None:
+            t.registrar_medidor("cola_diario", self.diario.pendientes)
+            t.registrar_medidor("errores_diario", lambda: self.diario.lotes_fallidos)
+            t.registrar_medidor("alertas_perdidas_diario", lambda: self.diario.alertas_perdidas)
+
+    def suscribir(self, evento, funcion):
+        """Registra una función que recibirá los avisos de un evento."""
+        self._suscriptores[evento].append(funcion)
+
+    def desuscribir(self, evento, funcion):
+        """Quita una función de los avisos de un evento."""
+        if funcion in self._suscriptores[evento]:
+            self._suscriptores[evento].remove(funcion)
+
+    def _notificar(self, evento, *args):
+        """Entrega un aviso a todos los suscriptores del evento."""
+        for funcion in list(self._suscriptores[evento]):
+            try:
+                funcion(*args)
+            except Exception:
+                traceback.print_exc()
+
+    def existe_camara(self, id_camara):
+        """Indica si la cámara ya está registrada."""
+        return id_camara in self.detectores
+
+    def agregar_camara_simulada(self, id_camara, nombre, ubicacion, roi=None, **opciones_fuente):
+        """Agrega una cámara simulada. Devuelve False si ya existía.
+
+        opciones_fuente se pasan a FuenteSimulada (por ejemplo ancho, alto o prob_intruso).
+        """
+        if self.existe_camara(id_camara):
+            return False
+
+        self.fuentes_simuladas[id_camara] = self._fuente_simulada(nombre, ubicacion, opciones_fuente)
+        self._registrar_camara(id_camara, nombre, ubicacion, roi)
+        return True
+
+    def _fuente_simulada(self, nombre, ubicacion, opciones_fuente):
+        """Crea una fuente simulada con un buffer más que los frames que el pipeline retiene.
+
+        Los suscriptores, el grabador y el análisis copian o convierten el frame antes
+        de que procesar_frame termine, así que ningún buffer se reescribe mientras se usa.
+        """
+        buffers = max(opciones_fuente.pop("buffers", 0), self.pipeline.frames_por_camara() + 1)
+        return FuenteSimulada(nombre, ubicacion, buffers=buffers, **opciones_fuente)
+
+    def agregar_camara_real(self, id_camara, nombre, ubicacion, origen, roi=None, esperar=5.0, repetir=False,
+                            **opciones_fuente):
+        """Conecta una cámara real y la agrega. Devuelve False si no se pudo abrir.
+
+        origen es el índice de una cámara web, la ruta de un video o la URL de un
+        stream. Se esperan hasta esperar segundos al primer frame; después, las
+        desconexiones se resuelven en el hilo de la fuente sin frenar al pipeline.
+        Con esperar=0 la cámara se agrega sin esperar y la fuente se conecta sola.
+        opciones_fuente se pasan a FuenteCaptura (por ejemplo ancho y alto).
+        """
+        if self.existe_camara(id_camara):
+            return False
+
+        fuente = FuenteCaptura(origen, repetir=repetir, **opciones_fuente)
+        fuente.iniciar()
+        if esperar and not fuente.conectada.wait(esperar):
+            fuente.detener()
+            return False
+        if not self.monitoreo_activo:
+            # El dispositivo solo queda abierto mientras se monitorea
+            fuente.detener()
+        self.capturas_reales[id_camara] = fuente
+        self._registrar_camara(id_camara, nombre, ubicacion, roi)
+        return True
+
+    def _registrar_camara(self, id_camara, nombre, ubicacion, roi):
+        """Registra una cámara en el modelo, la detección y, si corre, el pipeline."""
+        self.modelo.agregar_camara(id_camara, nombre, ubicacion, roi)
+        self.detectores[id_camara] = DetectorMovimiento(rois=roi)
+        if self.backend_analisis is not None:
+            self.backend_analisis.registrar_camara(id_camara, roi)
+        if self.monitoreo_activo:
+            self.pipeline.agregar_camara(id_camara)
+        self._notificar("camara", id_camara, "Agregada")
+
+    def agregar_camara_config(self, config):
+        """Agrega una cámara descrita por una ConfigCamara. Devuelve False si ya existía."""
+        id_camara = config.id_camara
+        if config.origen is None:
+            agregada = self.agregar_camara_simulada(id_camara, config.nombre, config.ubicacion, config.roi,
+                                                    **config.opciones_fuente())
+        else:
+            agregada = self.agregar_camara_real(id_camara, config.nombre, config.ubicacion, config.origen,
+                                                config.roi, esperar=0, **config.opciones_fuente())
+        if agregada:
+            self._aplicar_ajustes(config)
+        return agregada
+
+    def reconfigurar_camara(self, anterior, nueva):
+        """Aplica a una cámara su nueva configuración sin tocar las demás.
+
+        El nombre, la ubicación, el ROI, los fps y el umbral se cambian en caliente; solo
+        si cambia la fuente (origen o resolución) la cámara se detiene y se vuelve a abrir.
+        """
+        id_camara = nueva.id_camara
+        if not self.existe_camara(id_camara):
+            return self.agregar_camara_config(nueva)
+
+        if anterior.cambia_fuente(nueva):
+            activa = id_camara not in self.camaras_detenidas
+            self.detener_camara(id_camara)
+            self.fuentes_simuladas.pop(id_camara, None)
+            self.capturas_reales.pop(id_camara, None)
+            if nueva.origen is None:
+                self.fuentes_simuladas[id_camara] = self._fuente_simulada(nueva.nombre, nueva.ubicacion,
+                                                                          nueva.opciones_fuente())
+            else:
+                self.capturas_reales[id_camara] = FuenteCaptura(nueva.origen, **nueva.opciones_fuente())
+            self.detectores[id_camara].reiniciar()
+            if activa:
+                self.iniciar_camara(id_camara)
+        elif (anterior.nombre, anterior.ubicacion) != (nueva.nombre, nueva.ubicacion):
+            fuente = self.fuentes_simuladas.get(id_camara)
+            if fuente is not None:
+                fuente.rotular(nueva.nombre, nueva.ubicacion)
+
+        if anterior.roi != nueva.roi:
+            self.detectores[id_camara].cambiar_rois(nueva.roi)
+            if self.backend_analisis is not None:
+                self.backend_analisis.registrar_camara(id_camara, nueva.roi)
+        self.modelo.agregar_camara(id_camara, nueva.nombre, nueva.ubicacion, nueva.roi)
+        self._aplicar_ajustes(nueva)
+        self._notificar("camara", id_camara, "Actualizada")
+        return True
+
+    def _aplicar_ajustes(self, config):
+        """Aplica los fps y los umbrales propios de una cámara."""
+        self.planificador.configurar_camara(config.id_camara, config.fps)
+        self.modelo.umbrales.fijar_camara(config.id_camara, config.umbral, config.umbrales)
+
+    def cargar_configuracion(self, ruta, vigilar=True):
+        """Agrega las cámaras de un archivo y, con vigilar, aplica sus cambios en caliente.
+
+        Devuelve (agregadas, quitadas, cambiadas); lanza OSError o ValueError si el
+        archivo no es válido.
+        """
+        if self.registro is None:
+            self.registro = RegistroCamaras(self, ruta, al_avisar=lambda mensaje, error: self._notificar(
+                "configuracion", mensaje, error))
+            self.telemetria.registrar_medidor("recargas_configuracion", lambda: self.registro.recargas)
+        cambios = self.registro.cargar()
+        if vigilar:
+            self.registro.iniciar()
+        return cambios
+
+    def iniciar_camara(self, id_camara):
+        """Reanuda una cámara detenida sin tocar las demás. Devuelve False si no existe."""
+        if not self.existe_camara(id_camara):
+            return False
+
+        self.camaras_detenidas.discard(id_camara)
+        if self.monitoreo_activo:
+            fuente = self.capturas_reales.get(id_camara)
+            if fuente is not None:
+                fuente.iniciar()
+            self.pipeline.agregar_camara(id_camara)
+        self._notificar("camara", id_camara, "Activa")
+        return True
+
+    def detener_camara(self, id_camara, timeout=1.0):
+        """Detiene una sola cámara y libera su dispositivo. Devuelve False si no existe."""
+        if not self.existe_camara(id_camara):
+            return False
+
+        self.camaras_detenidas.add(id_camara)
+        self.pipeline.quitar_camara(id_camara)
+        fuente = self.capturas_reales.get(id_camara)
+        if fuente is not None:
+            fuente.detener(timeout)
+        self.eventos_movimiento.pop(id_camara, None)
+        if self.grabador is not None:
+            self.grabador.cerrar_clips(id_camara)
+        self._notificar("camara", id_camara, "Detenida")
+        return True
+
+    def quitar_camara(self, id_camara, timeout=1.0):
+        """Detiene una cámara y la elimina del sistema. Devuelve False si no existe."""
+        if not self.detener_camara(id_camara, timeout):
+            return False
+
+        self.camaras_detenidas.discard(id_camara)
+        self.fuentes_simuladas.pop(id_camara, None)
+        self.capturas_reales.pop(id_camara, None)
+        self.modelo.umbrales.quitar_camara(id_camara)
+        self.planificador.configurar_camara(id_camara, None)
+        del self.detectores[id_camara]
+        if self.backend_analisis is not None:
+            self.backend_analisis.quitar_camara(id_camara)
+        if self.grabador is not None:
+            self.grabador.quitar_camara(id_camara)
+        self.modelo.agregador.quitar_camara(id_camara)
+        self.modelo.quitar_camara(id_camara)
+        self._notificar("camara", id_camara, "Quitada")
+        return True
+
+    def iniciar(self):
+        """Inicia el monitoreo de las cámaras no detenidas. Devuelve False si ya estaba activo."""
+        if self.monitoreo_activo:
+            return False
+
+        self.monitoreo_activo = True
+        self.modelo.estado_sistema = "Monitoreo"
+
+        # Abrir los dispositivos y registrar las cámaras en el pipeline compartido
+        for id_camara in list(self.modelo.camaras_activas):
+            if id_camara in self.camaras_detenidas:
+                continue
+            fuente = self.capturas_reales.get(id_camara)
+            if fuente is not None:
+                fuente.iniciar()
+            self.pipeline.agregar_camara(id_camara)
+        self.pipeline.iniciar()
+
+        self._notificar("estado", "Monitoreo")
+        return True
+
+    def detener(self, timeout=2.0):
+        """Detiene el monitoreo y libera los dispositivos. Devuelve False si ya estaba detenido.
+
+        Los hilos del pipeline y de captura se esperan hasta timeout segundos en total,
+        así un Detener seguido de Iniciar nunca deja bucles viejos junto a los nuevos.
+        """
+        if not self.monitoreo_activo:
+            return False
+
+        self.monitoreo_activo = False
+        self.modelo.estado_sistema = "Detenido"
+        self._detener_hilos(timeout)
+
+        self._notificar("estado", "Detenido")
+        return True
+
+    def _detener_hilos(self, timeout):
+        """Detiene el pipeline y las fuentes reales con un plazo común."""
+        limite = time.monotonic() + timeout
+        self.pipeline.detener(timeout)
+        for fuente in list(self.capturas_reales.values()):
+            fuente.detener(max(limite - time.monotonic(), 0))
+        self.eventos_movimiento.clear()
+        if self.grabador is not None:
+            for id_camara in list(self.detectores):
+                self.grabador.cerrar_clips(id_camara)
+
+    def cerrar(self, timeout=2.0):
+        """Detiene el monitoreo y libera cámaras, procesos, nodos y el diario."""
+        self.monitoreo_activo = False
+        if self.registro is not None:
+            self.registro.detener()
+        self._detener_hilos(timeout)
+        if self.consola is not None:
+            self.consola.detener()
+        if self.backend_analisis is not None:
+            self.backend_analisis.cerrar()
+        if self.grabador is not None:
+            self.grabador.cerrar()
+        if self.diario is not None:
+            self.diario.cerrar()
+
+    def capturar_frame(self, id_camara):
+        """Obtiene el siguiente frame de una cámara, ya sea real o simulada."""
+        fuente = self.fuentes_simuladas.get(id_camara)
+        if fuente is not None:
+            return fuente.leer()
+
+        # El frame más reciente de la cámara real, sin esperar al dispositivo
+        fuente = self.capturas_reales.get(id_camara)
+        if fuente is None:
+            return FIN_CAMARA
+        return fuente.leer()
+
+    def procesar_frame(self, id_camara, frame):
+        """Entrega el frame a los suscriptores y busca anomalías (corre en el pipeline)."""
+        if not self.monitoreo_activo:
+            return
+
+        t = self.telemetria
+        if self._suscriptores["frame"]:
+            inicio = time.monotonic()
+            self._notificar("frame", id_camara, frame)
+            t.observar("suscriptores", id_camara, time.monotonic() - inicio)
+        if self.grabador is not None:
+            inicio = time.monotonic()
+            self.grabador.agregar_frame(id_camara, frame)
+            t.observar("grabacion", id_camara, time.monotonic() - inicio)
+
+        # Detección de movimiento sobre una copia reducida en escala de grises
+        if self.backend_analisis is not None:
+            # El resultado llega después por evaluar_confianza desde el backend
+            self.backend_analisis.enviar(id_camara, frame)
+            return
+        detector = self.detectores.get(id_camara)
+        if detector is not None:
+            inicio = time.monotonic()
+            confianza = detector.analizar(frame)
+            t.observar("deteccion", id_camara, time.monotonic() - inicio)
+            self.evaluar_confianza(id_camara, confianza)
+
+    def evaluar_confianza(self, id_camara, confianza):
+        """Compara la confianza de la detección con el umbral de la cámara y genera la alerta.
+
+        Un evento de movimiento empieza cuando la confianza llega a la mitad del umbral
+        y termina cuando baja de ella. Genera una sola alerta si en algún momento
+        alcanza el umbral; si termina sin alcanzarlo, cuenta como candidato suprimido.
+        """
+        if not self.monitoreo_activo:
+            return
+        umbral = self.modelo.umbrales.umbral(id_camara, TIPO_MOVIMIENTO)
+
+        if confianza < umbral / 2:
+            if self.eventos_movimiento.pop(id_camara, None) is False:
+                self.modelo.umbrales.contar_suprimido(id_camara, TIPO_MOVIMIENTO)
+            return
+
+        # Un movimiento moderado ya basta para muestrear la cámara más seguido
+        self.planificador.registrar_actividad(id_camara)
+        if self.eventos_movimiento.get(id_camara):
+            return  # Este evento ya generó su alerta
+        if confianza >= umbral:
+            self.eventos_movimiento[id_camara] = True
+            self.generar_alerta(id_camara, TIPO_MOVIMIENTO, confianza, umbral)
+        else:
+            self.eventos_movimiento[id_camara] = False
+
+    def generar_alerta(self, id_camara, tipo_anomalia, confianza, umbral=None):
+        """Registra una alerta y avisa a los suscriptores, si la confianza alcanza su umbral.
+
+        umbral es el que ya usó quien llama para abrir el evento; así un cambio de
+        umbral entre las dos lecturas no puede rechazar la alerta de ese evento.
+        """
+        if not self.monitoreo_activo:
+            return None
+        # Antes de crear nada: un candidato por debajo del umbral solo se cuenta
+        if not self.modelo.umbrales.evaluar(id_camara, tipo_anomalia, confianza, umbral):
+            return None
+
+        alerta, nueva = self.modelo.registrar_alerta(id_camara, tipo_anomalia, confianza)
+        self.planificador.registrar_actividad(id_camara)
+        if alerta is None:
+            return None
+        if not nueva:
+            # Un evento repetido solo actualiza la alerta que ya se está mostrando
+            self._notificar("alerta_actualizada", alerta)
+            return alerta
+
+        if self.grabador is not None:
+            self.grabador.iniciar_clip(alerta)
+        self.modelo.estado_sistema = "Alerta"
+
+        self._notificar("alerta", alerta)
+        self._notificar("estado", "Alerta")
+        return alerta
+
+    def aceptar_nodos(self, direccion=("127.0.0.1", PUERTO_NODOS)):
+        """Recibe alertas y miniaturas de nodos de borde (modo consola central).
+
+        Devuelve la dirección en la que escucha.
+        """
+        if self.consola is None:
+            self.consola = ConsolaCentral(direccion, self._nodo_conectado, self._lote_remoto,
+                                          self._nodo_desconectado)
+            self.consola.iniciar()
+            self.telemetria.registrar_medidor("nodos_conectados", lambda: len(self.consola.nodos))
+            self.telemetria.registrar_medidor("lotes_recibidos_nodo", lambda: {
+                n: c["lotes"] for n, c in list(self.consola.nodos.items())}, etiqueta="nodo")
+        return self.consola.direccion
+
+    def _nodo_conectado(self, id_nodo, sesion, camaras):
+        """Registra las cámaras que anuncia un nodo (hilo de la conexión).
+
+        Una sesión nueva es un nodo reiniciado: las alertas de sus sesiones
+        anteriores ya no van a recibir actualizaciones y se olvidan.
+        """
+        with self._lock_remotas:
+            for clave in [c for c in self._alertas_remotas if c[0] == id_nodo and c[1] != sesion]:
+                del self._alertas_remotas[clave]
+        locales = []
+        for id_camara, nombre, ubicacion in camaras:
+            id_local = f"{id_nodo}/{id_camara}"
+            self.camaras_remotas[id_local] = id_nodo
+            locales.append((id_local, nombre, ubicacion))
+        self._notificar("nodo", id_nodo, locales, "Conectado")
+
+    def _nodo_desconectado(self, id_nodo):
+        """Avisa que un nodo se desconectó; sus cámaras quedan registradas hasta que vuelva."""
+        camaras = [(c, None, None) for c, n in list(self.camaras_remotas.items()) if n == id_nodo]
+        self._notificar("nodo", id_nodo, camaras, "Desconectado")
+
+    def _lote_remoto(self, id_nodo, sesion, alertas, estados, miniaturas):
+        """Aplica un lote de un nodo: alertas, estados de cámara y miniaturas."""
+        for registro in alertas:
+            self.registrar_alerta_remota(id_nodo, sesion, registro)
+        for id_camara, estado in estados:
+            id_local = f"{id_nodo}/{id_camara}"
+            if estado == "Quitada":
+                self.camaras_remotas.pop(id_local, None)
+            self._notificar("camara", id_local, estado)
+        if self._suscriptores["frame"]:
+            for id_camara, jpeg in miniaturas.items():
+                frame = decodificar_miniatura(jpeg)
+                if frame is not None:
+                    self._notificar("frame", f"{id_nodo}/{id_camara}", frame)
+
+    def registrar_alerta_remota(self, id_nodo, sesion, registro):
+        """Crea o actualiza la copia local de una alerta que generó un nodo de borde.
+
+        Se recuerdan las MAXIMO_ALERTAS_REMOTAS alertas remotas usadas más
+        recientemente; el nodo solo actualiza las que sigue agrupando, así que las
+        más viejas ya no hacen falta.
+        """
+        id_remoto, id_camara, tipo_anomalia, confianza, timestamp, ultimo, cantidad = registro
+        clave = (id_nodo, sesion, id_remoto)
+        with self._lock_remotas:
+            anterior = self._alertas_remotas.get(clave)
+            if anterior is not None:
+                self._alertas_remotas.move_to_end(clave)
+        alerta = self.modelo.registrar_alerta_remota(
+            f"{id_nodo}/{id_camara}", tipo_anomalia, confianza, datetime.datetime.fromtimestamp(timestamp),
+            cantidad, datetime.datetime.fromtimestamp(ultimo), anterior)
+        if anterior is not None:
+            self._notificar("alerta_actualizada", alerta)
+            return alerta
+
+        with self._lock_remotas:
+            self._alertas_remotas[clave] = alerta
+            while len(self._alertas_remotas) > MAXIMO_ALERTAS_REMOTAS:
+                self._alertas_remotas.popitem(last=False)
+        self.modelo.estado_sistema = "Alerta"
+        self._notificar("alerta", alerta)
+        self._notificar("estado", "Alerta")
+        return alerta
+
+    def _clip_guardado(self, alerta, ruta):
+        """Asocia a la alerta el clip que terminó de escribirse (hilo escritor)."""
+        self.modelo.asociar_clip(alerta.id_alerta, ruta)
+
+    def marcar_alerta_revisada(self, id_alerta):
+        """Marca una alerta como revisada."""
+        return self.modelo.marcar_alerta_revisada(id_alerta)
+
+    def cambiar_umbral(self, nuevo_umbral):
+        """Cambia el umbral de confianza de las alertas."""
+        return self.modelo.cambiar_umbral(nuevo_umbral)
+
+    def estadisticas_fps(self):
+        """Devuelve por cámara los fps objetivo y logrados del planificador."""
+        return self.planificador.estadisticas()
+
+    def estadisticas_umbrales(self):
+        """Devuelve por cámara y tipo el umbral, los candidatos y los que suprimió."""
+        return self.modelo.umbrales.estadisticas()
+
+    def alertas_suprimidas(self):
+        """Devuelve por cámara los eventos descartados por el límite de alertas."""
+        return dict(self.modelo.agregador.suprimidas)
+
+    def estadisticas_capturas(self):
+        """Devuelve por cámara real el estado de la conexión y sus contadores."""
+        return {id_camara: fuente.estadisticas() for id_camara, fuente in self.capturas_reales.items()}
+
+
+def ejecutar_sin_interfaz(camaras=None, duracion=None, procesos_analisis=0, ruta_diario="alertas.db",
+                          intervalo_reporte=5, fuentes=(), ruta_telemetria=None, carpeta_clips="clips",
+                          escuchar=None, central=None, id_nodo=None, ruta_config=None):
+    """Corre el monitoreo sin Tkinter e informa alertas y fps por la salida estándar.
+
+    camaras es el número de cámaras simuladas (por omisión, las del archivo ruta_config
+    con recarga en caliente o, sin él, las de la demostración, salvo que haya
+    fuentes); fuentes, una lista de índices de cámara, rutas de video o URLs;
+    duracion en segundos (None = hasta Ctrl+C). Con ruta_telemetria, las mediciones
+    se exportan en cada reporte (Prometheus si termina en .prom, si no JSON).
+
+    Con escuchar=(host, puerto) el motor además hace de consola central para nodos
+    de borde; con central=(host, puerto) corre como el nodo id_nodo y le envía sus
+    alertas y miniaturas.
+    """
+    motor = MotorMonitoreo(ruta_diario=ruta_diario, procesos_analisis=procesos_analisis,
+                           carpeta_clips=carpeta_clips)
+    if escuchar is not None:
+        host, puerto = motor.aceptar_nodos(escuchar)
+        print(f"Esperando nodos en {host}:{puerto}", flush=True)
+        motor.suscribir("nodo", lambda id_nodo, camaras, estado: print(
+            f"Nodo {id_nodo}: {estado} ({len(camaras)} cámaras)", flush=True))
+    for i, origen in enumerate(fuentes, 1):
+        if isinstance(origen, str) and origen.isdigit():
+            origen = int(origen)
+        if not motor.agregar_camara_real(f"real{i}", f"Fuente {i}", str(origen), origen):
+            print(f"No se pudo conectar a {origen}", flush=True)
+
+    if camaras is not None:
+        for i in range(1, camaras + 1):
+            motor.agregar_camara_simulada(f"sim{i}", f"Cam {i}", "Simulada")
+    elif ruta_config is not None:
+        motor.suscribir("configuracion", lambda mensaje, error: print(mensaje, flush=True))
+        motor.cargar_configuracion(ruta_config)
+    elif not fuentes:
+        for id_camara, nombre, ubicacion in CAMARAS_DEMO:
+            motor.agregar_camara_simulada(id_camara, nombre, ubicacion)
+
+    motor.suscribir("alerta", lambda alerta: print(
+        f"[{alerta.timestamp:%H:%M:%S}] Alerta {alerta.id_alerta}: {alerta.tipo_anomalia} "
+        f"en {alerta.id_camara} ({alerta.nivel_confianza}%)", flush=True))
+
+    # El nodo se anuncia a la consola con sus cámaras ya registradas
+    nodo = None
+    if central is not None:
+        nodo = NodoBorde(motor, id_nodo or "nodo", central)
+        nodo.iniciar()
+
+    motor.iniciar()
+    inicio = time.monotonic()
+    try:
+        while duracion is None or time.monotonic() - inicio < duracion:
+            espera = intervalo_reporte
+            if duracion is not None:
+                espera = min(espera, duracion - (time.monotonic() - inicio))
+            time.sleep(max(espera, 0))
+            estadisticas = motor.estadisticas_fps()
+            resumen = ", ".join(f"{c}: {e['fps_logrado']}/{e['fps_objetivo']}" for c, e in estadisticas.items())
+            if resumen:
+                print(f"fps logrado/objetivo -> {resumen}", flush=True)
+            if ruta_telemetria:
+                motor.telemetria.exportar(ruta_telemetria)
+            suprimidas = motor.alertas_suprimidas()
+            if suprimidas:
+                print("eventos suprimidos -> " + ", ".join(f"{c}: {n}" for c, n in suprimidas.items()), flush=True)
+            bajo_umbral = motor.modelo.umbrales.suprimidos_por_camara()
+            if any(bajo_umbral.values()):
+                print("candidatos bajo el umbral -> " + ", ".join(
+                    f"{c}: {n}" for c, n in bajo_umbral.items() if n), flush=True)
+            for id_camara, e in motor.estadisticas_capturas().items():
+                print(f"{id_camara}: {e['estado']}, {e['frames_leidos']} leídos, "
+                      f"{e['frames_descartados']} descartados, {e['reconexiones']} reconexiones, "
+                      f"latencia {e['latencia_ms']} ms", flush=True)
+            if nodo is not None:
+                e = nodo.estadisticas()
+                print(f"nodo {nodo.id_nodo}: {'conectado' if e['conectado'] else 'sin conexión'}, "
+                      f"{e['lotes_enviados']} lotes, {e['bytes_enviados']} bytes, "
+                      f"{e['lotes_sin_confirmar']} sin confirmar, {e['alertas_pendientes']} alertas pendientes",
+                      flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if nodo is not None:
+            nodo.detener()
+        motor.detener()
+        motor.cerrar()
+    return motor
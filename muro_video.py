@@ -0,0 +1,202 @@
+import math
+import tkinter as tk
+
+COLOR_FONDO = "#f0f0f0"
+ALTO_ENCABEZADO = 28  # Nombre de la cámara y botón Pausar sobre cada video
+MARGEN = 14  # Bordes y separación de cada celda de la grilla
+
+
+class _Mosaico:
+    """Widgets de una cámara dentro del muro de video."""
+
+    def __init__(self, parent, nombre, al_alternar, al_enfocar):
+        self.frame = tk.Frame(parent, borderwidth=1, relief="sunken", bg="white")
+
+        encabezado = tk.Frame(self.frame, bg="white")
+        encabezado.pack(fill="x")
+        self.etiqueta = tk.Label(encabezado, text=nombre, bg="white", font=("Arial", 9), anchor="w")
+        self.etiqueta.pack(side=tk.LEFT, padx=5, pady=2, fill="x", expand=True)
+        self.boton = None
+        if al_alternar is not None:
+            self.boton = tk.Button(encabezado, text="Pausar", font=("Arial", 8), command=al_alternar)
+            self.boton.pack(side=tk.RIGHT, padx=5, pady=2)
+
+        # El contenedor fija el tamaño en píxeles; el panel solo muestra la imagen
+        self.contenedor = tk.Frame(self.frame, width=200, height=150, bg="black")
+        self.contenedor.pack_propagate(False)
+        self.contenedor.pack(padx=5, pady=2)
+        self.panel = tk.Label(self.contenedor, bg="black")
+        self.panel.pack(fill=tk.BOTH, expand=True)
+        self.panel.bind("<Double-Button-1>", lambda e: al_enfocar())
+
+
+class MuroVideo:
+    def __init__(self, parent, por_pagina=9, relacion=4 / 3, al_alternar=None):
+        """Muro de video paginado con grilla adaptable y modo de enfoque.
+
+        Cada página muestra hasta por_pagina cámaras en una grilla casi cuadrada que
+        ocupa todo el espacio disponible; doble clic sobre un video lo agranda solo
+        en el muro y otro doble clic vuelve a la grilla. tamanos guarda el ancho y
+        alto en píxeles de cada cámara visible: las de otras páginas, las tapadas por
+        el enfoque y todas mientras la ventana está minimizada no figuran, así quien
+        convierte los frames sabe qué resolución necesita cada panel y cuáles puede
+        saltear. El diccionario se reemplaza entero en cada cambio, de modo que los
+        hilos del pipeline lo leen sin candado. al_alternar(id_camara) atiende el
+        botón Pausar/Reanudar de cada cámara.
+        """
+        self.por_pagina = por_pagina
+        self.relacion = relacion
+        self.al_alternar = al_alternar
+
+        self.paneles = {}  # id_camara -> tk.Label con el video (lo usa el compositor)
+        self.botones = {}  # id_camara -> botón Pausar/Reanudar
+        self.tamanos = {}  # id_camara -> (ancho, alto) de las cámaras visibles
+        self._mosaicos = {}  # id_camara -> _Mosaico, en orden de alta
+        self._pagina = 0
+        self._enfocada = None
+        self._minimizada = False
+        self._id_distribuir = None
+
+        self.frame = tk.Frame(parent, bg=COLOR_FONDO)
+        # La grilla no pide el tamaño de sus hijos: los videos se adaptan a ella y no al revés
+        self._grilla = tk.Frame(self.frame, bg=COLOR_FONDO, width=440, height=400)
+        self._grilla.grid_propagate(False)
+        self._grilla.pack(fill=tk.BOTH, expand=True)
+        self._grilla.bind("<Configure>", lambda e: self._programar_distribucion())
+
+        barra = tk.Frame(self.frame, bg=COLOR_FONDO)
+        barra.pack(fill="x", side=tk.BOTTOM)
+        self._btn_anterior = tk.Button(barra, text="◀", width=3, command=lambda: self.ir_a_pagina(self._pagina - 1))
+        self._btn_anterior.pack(side=tk.LEFT, padx=5)
+        self._etiqueta_pagina = tk.Label(barra, bg=COLOR_FONDO)
+        self._etiqueta_pagina.pack(side=tk.LEFT)
+        self._btn_siguiente = tk.Button(barra, text="▶", width=3, command=lambda: self.ir_a_pagina(self._pagina + 1))
+        self._btn_siguiente.pack(side=tk.LEFT, padx=5)
+        self._btn_grilla = tk.Button(barra, text="Volver a la grilla", command=lambda: self.enfocar(None))
+
+        # Minimizada la ventana no se muestra ningún video
+        ventana = parent.winfo_toplevel()
+        ventana.bind("<Unmap>", lambda e: self._cambiar_minimizada(e, True), add="+")
+        ventana.bind("<Map>", lambda e: self._cambiar_minimizada(e, False), add="+")
+
+    def pack(self, **kwargs):
+        """Coloca el muro en su contenedor."""
+        self.frame.pack(**kwargs)
+
+    def agregar(self, id_camara, nombre, pausable=True):
+        """Crea el mosaico de una cámara al final del muro (sin botón Pausar si no es pausable)."""
+        al_alternar = None
+        if pausable and self.al_alternar is not None:
+            al_alternar = lambda: self.al_alternar(id_camara)
+        self._mosaicos[id_camara] = mosaico = _Mosaico(
+            self._grilla, nombre, al_alternar,
+            lambda: self.enfocar(None if self._enfocada == id_camara else id_camara))
+        self.paneles[id_camara] = mosaico.panel
+        if mosaico.boton is not None:
+            self.botones[id_camara] = mosaico.boton
+        self._programar_distribucion()
+
+    def renombrar(self, id_camara, nombre):
+        """Cambia el nombre que muestra el mosaico de una cámara."""
+        mosaico = self._mosaicos.get(id_camara)
+        if mosaico is not None:
+            mosaico.etiqueta.config(text=nombre)
+
+    def quitar(self, id_camara):
+        """Elimina el mosaico de una cámara."""
+        mosaico = self._mosaicos.pop(id_camara, None)
+        if mosaico is None:
+            return
+        self.paneles.pop(id_camara, None)
+        self.botones.pop(id_camara, None)
+        mosaico.frame.destroy()
+        if self._enfocada == id_camara:
+            self._enfocada = None
+        self._programar_distribucion()
+
+    @property
+    def paginas(self):
+        """Cantidad de páginas de la grilla."""
+        return max(1, math.ceil(len(self._mosaicos) / self.por_pagina))
+
+    def ir_a_pagina(self, pagina):
+        """Muestra otra página de la grilla."""
+        pagina = min(max(pagina, 0), self.paginas - 1)
+        if pagina != self._pagina or self._enfocada is not None:
+            self._pagina = pagina
+            self._enfocada = None
+            self._programar_distribucion()
+
+    def enfocar(self, id_camara):
+        """Agranda una cámara a todo el muro, o vuelve a la grilla con None."""
+        if id_camara is not None and id_camara not in self._mosaicos:
+            return
+        self._enfocada = id_camara
+        self._programar_distribucion()
+
+    def visibles(self):
+        """Devuelve los IDs de las cámaras que se muestran ahora, en orden."""
+        if self._enfocada is not None:
+            return [self._enfocada]
+        inicio = self._pagina * self.por_pagina
+        return list(self._mosaicos)[inicio:inicio + self.por_pagina]
+
+    def _cambiar_minimizada(self, evento, minimizada):
+        """Atiende la minimización de la ventana (los eventos de los hijos se ignoran)."""
+        if evento.widget is self.frame.winfo_toplevel() and minimizada != self._minimizada:
+            self._minimizada = minimizada
+            self._programar_distribucion()
+
+    def _programar_distribucion(self):
+        """Agrupa varios cambios (altas, redimensionado, páginas) en una sola distribución."""
+        if self._id_distribuir is None:
+            self._id_distribuir = self.frame.after_idle(self._distribuir)
+
+    def _distribuir(self):
+        """Ubica los mosaicos visibles en la grilla y calcula el tamaño de cada video."""
+        self._id_distribuir = None
+        self._pagina = min(self._pagina, self.paginas - 1)
+        visibles = self.visibles()
+
+        for id_camara, mosaico in self._mosaicos.items():
+            if id_camara not in visibles:
+                mosaico.frame.grid_remove()
+
+        columnas = max(1, math.ceil(math.sqrt(len(visibles))))
+        filas = max(1, math.ceil(len(visibles) / columnas))
+        ancho, alto = self._tamano_celda(columnas, filas)
+
+        for i in range(max(columnas, self._grilla.grid_size()[0])):
+            self._grilla.grid_columnconfigure(i, weight=1 if i < columnas else 0)
+        for i in range(max(filas, self._grilla.grid_size()[1])):
+            self._grilla.grid_rowconfigure(i, weight=1 if i < filas else 0)
+
+        for i, id_camara in enumerate(visibles):
+            mosaico = self._mosaicos[id_camara]
+            mosaico.contenedor.configure(width=ancho, height=alto)
+            mosaico.frame.grid(row=i // columnas, column=i % columnas, padx=5, pady=5)
+
+        self.tamanos = {} if self._minimizada else {id_camara: (ancho, alto) for id_camara in visibles}
+        self._actualizar_barra()
+
+    def _tamano_celda(self, columnas, filas):
+        """Calcula el mayor tamaño de video con la relación de aspecto que entra en cada celda."""
+        ancho_celda = self._grilla.winfo_width() // columnas - MARGEN
+        alto_celda = self._grilla.winfo_height() // filas - MARGEN - ALTO_ENCABEZADO
+        if ancho_celda < 40 or alto_celda < 30:
+            return 200, 150  # Todavía sin geometría: el tamaño de siempre
+        ancho = min(ancho_celda, int(alto_celda * self.relacion))
+        ancho -= ancho % 2
+        return ancho, int(ancho / self.relacion) // 2 * 2
+
+    def _actualizar_barra(self):
+        """Refleja la página actual y el modo de enfoque en la barra inferior."""
+        self._etiqueta_pagina.config(text=f"Página {self._pagina + 1}/{self.paginas}")
+        estado_anterior = tk.NORMAL if self._pagina > 0 and self._enfocada is None else tk.DISABLED
+        estado_siguiente = tk.NORMAL if self._pagina < self.paginas - 1 and self._enfocada is None else tk.DISABLED
+        self._btn_anterior.config(state=estado_anterior)
+        self._btn_siguiente.config(state=estado_siguiente)
+        if self._enfocada is not None:
+            self._btn_grilla.pack(side=tk.RIGHT, padx=5)
+        else:
+            self._btn_grilla.pack_forget()
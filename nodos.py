@@ -0,0 +1,395 @@
+import json
+import time
+import uuid
+import select
+import socket
+import struct
+import threading
+import traceback
+from collections import deque
+import cv2
+import numpy as np
+
+PUERTO_NODOS = 8765
+
+# Cada mensaje es el largo del encabezado JSON y el de los datos binarios, seguidos de ambos
+_PREFIJO = struct.Struct("!II")
+TAMANO_MAXIMO = 16 * 1024 * 1024  # Un mensaje más grande se toma como error de protocolo
+
+
+def enviar_mensaje(conexion, encabezado, datos=b""):
+    """Envía un mensaje: encabezado JSON y datos binarios opcionales. Devuelve los bytes enviados."""
+    texto = json.dumps(encabezado, separators=(",", ":")).encode("utf-8")
+    mensaje = _PREFIJO.pack(len(texto), len(datos)) + texto + datos
+    conexion.sendall(mensaje)
+    return len(mensaje)
+
+
+def recibir_mensaje(conexion):
+    """Lee un mensaje completo; devuelve (encabezado, datos) o None si se cerró la conexión."""
+    prefijo = _recibir_exacto(conexion, _PREFIJO.size)
+    if prefijo is None:
+        return None
+    largo_texto, largo_datos = _PREFIJO.unpack(prefijo)
+    if largo_texto + largo_datos > TAMANO_MAXIMO:
+        raise ValueError(f"Mensaje de {largo_texto + largo_datos} bytes, el máximo es {TAMANO_MAXIMO}")
+    cuerpo = _recibir_exacto(conexion, largo_texto + largo_datos)
+    if cuerpo is None:
+        return None
+    return json.loads(cuerpo[:largo_texto]), cuerpo[largo_texto:]
+
+
+def _recibir_exacto(conexion, largo):
+    """Lee exactamente largo bytes; devuelve None si la conexión se cierra antes."""
+    buffer = bytearray(largo)
+    vista = memoryview(buffer)
+    leidos = 0
+    while leidos < largo:
+        n = conexion.recv_into(vista[leidos:])
+        if n == 0:
+            return None
+        leidos += n
+    return bytes(buffer)
+
+
+def registro_alerta(alerta):
+    """Resume una alerta en una lista compacta para enviarla a la consola."""
+    return [alerta.id_alerta, alerta.id_camara, alerta.tipo_anomalia, alerta.nivel_confianza,
+            alerta.timestamp.timestamp(), alerta.ultimo.timestamp(), alerta.cantidad]
+
+
+def decodificar_miniatura(jpeg):
+    """Convierte una miniatura JPEG recibida en un frame BGR (None si está dañada)."""
+    return cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class NodoBorde:
+    def __init__(self, motor, id_nodo, direccion=("127.0.0.1", PUERTO_NODOS), intervalo_lote=0.25,
+                 fps_miniaturas=2, ancho=160, alto=120, calidad=70, ventana=4, max_alertas=1000,
+                 timeout=5.0, reintento_inicial=0.5, reintento_maximo=10.0):
+        """Envía a una consola central las alertas y miniaturas de un motor local.
+
+        El nodo corre la captura y la detección de sus cámaras; a la consola solo le
+        llegan registros compactos de alertas y miniaturas JPEG de ancho x alto a
+        fps_miniaturas por cámara. Lo pendiente se junta y sale en un lote cada
+        intervalo_lote segundos por una conexión TCP. La consola confirma cada lote
+        después de procesarlo y el nodo no deja más de ventana lotes sin confirmar:
+        si la consola se atrasa, el nodo deja de enviar, las miniaturas pendientes se
+        reemplazan por la más reciente de cada cámara y las alertas se acumulan hasta
+        max_alertas (una actualización reemplaza al registro pendiente de la misma
+        alerta). Las alertas de lotes sin confirmar se reenvían al reconectar; la
+        conexión se reintenta con espera exponencial.
+        """
+        self.motor = motor
+        self.id_nodo = id_nodo
+        self.direccion = direccion
+        self.intervalo_lote = intervalo_lote
+        self.periodo_miniaturas = 1.0 / fps_miniaturas
+        self.ancho = ancho
+        self.alto = alto
+        self.calidad = calidad
+        self.ventana = ventana
+        self.max_alertas = max_alertas
+        self.timeout = timeout
+        self.reintento_inicial = reintento_inicial
+        self.reintento_maximo = reintento_maximo
+        self.sesion = uuid.uuid4().hex  # Distingue los IDs de alerta de un reinicio del nodo
+
+        self.conectado = False
+        self.lotes_enviados = 0
+        self.bytes_enviados = 0
+        self.reconexiones = 0
+        self.alertas_descartadas = 0  # Alertas pendientes perdidas por superar max_alertas
+        self.miniaturas_reemplazadas = 0  # Miniaturas pisadas por otra más nueva antes de salir
+        self.esperas_confirmacion = 0  # Veces que el envío se frenó por la ventana llena
+
+        self._alertas = {}  # id_alerta -> registro pendiente
+        self._miniaturas = {}  # id_camara -> JPEG pendiente
+        self._estados = {}  # id_camara -> estado pendiente
+        self._ultima_miniatura = {}  # id_camara -> momento de la última miniatura
+        self._sin_confirmar = deque()  # (secuencia, alertas) de los lotes enviados
+        self._secuencia = 0
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+
+        for nombre in ("lotes_sin_confirmar", "bytes_enviados", "alertas_descartadas", "miniaturas_reemplazadas",
+                       "esperas_confirmacion"):
+            motor.telemetria.registrar_medidor(f"nodo_{nombre}", lambda n=nombre: self.estadisticas()[n])
+
+        motor.suscribir("alerta", self._encolar_alerta)
+        motor.suscribir("alerta_actualizada", self._encolar_alerta)
+        motor.suscribir("frame", self._encolar_miniatura)
+        motor.suscribir("camara", self._encolar_estado)
+
+    def iniciar(self):
+        """Arranca el hilo que conecta con la consola y envía los lotes."""
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle_envio, name=f"nodo-{self.id_nodo}", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout=1.0):
+        """Detiene el envío y cierra la conexión. Devuelve True si el hilo terminó."""
+        self._detener.set()
+        if self._hilo is None:
+            return True
+        self._hilo.join(timeout)
+        return not self._hilo.is_alive()
+
+    def estadisticas(self):
+        """Devuelve el estado de la conexión y los contadores de envío."""
+        with self._lock:
+            pendientes = len(self._alertas)
+        return {
+            "conectado": self.conectado,
+            "lotes_enviados": self.lotes_enviados,
+            "bytes_enviados": self.bytes_enviados,
+            "lotes_sin_confirmar": len(self._sin_confirmar),
+            "alertas_pendientes": pendientes,
+            "alertas_descartadas": self.alertas_descartadas,
+            "miniaturas_reemplazadas": self.miniaturas_reemplazadas,
+            "esperas_confirmacion": self.esperas_confirmacion,
+            "reconexiones": self.reconexiones,
+        }
+
+    def _encolar_alerta(self, alerta):
+        """Deja el registro de una alerta nueva o actualizada para el próximo lote."""
+        registro = registro_alerta(alerta)
+        with self._lock:
+            self._alertas.pop(alerta.id_alerta, None)
+            self._alertas[alerta.id_alerta] = registro
+            if len(self._alertas) > self.max_alertas:
+                del self._alertas[next(iter(self._alertas))]
+                self.alertas_descartadas += 1
+
+    def _encolar_miniatura(self, id_camara, frame):
+        """Comprime una miniatura del frame si le toca a la cámara (corre en el pipeline)."""
+        # Sin conexión o con la ventana llena no se gasta en comprimir lo que no saldrá
+        if not self.conectado or len(self._sin_confirmar) >= self.ventana:
+            return
+        ahora = time.monotonic()
+        if ahora - self._ultima_miniatura.get(id_camara, 0.0) < self.periodo_miniaturas:
+            return
+        self._ultima_miniatura[id_camara] = ahora
+
+        reducido = cv2.resize(frame, (self.ancho, self.alto), interpolation=cv2.INTER_AREA)
+        ok, jpeg = cv2.imencode(".jpg", reducido, [cv2.IMWRITE_JPEG_QUALITY, self.calidad])
+        if not ok:
+            return
+        with self._lock:
+            if id_camara in self._miniaturas:
+                self.miniaturas_reemplazadas += 1
+            self._miniaturas[id_camara] = jpeg.tobytes()
+
+    def _encolar_estado(self, id_camara, estado):
+        """Deja el nuevo estado de una cámara para el próximo lote."""
+        with self._lock:
+            self._estados[id_camara] = estado
+
+    def _camaras(self):
+        """Lista las cámaras del motor como [id, nombre, ubicación]."""
+        return [[c["id"], c["nombre"], c["ubicacion"]] for c in list(self.motor.modelo.camaras_activas.values())]
+
+    def _bucle_envio(self):
+        """Conecta con la consola, envía lotes y reconecta si la conexión se pierde."""
+        espera = self.reintento_inicial
+        while not self._detener.is_set():
+            try:
+                conexion = socket.create_connection(self.direccion, timeout=self.timeout)
+            except OSError:
+                self._detener.wait(espera)
+                espera = min(espera * 2, self.reintento_maximo)
+                continue
+
+            espera = self.reintento_inicial
+            try:
+                self._atender_conexion(conexion)
+            except (OSError, ValueError):
+                pass
+            finally:
+                self.conectado = False
+                conexion.close()
+                self._recuperar_sin_confirmar()
+            if not self._detener.is_set():
+                self.reconexiones += 1
+
+    def _atender_conexion(self, conexion):
+        """Saluda a la consola y le envía un lote por intervalo mientras haya conexión."""
+        camaras = self._camaras()
+        enviar_mensaje(conexion, {"tipo": "hola", "nodo": self.id_nodo, "sesion": self.sesion, "camaras": camaras})
+        self.conectado = True
+
+        while not self._detener.wait(self.intervalo_lote):
+            self._leer_confirmaciones(conexion, 0)
+            while len(self._sin_confirmar) >= self.ventana:
+                # La consola no da abasto: no se envía nada hasta que confirme
+                self.esperas_confirmacion += 1
+                if self._detener.is_set():
+                    return
+                self._leer_confirmaciones(conexion, self.intervalo_lote)
+
+            # Las cámaras agregadas o quitadas en el nodo se anuncian con otro saludo
+            actuales = self._camaras()
+            if actuales != camaras:
+                camaras = actuales
+                enviar_mensaje(conexion, {"tipo": "hola", "nodo": self.id_nodo, "sesion": self.sesion,
+                                          "camaras": camaras})
+
+            with self._lock:
+                alertas, self._alertas = self._alertas, {}
+                miniaturas, self._miniaturas = self._miniaturas, {}
+                estados, self._estados = self._estados, {}
+            if not (alertas or miniaturas or estados):
+                continue
+
+            self._secuencia += 1
+            encabezado = {
+                "tipo": "lote",
+                "secuencia": self._secuencia,
+                "alertas": list(alertas.values()),
+                "estados": list(estados.items()),
+                "miniaturas": [[id_camara, len(jpeg)] for id_camara, jpeg in miniaturas.items()],
+            }
+            self._sin_confirmar.append((self._secuencia, alertas))
+            self.bytes_enviados += enviar_mensaje(conexion, encabezado, b"".join(miniaturas.values()))
+            self.lotes_enviados += 1
+
+    def _leer_confirmaciones(self, conexion, espera):
+        """Atiende las confirmaciones que mandó la consola, esperando hasta espera segundos."""
+        while select.select([conexion], [], [], espera)[0]:
+            mensaje = recibir_mensaje(conexion)
+            if mensaje is None:
+                raise ConnectionError("La consola cerró la conexión")
+            encabezado, _ = mensaje
+            if encabezado.get("tipo") == "ack":
+                while self._sin_confirmar and self._sin_confirmar[0][0] <= encabezado["secuencia"]:
+                    self._sin_confirmar.popleft()
+            espera = 0
+
+    def _recuperar_sin_confirmar(self):
+        """Vuelve a dejar pendientes las alertas de los lotes que la consola no confirmó."""
+        with self._lock:
+            while self._sin_confirmar:
+                _, alertas = self._sin_confirmar.popleft()
+                for id_alerta, registro in alertas.items():
+                    # Si ya hay un registro más nuevo de la misma alerta, ese gana
+                    self._alertas.setdefault(id_alerta, registro)
+
+
+class ConsolaCentral:
+    def __init__(self, direccion=("127.0.0.1", PUERTO_NODOS), al_conectar=None, al_lote=None,
+                 al_desconectar=None):
+        """Servidor de la consola central que recibe los lotes de los nodos de borde.
+
+        Cada nodo tiene su propio hilo de conexión. al_conectar(id_nodo, sesion,
+        camaras) se llama con cada saludo, al_lote(id_nodo, sesion, alertas, estados,
+        miniaturas) con cada lote (miniaturas es un dict id_camara -> JPEG) y
+        al_desconectar(id_nodo) al cerrarse la conexión. El lote se confirma recién
+        después de procesarlo, así una consola atrasada frena a los nodos en lugar
+        de acumular lotes en memoria. Con puerto 0 el sistema elige uno libre;
+        direccion queda con el real después de iniciar().
+        """
+        self.direccion = direccion
+        self.al_conectar = al_conectar
+        self.al_lote = al_lote
+        self.al_desconectar = al_desconectar
+
+        self.nodos = {}  # id_nodo -> {"lotes": n, "bytes": n} de los nodos conectados
+        self._servidor = None
+        self._conexiones = set()
+        self._hilos = []
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Empieza a aceptar conexiones de nodos."""
+        if self._servidor is not None:
+            return
+        self._servidor = socket.create_server(self.direccion)
+        self.direccion = self._servidor.getsockname()[:2]
+        hilo = threading.Thread(target=self._aceptar, name="consola-aceptar", daemon=True)
+        hilo.start()
+        self._hilos.append(hilo)
+
+    def detener(self, timeout=1.0):
+        """Cierra el servidor y las conexiones. Devuelve True si todos los hilos terminaron."""
+        if self._servidor is None:
+            return True
+        servidor, self._servidor = self._servidor, None
+        with self._lock:
+            conexiones = list(self._conexiones)
+        # En Linux cerrar el socket no despierta a accept(); shutdown sí
+        for conexion in [servidor] + conexiones:
+            try:
+                conexion.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        servidor.close()
+
+        limite = time.monotonic() + timeout
+        for hilo in self._hilos:
+            hilo.join(max(limite - time.monotonic(), 0))
+        vivos = [h for h in self._hilos if h.is_alive()]
+        self._hilos = vivos
+        return not vivos
+
+    def _aceptar(self):
+        """Acepta nodos hasta que se cierra el servidor."""
+        servidor = self._servidor
+        while True:
+            try:
+                conexion, _ = servidor.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._conexiones.add(conexion)
+            hilo = threading.Thread(target=self._atender, args=(conexion,), name="consola-nodo", daemon=True)
+            hilo.start()
+            self._hilos = [h for h in self._hilos if h.is_alive()] + [hilo]
+
+    def _atender(self, conexion):
+        """Lee los mensajes de un nodo y confirma cada lote procesado."""
+        id_nodo = sesion = None
+        try:
+            while True:
+                mensaje = recibir_mensaje(conexion)
+                if mensaje is None:
+                    break
+                encabezado, datos = mensaje
+                tipo = encabezado.get("tipo")
+                if tipo == "hola":
+                    id_nodo, sesion = str(encabezado["nodo"]), encabezado.get("sesion")
+                    self.nodos[id_nodo] = {"lotes": 0, "bytes": 0}
+                    self._llamar(self.al_conectar, id_nodo, sesion, encabezado.get("camaras", []))
+                elif tipo == "lote" and id_nodo is not None:
+                    miniaturas = {}
+                    posicion = 0
+                    for id_camara, largo in encabezado.get("miniaturas", ()):
+                        miniaturas[id_camara] = datos[posicion:posicion + largo]
+                        posicion += largo
+                    self._llamar(self.al_lote, id_nodo, sesion, encabezado.get("alertas", ()),
+                                 encabezado.get("estados", ()), miniaturas)
+                    enviar_mensaje(conexion, {"tipo": "ack", "secuencia": encabezado["secuencia"]})
+                    contadores = self.nodos[id_nodo]
+                    contadores["lotes"] += 1
+                    contadores["bytes"] += len(datos)
+        except (OSError, ValueError, KeyError):
+            pass
+        finally:
+            with self._lock:
+                self._conexiones.discard(conexion)
+            conexion.close()
+            if id_nodo is not None:
+                self.nodos.pop(id_nodo, None)
+                self._llamar(self.al_desconectar, id_nodo)
+
+    @staticmethod
+    def _llamar(funcion, *args):
+        """Llama a un aviso sin que un error suyo corte la conexión con el nodo."""
+        if funcion is None:
+            return
+        try:
+            funcion(*args)
+        except Exception:
+            traceback.print_exc()
@@ -0,0 +1,118 @@
+import heapq
+import tkinter as tk
+
+COLOR_FONDO = "#ffcccc"
+
+
+class _FilaAlerta:
+    """Widgets reutilizables de una alerta activa."""
+
+    def __init__(self, parent, al_revisar):
+        self.id_alerta = None
+        self.frame = tk.Frame(parent, bg=COLOR_FONDO, pady=5)
+        self.etiqueta = tk.Label(self.frame, bg=COLOR_FONDO, fg="red", font=("Arial", 10, "bold"), anchor="w")
+        self.etiqueta.pack(side=tk.LEFT, padx=5, fill="x", expand=True)
+        tk.Button(self.frame, text="Revisar", command=lambda: al_revisar(self.id_alerta)).pack(side=tk.RIGHT, padx=5)
+        self.visible = False
+
+
+class PanelAlertasActivas:
+    def __init__(self, parent, filas=4, intervalo_refresco=250, al_revisar=None):
+        """Panel de alertas activas con un número fijo de filas reutilizables.
+
+        Las alertas pendientes se guardan en un diccionario por ID; en cada refresco
+        se muestran las filas más prioritarias (mayor confianza y, a igual confianza,
+        el evento más reciente) y el resto se resume en una línea "N más". Los widgets
+        se crean una sola vez, así el costo de dibujar el panel no depende de cuántas
+        alertas haya pendientes. Los cambios se agrupan en un refresco programado.
+        al_revisar(id_alerta) se llama al pulsar "Revisar" en una fila.
+        """
+        self.al_revisar = al_revisar
+        self.intervalo_refresco = intervalo_refresco
+        self._pendientes = {}  # id_alerta -> alerta
+        self._id_refresco = None
+
+        self.frame = tk.Frame(parent, bg=COLOR_FONDO, height=120)
+        self._filas = [_FilaAlerta(self.frame, self._revisar) for _ in range(filas)]
+        self._resumen = tk.Label(self.frame, bg=COLOR_FONDO, fg="red", font=("Arial", 9, "italic"), anchor="w")
+        self._resumen_visible = False
+
+    def pack(self, **kwargs):
+        """Coloca el panel en su contenedor."""
+        self.frame.pack(**kwargs)
+
+    def agregar(self, alerta):
+        """Agrega una alerta nueva a las pendientes."""
+        self._pendientes[alerta.id_alerta] = alerta
+        self._programar_refresco()
+
+    def actualizar(self, alerta):
+        """Vuelve a dibujar una alerta que cambió (por ejemplo, agrupó otro evento)."""
+        if alerta.id_alerta in self._pendientes:
+            self._programar_refresco()
+
+    def quitar(self, id_alerta):
+        """Saca una alerta de las pendientes."""
+        if self._pendientes.pop(id_alerta, None) is not None:
+            self._programar_refresco()
+
+    def __len__(self):
+        return len(self._pendientes)
+
+    def _revisar(self, id_alerta):
+        """Atiende el botón "Revisar" de una fila."""
+        if id_alerta is None:
+            return
+        self.quitar(id_alerta)
+        if self.al_revisar is not None:
+            self.al_revisar(id_alerta)
+
+    def _programar_refresco(self):
+        """Agrupa varios cambios en un solo refresco del panel."""
+        if self._id_refresco is None:
+            self._id_refresco = self.frame.after(self.intervalo_refresco, self._refrescar)
+
+    def _refrescar(self):
+        """Asigna las alertas más prioritarias a las filas y actualiza el resumen."""
+        self._id_refresco = None
+
+        # Las alertas revisadas desde el historial también salen del panel
+        revisadas = [i for i, a in self._pendientes.items() if a.estado != "Nueva"]
+        for id_alerta in revisadas:
+            del self._pendientes[id_alerta]
+
+        visibles = heapq.nlargest(len(self._filas), self._pendientes.values(),
+                                  key=lambda a: (a.nivel_confianza, a.ultimo, a.id_alerta))
+
+        for i, fila in enumerate(self._filas):
+            if i < len(visibles):
+                alerta = visibles[i]
+                fila.id_alerta = alerta.id_alerta
+                fila.etiqueta.config(text=texto_alerta(alerta))
+                if not fila.visible:
+                    fila.frame.pack(fill="x", padx=5, pady=2, before=self._resumen if self._resumen_visible else None)
+                    fila.visible = True
+            else:
+                fila.id_alerta = None
+                if fila.visible:
+                    fila.frame.pack_forget()
+                    fila.visible = False
+
+        ocultas = len(self._pendientes) - len(visibles)
+        if ocultas > 0:
+            self._resumen.config(text=f"{ocultas} más")
+            if not self._resumen_visible:
+                self._resumen.pack(fill="x", padx=10)
+                self._resumen_visible = True
+        elif self._resumen_visible:
+            self._resumen.pack_forget()
+            self._resumen_visible = False
+
+
+def texto_alerta(alerta):
+    """Devuelve el texto de una alerta activa, con la cuenta de eventos si hay varios."""
+    texto = (f"¡ALERTA! {alerta.tipo_anomalia} detectado en Cámara {alerta.id_camara.replace('sim', '')} "
+             f"({alerta.nivel_confianza}%)")
+    if alerta.cantidad > 1:
+        texto += f" (x{alerta.cantidad}, {alerta.timestamp:%H:%M:%S}-{alerta.ultimo:%H:%M:%S})"
+    return texto
@@ -0,0 +1,169 @@
+import time
+import queue
+import sqlite3
+import datetime
+import threading
+from alertas import Alerta
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS alertas (
+    id_alerta INTEGER PRIMARY KEY,
+    id_camara TEXT NOT NULL,
+    tipo_anomalia TEXT NOT NULL,
+    nivel_confianza INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    estado TEXT NOT NULL,
+    clip TEXT,
+    cantidad INTEGER NOT NULL DEFAULT 1,
+    ultimo REAL
+);
+CREATE INDEX IF NOT EXISTS idx_alertas_timestamp ON alertas (timestamp);
+CREATE INDEX IF NOT EXISTS idx_alertas_camara ON alertas (id_camara, timestamp);
+"""
+
+_COLUMNAS = "id_alerta, id_camara, tipo_anomalia, nivel_confianza, timestamp, estado, clip, cantidad, ultimo"
+
+# Columnas agregadas después de la primera versión del esquema
+_COLUMNAS_NUEVAS = {"clip": "TEXT", "cantidad": "INTEGER NOT NULL DEFAULT 1", "ultimo": "REAL"}
+
+
+class DiarioAlertas:
+    def __init__(self, ruta="alertas.db", tam_lote=200, intervalo_lote=0.5, reintentos=3):
+        """Diario de alertas en SQLite con escritura por lotes en un hilo propio.
+
+        guardar() solo encola la alerta, así ni las cámaras ni la interfaz esperan al
+        disco. El hilo de escritura junta hasta tam_lote alertas (o lo que llegue en
+        intervalo_lote segundos) y las escribe en una sola transacción. Las consultas
+        usan la llave primaria o los índices por tiempo y cámara, de modo que cargar
+        las alertas recientes no depende del tamaño total del historial.
+
+        Si escribir un lote falla (base bloqueada, disco lleno), se reintenta hasta
+        reintentos veces con espera creciente y después se descarta; el hilo sigue
+        con los lotes siguientes y lotes_fallidos y alertas_perdidas lo cuentan.
+        """
+        self.ruta = ruta
+        self.tam_lote = tam_lote
+        self.intervalo_lote = intervalo_lote
+        self.reintentos = reintentos
+        self.lotes_fallidos = 0  # Intentos de escritura que fallaron
+        self.alertas_perdidas = 0  # Alertas de lotes descartados tras agotar los reintentos
+        self.ultimo_error = None
+
+        self._lectura = sqlite3.connect(ruta, check_same_thread=False)
+        self._lectura.execute("PRAGMA journal_mode=WAL")
+        self._lectura.executescript(_ESQUEMA)
+        columnas = {fila[1] for fila in self._lectura.execute("PRAGMA table_info(alertas)")}
+        for columna, tipo in _COLUMNAS_NUEVAS.items():
+            if columna not in columnas:
+                # Diario creado con una versión anterior del esquema
+                self._lectura.execute(f"ALTER TABLE alertas ADD COLUMN {columna} {tipo}")
+        self._lectura.commit()
+        self._lock_lectura = threading.Lock()
+
+        self._cola = queue.Queue()
+        self._hilo = threading.Thread(target=self._bucle_escritura, name="diario-alertas", daemon=True)
+        self._hilo.start()
+
+    def guardar(self, alerta):
+        """Encola una alerta nueva o modificada para escribirla en disco."""
+        self._cola.put(alerta)
+
+    def pendientes(self):
+        """Devuelve cuántas alertas esperan ser escritas."""
+        return self._cola.qsize()
+
+    def cargar_recientes(self, limite):
+        """Devuelve las últimas alertas guardadas, de la más vieja a la más nueva."""
+        with self._lock_lectura:
+            filas = self._lectura.execute(
+                f"SELECT {_COLUMNAS} FROM alertas ORDER BY id_alerta DESC LIMIT ?", (limite,)).fetchall()
+        return [self._a_alerta(fila) for fila in reversed(filas)]
+
+    def cargar_anteriores(self, id_alerta, limite):
+        """Devuelve hasta limite alertas con ID menor que id_alerta, de la más vieja a la más nueva."""
+        with self._lock_lectura:
+            filas = self._lectura.execute(
+                f"SELECT {_COLUMNAS} FROM alertas WHERE id_alerta < ? ORDER BY id_alerta DESC LIMIT ?",
+                (id_alerta, limite)).fetchall()
+        return [self._a_alerta(fila) for fila in reversed(filas)]
+
+    def consultar_rango(self, desde, hasta, id_camara=None, limite=None):
+        """Devuelve las alertas entre dos fechas, opcionalmente de una sola cámara."""
+        consulta = f"SELECT {_COLUMNAS} FROM alertas WHERE timestamp BETWEEN ? AND ?"
+        parametros = [desde.timestamp(), hasta.timestamp()]
+        if id_camara is not None:
+            consulta += " AND id_camara = ?"
+            parametros.append(id_camara)
+        consulta += " ORDER BY timestamp"
+        if limite is not None:
+            consulta += " LIMIT ?"
+            parametros.append(limite)
+
+        with self._lock_lectura:
+            filas = self._lectura.execute(consulta, parametros).fetchall()
+        return [self._a_alerta(fila) for fila in filas]
+
+    def cerrar(self, timeout=5):
+        """Escribe lo pendiente y cierra el diario."""
+        self._cola.put(None)
+        self._hilo.join(timeout)
+        with self._lock_lectura:
+            self._lectura.close()
+
+    def _a_alerta(self, fila):
+        """Construye una Alerta a partir de una fila de la tabla."""
+        id_alerta, id_camara, tipo_anomalia, nivel_confianza, timestamp, estado, clip, cantidad, ultimo = fila
+        return Alerta(id_alerta, id_camara, tipo_anomalia, nivel_confianza,
+                      datetime.datetime.fromtimestamp(timestamp), estado, clip, cantidad,
+                      datetime.datetime.fromtimestamp(ultimo) if ultimo is not None else None)
+
+    def _bucle_escritura(self):
+        """Escribe las alertas encoladas en lotes."""
+        conexion = sqlite3.connect(self.ruta)
+        try:
+            terminar = False
+            while not terminar:
+                lote = [self._cola.get()]
+                limite = time.monotonic() + self.intervalo_lote
+                try:
+                    while len(lote) < self.tam_lote and lote[-1] is not None:
+                        lote.append(self._cola.get(timeout=max(limite - time.monotonic(), 0)))
+                except queue.Empty:
+                    pass
+
+                if lote[-1] is None:
+                    terminar = True
+                    lote.pop()
+
+                if lote:
+                    # Una alerta que cambió varias veces en el lote se escribe una sola vez
+                    unicas = {a.id_alerta: a for a in lote}
+                    self._escribir_lote(conexion, list(unicas.values()))
+        finally:
+            conexion.close()
+
+    def _escribir_lote(self, conexion, alertas):
+        """Escribe un lote en una transacción; lo reintenta si falla y al final lo descarta."""
+        filas = [(a.id_alerta, a.id_camara, a.tipo_anomalia, a.nivel_confianza, a.timestamp.timestamp(),
+                  a.estado, a.clip, a.cantidad, a.ultimo.timestamp()) for a in alertas]
+        espera = 0.1
+        for intento in range(self.reintentos + 1):
+            try:
+                conexion.executemany(
+                    f"INSERT OR REPLACE INTO alertas ({_COLUMNAS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", filas)
+                conexion.commit()
+                return True
+            except sqlite3.Error as e:
+                self.lotes_fallidos += 1
+                self.ultimo_error = str(e)
+                try:
+                    conexion.rollback()
+                except sqlite3.Error:
+                    pass
+            if intento < self.reintentos:
+                time.sleep(espera)
+                espera *= 2
+
+        self.alertas_perdidas += len(alertas)
+        print(f"Diario de alertas: se descartó un lote de {len(alertas)} alertas: {self.ultimo_error}", flush=True)
+        return False
@@ -0,0 +1,123 @@
+import time
+import threading
+
+
+class _EstadoCamara:
+    """Estado de planificación de una cámara."""
+    __slots__ = ("alta", "ultima_actividad", "ultimo_frame", "fps_logrado")
+
+    def __init__(self, ahora):
+        self.alta = ahora  # Momento en que la cámara entró al planificador
+        self.ultima_actividad = None
+        self.ultimo_frame = None
+        self.fps_logrado = 0.0
+
+
+class PlanificadorAdaptativo:
+    def __init__(self, fps_activa=15, fps_normal=10, fps_inactiva=2, segundos_actividad=5,
+                 segundos_inactividad=30, retraso_objetivo=0.2, factor_minimo=0.2):
+        """Decide cada cuánto se captura cada cámara.
+
+        Una cámara con movimiento o alertas recientes (últimos segundos_actividad) se
+        muestrea a fps_activa; tras segundos_inactividad sin actividad baja a
+        fps_inactiva. Además hay un factor global: si el retraso entre captura y fin del
+        procesamiento supera retraso_objetivo, todas las cámaras bajan su frecuencia, y
+        se recupera poco a poco cuando el sistema se pone al día.
+
+        configurar_camara() le da a una cámara su propia frecuencia normal; sus
+        frecuencias activa e inactiva se escalan en la misma proporción.
+        """
+        self.fps_activa = fps_activa
+        self.fps_normal = fps_normal
+        self.fps_inactiva = fps_inactiva
+        self.segundos_actividad = segundos_actividad
+        self.segundos_inactividad = segundos_inactividad
+        self.retraso_objetivo = retraso_objetivo
+        self.factor_minimo = factor_minimo
+
+        self.factor_global = 1.0
+        self.retraso_promedio = 0.0
+        self._camaras = {}
+        self._fps_camara = {}  # id_camara -> fps normal propio (se conserva al pausar)
+        self._lock = threading.Lock()
+
+    def agregar_camara(self, id_camara):
+        """Empieza a planificar una cámara con frecuencia normal."""
+        with self._lock:
+            self._camaras.setdefault(id_camara, _EstadoCamara(time.monotonic()))
+
+    def quitar_camara(self, id_camara):
+        """Deja de planificar una cámara."""
+        with self._lock:
+            self._camaras.pop(id_camara, None)
+
+    def configurar_camara(self, id_camara, fps):
+        """Fija la frecuencia normal de una cámara (None = la general)."""
+        if fps is None:
+            self._fps_camara.pop(id_camara, None)
+        else:
+            self._fps_camara[id_camara] = fps
+
+    def fps_objetivo(self, id_camara, ahora=None):
+        """Devuelve la frecuencia de captura que le toca a una cámara."""
+        escala = self._fps_camara.get(id_camara, self.fps_normal) / self.fps_normal
+        estado = self._camaras.get(id_camara)
+        if estado is None:
+            return self.fps_normal * escala * self.factor_global
+        if ahora is None:
+            ahora = time.monotonic()
+
+        actividad = estado.ultima_actividad
+        if actividad is not None and ahora - actividad < self.segundos_actividad:
+            fps = self.fps_activa
+        elif ahora - (actividad or estado.alta) < self.segundos_inactividad:
+            fps = self.fps_normal
+        else:
+            fps = self.fps_inactiva
+        return fps * escala * self.factor_global
+
+    def intervalo(self, id_camara):
+        """Devuelve los segundos hasta la siguiente captura de una cámara."""
+        return 1.0 / max(self.fps_objetivo(id_camara), 0.1)
+
+    def registrar_actividad(self, id_camara):
+        """Indica que la cámara tuvo movimiento o una alerta."""
+        estado = self._camaras.get(id_camara)
+        if estado is not None:
+            estado.ultima_actividad = time.monotonic()
+
+    def registrar_frame(self, id_camara, retraso):
+        """Registra un frame procesado y su retraso desde la captura (en segundos)."""
+        ahora = time.monotonic()
+        with self._lock:
+            estado = self._camaras.get(id_camara)
+            if estado is None:
+                return
+            if estado.ultimo_frame is not None and ahora > estado.ultimo_frame:
+                fps = 1.0 / (ahora - estado.ultimo_frame)
+                estado.fps_logrado += 0.2 * (fps - estado.fps_logrado)
+            estado.ultimo_frame = ahora
+
+            # Retroceso global cuando el procesamiento se atrasa
+            self.retraso_promedio += 0.1 * (retraso - self.retraso_promedio)
+            if self.retraso_promedio > self.retraso_objetivo:
+                self.factor_global = max(self.factor_minimo, self.factor_global * 0.95)
+            elif self.retraso_promedio < self.retraso_objetivo / 2:
+                self.factor_global = min(1.0, self.factor_global * 1.01)
+
+    def estadisticas(self):
+        """Devuelve por cámara la frecuencia objetivo y la lograda."""
+        ahora = time.monotonic()
+        with self._lock:
+            camaras = list(self._camaras.items())
+        estadisticas = {}
+        for id_camara, estado in camaras:
+            fps_logrado = estado.fps_logrado
+            if estado.ultimo_frame is not None and ahora > estado.ultimo_frame:
+                # Si la cámara dejó de entregar frames, la cifra cae en vez de congelarse
+                fps_logrado = min(fps_logrado, 1.0 / (ahora - estado.ultimo_frame))
+            estadisticas[id_camara] = {
+                "fps_objetivo": round(self.fps_objetivo(id_camara, ahora), 1),
+                "fps_logrado": round(fps_logrado, 1),
+            }
+        return estadisticas
@@ -0,0 +1,239 @@
+import threading
+import queue
+import time
+import traceback
+from collections import deque
+
+# Valor que devuelve capturar() cuando una cámara terminó y debe salir del pipeline
+FIN_CAMARA = object()
+
+
+class ColaFrames:
+    def __init__(self, capacidad=1):
+        """Cola acotada de frames de una cámara; los frames viejos se descartan."""
+        self._frames = deque(maxlen=capacidad)
+        self._lock = threading.Lock()
+        self.descartados = 0  # Frames que nunca llegaron a procesarse
+
+    def poner(self, frame):
+        """Agrega un frame; si la cola está llena se pierde el más viejo."""
+        with self._lock:
+            if len(self._frames) == self._frames.maxlen:
+                self.descartados += 1
+            self._frames.append(frame)
+
+    def tomar(self):
+        """Devuelve el frame más reciente (o None) y vacía la cola."""
+        with self._lock:
+            if not self._frames:
+                return None
+            frame = self._frames.pop()
+            self.descartados += len(self._frames)
+            self._frames.clear()
+            return frame
+
+    def __len__(self):
+        with self._lock:
+            return len(self._frames)
+
+
+class PipelineVideo:
+    def __init__(self, capturar, procesar, num_trabajadores=2, intervalo=0.1, planificador=None, telemetria=None,
+                 capacidad_cola=1):
+        """Pipeline compartido de captura y procesamiento para todas las cámaras.
+
+        Un único hilo de captura recorre las cámaras según su intervalo y deja cada
+        frame en la cola acotada de su cámara. Un grupo pequeño de hilos de trabajo
+        toma siempre el frame más reciente de cada cámara y lo procesa, de modo que
+        el número de hilos no crece con el número de cámaras.
+
+        Si se da un planificador (PlanificadorAdaptativo), el intervalo de cada cámara
+        lo decide él y recibe el retraso de cada frame procesado. Con telemetria
+        (Telemetria) se miden la captura, la espera en cola, el procesamiento y el
+        tiempo total desde la captura.
+
+        capacidad_cola es cuántos frames esperan como mucho en la cola de cada cámara.
+        """
+        self.capturar = capturar  # capturar(id_camara) -> frame, None (sin frame nuevo) o FIN_CAMARA
+        self.procesar = procesar  # procesar(id_camara, frame)
+        self.num_trabajadores = num_trabajadores
+        self.intervalo = intervalo
+        self.planificador = planificador
+        self.telemetria = telemetria
+        self.capacidad_cola = capacidad_cola
+        self._listas = None
+
+        self._colas = {}
+        self._proxima_captura = {}
+        self._pendientes = set()  # Cámaras en espera o en proceso en algún hilo de trabajo
+        self._lock = threading.Lock()
+        self._detener = None
+        self._hilos = []
+
+    def agregar_camara(self, id_camara):
+        """Incorpora una cámara al pipeline (se puede llamar con el pipeline activo)."""
+        with self._lock:
+            if id_camara in self._colas:
+                return
+            self._colas[id_camara] = ColaFrames(self.capacidad_cola)
+            self._proxima_captura[id_camara] = time.monotonic()
+        if self.planificador is not None:
+            self.planificador.agregar_camara(id_camara)
+
+    def frames_por_camara(self):
+        """Frames de una cámara que el pipeline puede retener a la vez.
+
+        Son los de su cola más el que se está procesando: una cámara nunca se procesa
+        en dos hilos de trabajo al mismo tiempo.
+        """
+        return self.capacidad_cola + 1
+
+    def quitar_camara(self, id_camara):
+        """Saca una cámara del pipeline."""
+        with self._lock:
+            self._colas.pop(id_camara, None)
+            self._proxima_captura.pop(id_camara, None)
+        if self.planificador is not None:
+            self.planificador.quitar_camara(id_camara)
+
+    def activo(self):
+        """Indica si los hilos del pipeline están corriendo."""
+        return bool(self._hilos)
+
+    def iniciar(self):
+        """Arranca el hilo de captura y el grupo de hilos de trabajo."""
+        if self._hilos:
+            return
+
+        # Cada arranque usa su propio evento y cola, así los hilos de una corrida
+        # anterior que aún no terminan no se mezclan con los nuevos
+        self._detener = threading.Event()
+        listas = queue.Queue()
+        with self._lock:
+            self._pendientes.clear()
+
+        self._hilos.append(threading.Thread(
+            target=self._bucle_captura, args=(self._detener, listas), name="captura", daemon=True))
+        for i in range(self.num_trabajadores):
+            self._hilos.append(threading.Thread(
+                target=self._bucle_trabajo, args=(self._detener, listas), name=f"trabajo-{i}", daemon=True))
+        self._listas = listas
+
+        for hilo in self._hilos:
+            hilo.start()
+
+    def detener(self, timeout=2.0):
+        """Detiene los hilos del pipeline y espera a que terminen, como mucho timeout segundos.
+
+        Devuelve True si todos terminaron. Un hilo que no termina a tiempo (por
+        ejemplo, trabado en procesar) queda abandonado: tiene su propio evento y su
+        propia cola, así que no se mezcla con los de un arranque posterior.
+        """
+        if not self._hilos:
+            return True
+
+        self._detener.set()
+        for _ in range(self.num_trabajadores):
+            self._listas.put(None)  # Despertar a los hilos de trabajo
+        hilos, self._hilos = self._hilos, []
+
+        limite = time.monotonic() + timeout
+        actual = threading.current_thread()
+        for hilo in hilos:
+            if hilo is not actual:
+                hilo.join(max(limite - time.monotonic(), 0))
+        return not any(hilo.is_alive() for hilo in hilos if hilo is not actual)
+
+    def frames_descartados(self):
+        """Devuelve los frames descartados por cámara."""
+        with self._lock:
+            return {id_camara: cola.descartados for id_camara, cola in self._colas.items()}
+
+    def profundidades(self):
+        """Devuelve los frames en espera por cámara y las cámaras listas sin atender."""
+        with self._lock:
+            colas = list(self._colas.items())
+        profundidades = {id_camara: len(cola) for id_camara, cola in colas}
+        profundidades["listas"] = self._listas.qsize() if self._listas is not None else 0
+        return profundidades
+
+    def _intervalo(self, id_camara):
+        """Devuelve el intervalo de captura de una cámara."""
+        if self.planificador is not None:
+            return self.planificador.intervalo(id_camara)
+        return self.intervalo
+
+    def _bucle_captura(self, detener, listas):
+        """Captura los frames de las cámaras cuyo turno ya llegó."""
+        while not detener.is_set():
+            ahora = time.monotonic()
+            with self._lock:
+                vencidas = [c for c, t in self._proxima_captura.items() if t <= ahora]
+
+            for id_camara in vencidas:
+                if detener.is_set():
+                    return
+                inicio = time.monotonic()
+                frame = self.capturar(id_camara)
+                capturado = time.monotonic()
+                if self.telemetria is not None:
+                    self.telemetria.observar("captura", id_camara, capturado - inicio)
+
+                with self._lock:
+                    cola = self._colas.get(id_camara)
+                    if cola is None:
+                        continue
+                    if frame is FIN_CAMARA:
+                        # La cámara dejó de entregar frames
+                        del self._colas[id_camara]
+                        del self._proxima_captura[id_camara]
+                        continue
+                    # Si la cámara va atrasada no se acumulan capturas pendientes
+                    self._proxima_captura[id_camara] = max(
+                        self._proxima_captura[id_camara] + self._intervalo(id_camara), ahora)
+                    if frame is None:
+                        continue
+                    cola.poner((frame, capturado))
+                    if id_camara in self._pendientes:
+                        continue
+                    self._pendientes.add(id_camara)
+                listas.put(id_camara)
+
+            with self._lock:
+                siguiente = min(self._proxima_captura.values(), default=ahora + self.intervalo)
+            espera = min(max(siguiente - time.monotonic(), 0), self.intervalo)
+            detener.wait(espera)
+
+    def _bucle_trabajo(self, detener, listas):
+        """Procesa el frame más reciente de cada cámara lista."""
+        while True:
+            id_camara = listas.get()
+            if id_camara is None or detener.is_set():
+                return
+
+            with self._lock:
+                cola = self._colas.get(id_camara)
+            elemento = cola.tomar() if cola is not None else None
+
+            if elemento is not None:
+                frame, capturado = elemento
+                inicio = time.monotonic()
+                try:
+                    self.procesar(id_camara, frame)
+                except Exception:
+                    traceback.print_exc()
+                if self.telemetria is not None:
+                    self.telemetria.observar("cola", id_camara, inicio - capturado)
+                    self.telemetria.observar("procesamiento", id_camara, time.monotonic() - inicio)
+                    self.telemetria.observar("extremo_a_extremo", id_camara, time.monotonic() - capturado)
+                    self.telemetria.contar_frame(id_camara)
+                if self.planificador is not None:
+                    self.planificador.registrar_frame(id_camara, time.monotonic() - capturado)
+
+            # Una cámara se procesa en un solo hilo a la vez; si llegó un frame
+            # mientras tanto, vuelve a la cola de cámaras listas
+            with self._lock:
+                if cola is not None and len(cola) and self._colas.get(id_camara) is cola:
+                    listas.put(id_camara)
+                else:
+                    self._pendientes.discard(id_camara)
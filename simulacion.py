@@ -0,0 +1,91 @@
+import time
+import datetime
+import cv2
+import numpy as np
+
+# Desplazamientos que forman cada punto brillante (una cruz de 5 píxeles)
+_CRUZ_Y = np.array([0, -1, 1, 0, 0])
+_CRUZ_X = np.array([0, 0, 0, -1, 1])
+
+
+class FuenteSimulada:
+    def __init__(self, nombre, ubicacion, ancho=320, alto=240, puntos=10, buffers=3,
+                 prob_intruso=0.001, duracion_intruso=30):
+        """Fuente de video simulada para una cámara.
+
+        El fondo con el nombre de la cámara se dibuja una sola vez y la hora se vuelve
+        a dibujar solo cuando cambia el segundo. Cada frame se escribe en uno de varios
+        buffers preasignados que se usan por turnos, así que el frame que devuelve leer
+        solo es válido hasta buffers - 1 lecturas más: quien use la fuente debe dar más
+        buffers que frames retiene a la vez, o copiar los que guarde.
+
+        Con probabilidad prob_intruso por frame empieza un evento en el que una figura
+        cruza la escena durante duracion_intruso frames, para que el detector de
+        movimiento tenga algo real que detectar.
+        """
+        self.ancho = ancho
+        self.alto = alto
+        self.puntos = puntos
+        self.prob_intruso = prob_intruso
+        self.duracion_intruso = duracion_intruso
+        self._intruso = None  # Frame actual del evento de intruso, o None
+        self._rng = np.random.default_rng()
+
+        # Fondo estático con el texto de la cámara
+        self._fondo = self._dibujar_fondo(nombre, ubicacion)
+
+        # Fondo con la hora, se actualiza una vez por segundo
+        self._fondo_hora = self._fondo.copy()
+        self._segundo = None
+
+        self._buffers = [np.empty_like(self._fondo) for _ in range(buffers)]
+        self._siguiente = 0
+
+    def _dibujar_fondo(self, nombre, ubicacion):
+        fondo = np.zeros((self.alto, self.ancho, 3), dtype=np.uint8)
+        cv2.putText(fondo, f"{nombre} - {ubicacion}", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        return fondo
+
+    def rotular(self, nombre, ubicacion):
+        """Cambia el texto de la cámara sin reabrir la fuente.
+
+        El fondo nuevo se reemplaza de una vez y la hora se vuelve a dibujar en el
+        siguiente frame, así que el hilo de captura nunca ve un fondo a medio dibujar.
+        """
+        self._fondo = self._dibujar_fondo(nombre, ubicacion)
+        self._segundo = None
+
+    def leer(self):
+        """Genera el siguiente frame simulado (BGR)."""
+        segundo = int(time.time())
+        if segundo != self._segundo:
+            self._segundo = segundo
+            tiempo = datetime.datetime.fromtimestamp(segundo).strftime("%Y-%m-%d %H:%M:%S")
+            np.copyto(self._fondo_hora, self._fondo)
+            cv2.putText(self._fondo_hora, tiempo, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+
+        frame = self._buffers[self._siguiente]
+        self._siguiente = (self._siguiente + 1) % len(self._buffers)
+        np.copyto(frame, self._fondo_hora)
+
+        # Simular movimiento aleatorio (puntos brillantes) sin bucles de Python
+        ys = self._rng.integers(0, self.alto, self.puntos)[:, None] + _CRUZ_Y
+        xs = self._rng.integers(0, self.ancho, self.puntos)[:, None] + _CRUZ_X
+        np.clip(ys, 0, self.alto - 1, out=ys)
+        np.clip(xs, 0, self.ancho - 1, out=xs)
+        frame[ys, xs] = (0, 255, 0)
+
+        # Simular de vez en cuando una figura que cruza la escena
+        if self._intruso is None and self._rng.random() < self.prob_intruso:
+            self._intruso = 0
+        if self._intruso is not None:
+            ancho_figura, alto_figura = self.ancho // 8, self.alto * 2 // 5
+            x = self._intruso * (self.ancho - ancho_figura) // self.duracion_intruso
+            y = self.alto // 3
+            cv2.rectangle(frame, (x, y), (x + ancho_figura, y + alto_figura), (200, 200, 200), -1)
+            self._intruso += 1
+            if self._intruso >= self.duracion_intruso:
+                self._intruso = None
+
+        return frame
@@ -0,0 +1,281 @@
+import bisect
+import tkinter as tk
+from tkinter import ttk
+from array import array
+
+COLUMNAS = ("ID", "Fecha/Hora", "Cámara", "Tipo", "Estado")
+ORDEN_COLUMNA = {"ID": "id", "Fecha/Hora": "id", "Cámara": "camara", "Tipo": "tipo", "Estado": "estado"}
+CAMPO_ORDEN = {"camara": "id_camara", "tipo": "tipo_anomalia", "estado": "estado"}  # Atributo de la alerta
+TODOS = "Todos"
+
+
+class TablaHistorialVirtual:
+    def __init__(self, parent, filas_visibles=10, intervalo_refresco=250):
+        """Tabla de historial virtualizada sobre el almacén de alertas.
+
+        El Treeview tiene siempre filas_visibles filas que se reutilizan al desplazarse;
+        la tabla solo guarda la lista de IDs que cumplen los filtros en el orden elegido
+        y pide al almacén las alertas de las filas que se ven. Filtrar u ordenar cambia
+        esa lista sin reconstruir el widget. Una alerta nueva o que cambió de estado
+        solo se inserta o se mueve en esa lista (búsqueda binaria) y el dibujo se
+        junta con el siguiente refresco programado. Al desplazarse hasta las alertas más viejas se
+        piden otras al diario con cargar_anteriores (ver conectar()).
+        """
+        self.almacen = None
+        self.cargar_anteriores = None
+        self.filas_visibles = filas_visibles
+        self.intervalo_refresco = intervalo_refresco
+
+        self.filtros = {"id_camara": None, "tipo_anomalia": None, "estado": None}
+        self.orden = "id"
+        self.descendente = True  # Las alertas más nuevas arriba
+        self._seleccion = array("q")  # IDs visibles en orden ascendente
+        self._inicio = 0  # Posición de la primera fila visible
+        self._sucia = False  # La selección debe recalcularse en el próximo refresco
+        self._id_refresco = None
+        self._id_seleccionado = None
+
+        self.frame = tk.Frame(parent, bg="#f0f0f0")
+
+        # Filtros
+        frame_filtros = tk.Frame(self.frame, bg="#f0f0f0")
+        frame_filtros.pack(fill="x")
+        self._crear_filtro(frame_filtros, "Cámara:", "id_camara", lambda: self.almacen.camaras())
+        self._crear_filtro(frame_filtros, "Tipo:", "tipo_anomalia", lambda: self.almacen.tipos())
+        self._crear_filtro(frame_filtros, "Estado:", "estado", lambda: self.almacen.estados())
+
+        # Tabla con un número fijo de filas
+        frame_tabla = tk.Frame(self.frame, bg="#f0f0f0")
+        frame_tabla.pack(fill="both", expand=True)
+
+        self.tree = ttk.Treeview(frame_tabla, columns=COLUMNAS, show="headings",
+                                 height=filas_visibles, selectmode="browse")
+        for col in COLUMNAS:
+            self.tree.heading(col, text=col, command=lambda c=col: self.ordenar_por(c))
+            self.tree.column(col, width=60 if col == "ID" else 100)
+
+        self.scrollbar = tk.Scrollbar(frame_tabla, orient="vertical", command=self._desplazar)
+        self.scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.tree.pack(side=tk.LEFT, fill="both", expand=True)
+
+        self._items = [self.tree.insert("", "end") for _ in range(filas_visibles)]
+        self.tree.detach(*self._items)
+
+        self.tree.bind("<<TreeviewSelect>>", self._al_seleccionar)
+        self.tree.bind("<MouseWheel>", self._rueda)
+        self.tree.bind("<Button-4>", lambda e: self._desplazar("scroll", -3, "units"))
+        self.tree.bind("<Button-5>", lambda e: self._desplazar("scroll", 3, "units"))
+
+    def pack(self, **kwargs):
+        """Coloca la tabla en su contenedor."""
+        self.frame.pack(**kwargs)
+
+    def conectar(self, almacen, cargar_anteriores=None):
+        """Asocia la tabla al almacén de alertas y muestra su contenido.
+
+        cargar_anteriores() agrega al almacén alertas más viejas que las que tiene y
+        devuelve cuántas agregó (como SistemaSeguridad.cargar_anteriores).
+        """
+        self.almacen = almacen
+        self.cargar_anteriores = cargar_anteriores
+        self._recalcular()
+
+    def notificar_nueva(self, alerta):
+        """Incorpora una alerta recién creada en el próximo refresco."""
+        if self.almacen is None or not self._coincide(alerta):
+            return
+        if self.orden == "id":
+            self._seleccion.append(alerta.id_alerta)
+            if self.descendente and self._inicio > 0:
+                self._inicio += 1  # Mantener a la vista las mismas filas
+        elif not self._sucia:
+            self._insertar(alerta)
+        self._programar_refresco()
+
+    def refrescar(self):
+        """Vuelve a dibujar las filas visibles (por ejemplo, tras agrupar un evento repetido)."""
+        self._programar_refresco()
+
+    def actualizar_estado(self, alerta):
+        """Refleja el cambio de estado de una alerta moviendo solo su ID en la lista."""
+        if (self.almacen is not None and alerta is not None and not self._sucia
+                and (self.filtros["estado"] is not None or self.orden == "estado")):
+            self._quitar(alerta.id_alerta)
+            if self._coincide(alerta):
+                self._insertar(alerta)
+        self._programar_refresco()
+
+    def filtrar(self, id_camara=None, tipo_anomalia=None, estado=None):
+        """Cambia todos los filtros de la tabla."""
+        self.filtros = {"id_camara": id_camara, "tipo_anomalia": tipo_anomalia, "estado": estado}
+        self._recalcular()
+
+    def ordenar_por(self, columna):
+        """Ordena por una columna; si ya estaba ordenada, invierte el sentido."""
+        orden = ORDEN_COLUMNA[columna]
+        if orden == self.orden:
+            self.descendente = not self.descendente
+        else:
+            self.orden = orden
+            self.descendente = False
+
+        flecha = " ▼" if self.descendente else " ▲"
+        for col in COLUMNAS:
+            self.tree.heading(col, text=col + (flecha if col == columna else ""))
+        self._recalcular()
+
+    def id_seleccionado(self):
+        """Devuelve el ID de la alerta seleccionada (aunque no esté a la vista) o None."""
+        return self._id_seleccionado
+
+    def _crear_filtro(self, parent, texto, campo, opciones):
+        """Crea un combobox de filtro para un campo de la alerta."""
+        tk.Label(parent, text=texto, bg="#f0f0f0").pack(side=tk.LEFT, padx=(0, 2))
+        combo = ttk.Combobox(parent, state="readonly", width=12, values=[TODOS])
+        combo.set(TODOS)
+        combo.configure(postcommand=lambda: combo.configure(
+            values=[TODOS] + (opciones() if self.almacen is not None else [])))
+        combo.bind("<<ComboboxSelected>>", lambda e: self._cambiar_filtro(campo, combo.get()))
+        combo.pack(side=tk.LEFT, padx=(0, 8))
+
+    def _cambiar_filtro(self, campo, valor):
+        """Aplica el valor elegido en un combobox de filtro."""
+        self.filtros[campo] = None if valor == TODOS else valor
+        self._recalcular()
+
+    def _coincide(self, alerta):
+        """Indica si una alerta cumple los filtros actuales."""
+        return ((self.filtros["id_camara"] is None or alerta.id_camara == self.filtros["id_camara"])
+                and (self.filtros["tipo_anomalia"] is None or alerta.tipo_anomalia == self.filtros["tipo_anomalia"])
+                and (self.filtros["estado"] is None or alerta.estado == self.filtros["estado"]))
+
+    def _clave(self, id_alerta):
+        """Clave de orden de una alerta, la misma con la que el almacén arma la lista."""
+        if self.orden == "id":
+            return id_alerta
+        return getattr(self.almacen.obtener(id_alerta), CAMPO_ORDEN[self.orden]), id_alerta
+
+    def _insertar(self, alerta):
+        """Inserta el ID de una alerta en su lugar de la lista ordenada."""
+        id_alerta = alerta.id_alerta
+        self._seleccion.insert(bisect.bisect_left(self._seleccion, self._clave(id_alerta), key=self._clave), id_alerta)
+
+    def _quitar(self, id_alerta):
+        """Saca un ID de la lista, si está."""
+        if self.orden == "id":
+            pos = bisect.bisect_left(self._seleccion, id_alerta)
+            if pos < len(self._seleccion) and self._seleccion[pos] == id_alerta:
+                del self._seleccion[pos]
+            return
+        # Con otro orden la clave vieja (el estado anterior) ya no está: búsqueda lineal en C
+        try:
+            del self._seleccion[self._seleccion.index(id_alerta)]
+        except ValueError:
+            pass  # No cumplía el filtro de estado anterior
+
+    def _recalcular(self):
+        """Recalcula la lista de IDs y vuelve al principio de la tabla."""
+        self._inicio = 0
+        self._actualizar_seleccion()
+        self._dibujar()
+
+    def _actualizar_seleccion(self):
+        """Pide al almacén los IDs que cumplen los filtros en el orden actual."""
+        if self.almacen is not None:
+            self._seleccion = self.almacen.seleccionar(orden=self.orden, **self.filtros)
+        self._sucia = False
+
+    def _programar_refresco(self):
+        """Agrupa varios cambios en un solo refresco de la tabla."""
+        if self._id_refresco is None:
+            self._id_refresco = self.tree.after(self.intervalo_refresco, self._refresco_programado)
+
+    def _refresco_programado(self):
+        """Aplica los cambios acumulados desde el último refresco."""
+        self._id_refresco = None
+        if self._sucia:
+            self._actualizar_seleccion()
+        self._dibujar()
+
+    def _dibujar(self):
+        """Llena las filas visibles con las alertas que les corresponden."""
+        total = len(self._seleccion)
+        self._inicio = max(0, min(self._inicio, total - self.filas_visibles))
+
+        visible = None
+        for fila, item in enumerate(self._items):
+            pos = self._inicio + fila
+            if pos >= total:
+                self.tree.detach(item)
+                continue
+            id_alerta = self._seleccion[total - 1 - pos if self.descendente else pos]
+            alerta = self.almacen.obtener(id_alerta)
+            fecha = alerta.timestamp.strftime("%H:%M:%S")
+            tipo = alerta.tipo_anomalia
+            if alerta.cantidad > 1:
+                # Alerta que agrupa eventos repetidos: intervalo y cuenta
+                fecha += alerta.ultimo.strftime("-%H:%M:%S")
+                tipo += f" (x{alerta.cantidad})"
+            self.tree.item(item, values=(
+                alerta.id_alerta,
+                fecha,
+                f"Cámara {alerta.id_camara.replace('sim', '')}",
+                tipo,
+                alerta.estado
+            ))
+            self.tree.move(item, "", fila)
+            if id_alerta == self._id_seleccionado:
+                visible = item
+
+        # La selección sigue a la alerta, no a la fila reutilizada
+        if visible is not None:
+            if self.tree.selection() != (visible,):
+                self.tree.selection_set(visible)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+        if total:
+            self.scrollbar.set(self._inicio / total, min(1.0, (self._inicio + self.filas_visibles) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _desplazar(self, *args):
+        """Atiende la barra de desplazamiento y la rueda del ratón."""
+        if args[0] == "moveto":
+            self._inicio = int(float(args[1]) * len(self._seleccion))
+        elif args[0] == "scroll":
+            pasos = int(args[1])
+            if args[2] == "pages":
+                pasos *= self.filas_visibles
+            self._inicio += pasos
+        self._dibujar()
+        if self._en_lo_mas_viejo():
+            self._traer_anteriores()
+
+    def _en_lo_mas_viejo(self):
+        """Indica si la vista llegó al extremo de las alertas más viejas."""
+        if self.orden == "id" and not self.descendente:
+            return self._inicio == 0
+        return self._inicio + self.filas_visibles >= len(self._seleccion)
+
+    def _traer_anteriores(self):
+        """Pide al diario una página de alertas anteriores y las incorpora a la tabla."""
+        if self.cargar_anteriores is None or not self.cargar_anteriores():
+            return
+        antes = len(self._seleccion)
+        self._actualizar_seleccion()
+        if self.orden == "id" and not self.descendente:
+            self._inicio += len(self._seleccion) - antes  # Las viejas entran arriba
+        self._dibujar()
+
+    def _rueda(self, event):
+        """Desplaza la tabla con la rueda del ratón (Windows y macOS)."""
+        self._desplazar("scroll", -3 if event.delta > 0 else 3, "units")
+
+    def _al_seleccionar(self, event):
+        """Recuerda qué alerta eligió el usuario."""
+        seleccion = self.tree.selection()
+        if seleccion:
+            valores = self.tree.item(seleccion[0])["values"]
+            if valores:
+                self._id_seleccionado = int(valores[0])
@@ -0,0 +1,177 @@
+import json
+import time
+import bisect
+import threading
+
+# Límites de los buckets de latencia en segundos (el último bucket es +Inf)
+LIMITES_LATENCIA = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+
+PREFIJO = "seguridad"
+
+
+def _valor_etiqueta(valor):
+    """Escapa el valor de una etiqueta según el formato de texto de Prometheus."""
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class HistogramaLatencia:
+    """Histograma de latencias con buckets fijos y costo constante por observación."""
+    __slots__ = ("cuentas", "suma", "total")
+
+    def __init__(self):
+        self.cuentas = [0] * (len(LIMITES_LATENCIA) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, segundos):
+        """Registra una latencia (se llama con el candado de la telemetría tomado)."""
+        self.cuentas[bisect.bisect_left(LIMITES_LATENCIA, segundos)] += 1
+        self.suma += segundos
+        self.total += 1
+
+    def percentil(self, p):
+        """Estima el percentil p (0-100) interpolando dentro del bucket."""
+        if not self.total:
+            return 0.0
+        objetivo = self.total * p / 100.0
+        acumulado = 0
+        for i, cuenta in enumerate(self.cuentas):
+            if acumulado + cuenta >= objetivo and cuenta:
+                inferior = LIMITES_LATENCIA[i - 1] if i > 0 else 0.0
+                superior = LIMITES_LATENCIA[i] if i < len(LIMITES_LATENCIA) else LIMITES_LATENCIA[-1] * 2
+                return inferior + (superior - inferior) * (objetivo - acumulado) / cuenta
+            acumulado += cuenta
+        return LIMITES_LATENCIA[-1]
+
+
+class Telemetria:
+    def __init__(self):
+        """Mediciones de rendimiento del sistema, pensadas para quedar siempre activas.
+
+        El camino caliente solo suma contadores y actualiza histogramas de buckets
+        fijos: observar() cuesta un bisect sobre una tupla de doce límites y un
+        candado. Los valores que ya llevan otros componentes (profundidad de colas,
+        frames descartados) no se copian: se registran como medidores, funciones que
+        se consultan solo al pedir una instantánea o exportar.
+        """
+        self._lock = threading.Lock()
+        self._histogramas = {}  # (etapa, id_camara) -> HistogramaLatencia
+        self._frames = {}  # id_camara -> frames procesados
+        self._medidores = {}  # nombre -> (función sin argumentos, nombre de la etiqueta de sus claves)
+        self._anterior = (time.monotonic(), {})  # Para calcular fps entre instantáneas
+
+    def observar(self, etapa, id_camara, segundos):
+        """Registra la latencia de una etapa (id_camara "" para etapas globales)."""
+        clave = (etapa, id_camara)
+        with self._lock:
+            histograma = self._histogramas.get(clave)
+            if histograma is None:
+                histograma = self._histogramas[clave] = HistogramaLatencia()
+            histograma.observar(segundos)
+
+    def contar_frame(self, id_camara):
+        """Cuenta un frame procesado de una cámara."""
+        with self._lock:
+            self._frames[id_camara] = self._frames.get(id_camara, 0) + 1
+
+    def histograma(self, etapa):
+        """Devuelve el histograma de una etapa sumando el de todas las cámaras."""
+        total = HistogramaLatencia()
+        with self._lock:
+            for (nombre, _), histograma in self._histogramas.items():
+                if nombre != etapa:
+                    continue
+                total.cuentas = [a + b for a, b in zip(total.cuentas, histograma.cuentas)]
+                total.suma += histograma.suma
+                total.total += histograma.total
+        return total
+
+    def frames_totales(self):
+        """Devuelve el total de frames procesados de todas las cámaras."""
+        with self._lock:
+            return sum(self._frames.values())
+
+    def registrar_medidor(self, nombre, funcion, etiqueta="camara"):
+        """Registra un valor que se consulta al exportar (por ejemplo, una profundidad de cola).
+
+        funcion devuelve un número o un dict; etiqueta es el nombre con el que las
+        claves del dict salen en Prometheus (camara, etapa, nodo...).
+        """
+        self._medidores[nombre] = (funcion, etiqueta)
+
+    def instantanea(self):
+        """Devuelve todas las mediciones como diccionario."""
+        ahora = time.monotonic()
+        with self._lock:
+            frames = dict(self._frames)
+            latencias = {clave: (h.percentil(50), h.percentil(95), h.percentil(99),
+                                 h.suma / h.total if h.total else 0.0, h.total)
+                         for clave, h in self._histogramas.items()}
+            momento, frames_anteriores = self._anterior
+            self._anterior = (ahora, frames)
+
+        transcurrido = max(ahora - momento, 1e-6)
+        camaras = {id_camara: {"frames": n, "fps": round((n - frames_anteriores.get(id_camara, 0)) / transcurrido, 1)}
+                   for id_camara, n in frames.items()}
+
+        etapas = {}
+        for (etapa, id_camara), (p50, p95, p99, promedio, total) in latencias.items():
+            etapas.setdefault(etapa, {})[id_camara] = {
+                "n": total,
+                "p50_ms": round(p50 * 1000, 2),
+                "p95_ms": round(p95 * 1000, 2),
+                "p99_ms": round(p99 * 1000, 2),
+                "promedio_ms": round(promedio * 1000, 2),
+            }
+
+        return {"timestamp": time.time(), "camaras": camaras, "etapas": etapas, "medidores": self._leer_medidores()}
+
+    def a_json(self):
+        """Exporta una instantánea en JSON."""
+        return json.dumps(self.instantanea(), ensure_ascii=False, indent=2)
+
+    def a_prometheus(self):
+        """Exporta las mediciones en el formato de texto de Prometheus."""
+        with self._lock:
+            frames = dict(self._frames)
+            histogramas = {clave: (list(h.cuentas), h.suma, h.total) for clave, h in self._histogramas.items()}
+
+        lineas = [f"# TYPE {PREFIJO}_frames_total counter"]
+        for id_camara, n in sorted(frames.items()):
+            lineas.append(f'{PREFIJO}_frames_total{{camara="{_valor_etiqueta(id_camara)}"}} {n}')
+
+        lineas.append(f"# TYPE {PREFIJO}_latencia_segundos histogram")
+        for (etapa, id_camara), (cuentas, suma, total) in sorted(histogramas.items()):
+            etiquetas = f'etapa="{_valor_etiqueta(etapa)}",camara="{_valor_etiqueta(id_camara)}"'
+            acumulado = 0
+            for limite, cuenta in zip(LIMITES_LATENCIA + ("+Inf",), cuentas):
+                acumulado += cuenta
+                lineas.append(f'{PREFIJO}_latencia_segundos_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+            lineas.append(f"{PREFIJO}_latencia_segundos_sum{{{etiquetas}}} {suma}")
+            lineas.append(f"{PREFIJO}_latencia_segundos_count{{{etiquetas}}} {total}")
+
+        for nombre, valor in sorted(self._leer_medidores().items()):
+            lineas.append(f"# TYPE {PREFIJO}_{nombre} gauge")
+            if isinstance(valor, dict):
+                etiqueta = self._medidores[nombre][1]
+                for clave, v in sorted(valor.items()):
+                    lineas.append(f'{PREFIJO}_{nombre}{{{etiqueta}="{_valor_etiqueta(clave)}"}} {v}')
+            else:
+                lineas.append(f"{PREFIJO}_{nombre} {valor}")
+        return "\n".join(lineas) + "\n"
+
+    def exportar(self, ruta):
+        """Escribe las mediciones en un archivo: Prometheus si termina en .prom, si no JSON."""
+        texto = self.a_prometheus() if ruta.endswith(".prom") else self.a_json()
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+
+    def _leer_medidores(self):
+        """Consulta todos los medidores registrados."""
+        valores = {}
+        for nombre, (funcion, _) in list(self._medidores.items()):
+            try:
+                valores[nombre] = funcion()
+            except Exception:
+                continue
+        return valores
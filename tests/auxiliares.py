@@ -0,0 +1,10 @@
+import time
+
+
+def esperar(condicion, limite=5.0, intervalo=0.01):
+    """Espera hasta que condicion() sea verdadera; falla la prueba si no pasa en limite segundos."""
+    tope = time.monotonic() + limite
+    while not condicion():
+        if time.monotonic() >= tope:
+            raise AssertionError(f"La condición no se cumplió en {limite} s")
+        time.sleep(intervalo)
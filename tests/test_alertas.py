@@ -0,0 +1,66 @@
+import datetime
+import threading
+import unittest
+from alertas import Alerta, AlmacenAlertas
+
+
+class PruebasAlmacenAlertas(unittest.TestCase):
+    def setUp(self):
+        self.almacen = AlmacenAlertas()
+
+    def test_ids_unicos_desde_varios_hilos(self):
+        def crear_muchas(id_camara):
+            for _ in range(500):
+                self.almacen.crear(id_camara, "Intruso", 90)
+
+        hilos = [threading.Thread(target=crear_muchas, args=(f"sim{i}",)) for i in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(len(self.almacen), 2000)
+        self.assertEqual(list(self.almacen.seleccionar()), list(range(1, 2001)))
+        for i in range(4):
+            self.assertEqual(len(self.almacen.seleccionar(id_camara=f"sim{i}")), 500)
+
+    def test_agregar_continua_despues_del_mayor_id(self):
+        ahora = datetime.datetime.now()
+        self.assertTrue(self.almacen.agregar(Alerta(41, "sim1", "Intruso", 90, ahora)))
+        self.assertFalse(self.almacen.agregar(Alerta(41, "sim1", "Intruso", 90, ahora)))
+        self.assertEqual(self.almacen.crear("sim1", "Intruso", 90).id_alerta, 42)
+
+    def test_indices_consistentes_despues_de_marcar_revisada(self):
+        a = self.almacen.crear("sim1", "Intruso", 90)
+        b = self.almacen.crear("sim2", "Intruso", 80)
+        c = self.almacen.crear("sim1", "Objeto abandonado", 85)
+
+        self.assertTrue(self.almacen.marcar_revisada(b.id_alerta))
+        self.assertFalse(self.almacen.marcar_revisada(999))
+
+        self.assertEqual(self.almacen.obtener(b.id_alerta).estado, "Revisada")
+        self.assertEqual(list(self.almacen.seleccionar(estado="Revisada")), [b.id_alerta])
+        self.assertEqual(list(self.almacen.seleccionar(estado="Nueva")), [a.id_alerta, c.id_alerta])
+        self.assertEqual(list(self.almacen.seleccionar(id_camara="sim1", estado="Nueva")), [a.id_alerta, c.id_alerta])
+        self.assertEqual(list(self.almacen.seleccionar(tipo_anomalia="Intruso", estado="Revisada")), [b.id_alerta])
+        self.assertEqual(self.almacen.estados(), ["Nueva", "Revisada"])
+        self.assertEqual(list(self.almacen.seleccionar(orden="estado")), [a.id_alerta, c.id_alerta, b.id_alerta])
+
+        # Marcar dos veces no duplica la alerta en el índice
+        self.almacen.marcar_revisada(b.id_alerta)
+        self.almacen.marcar_revisada(a.id_alerta)
+        self.almacen.marcar_revisada(c.id_alerta)
+        self.assertEqual(self.almacen.estados(), ["Revisada"])
+        self.assertEqual(list(self.almacen.seleccionar(estado="Revisada")), [1, 2, 3])
+
+    def test_orden_por_camara_y_tipo(self):
+        for id_camara, tipo in (("sim2", "B"), ("sim1", "C"), ("sim2", "A"), ("sim1", "A")):
+            self.almacen.crear(id_camara, tipo, 90)
+        self.assertEqual(list(self.almacen.seleccionar(orden="camara")), [2, 4, 1, 3])
+        self.assertEqual(list(self.almacen.seleccionar(orden="tipo")), [3, 4, 1, 2])
+        self.assertEqual(self.almacen.camaras(), ["sim1", "sim2"])
+        self.assertEqual(self.almacen.tipos(), ["A", "B", "C"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+import cv2
+import numpy as np
+import captura
+from captura import FuenteCaptura
+from procesamiento import FIN_CAMARA
+
+FRAMES_CLIP = 12
+
+
+def escribir_clip(ruta, frames=FRAMES_CLIP, fps=30):
+    """Escribe un video corto con un número distinto en cada frame."""
+    escritor = cv2.VideoWriter(ruta, cv2.VideoWriter_fourcc(*"MJPG"), fps, (64, 48))
+    for i in range(frames):
+        escritor.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    escritor.release()
+
+
+def leer_hasta_el_fin(fuente, limite=5.0):
+    """Lee la fuente hasta FIN_CAMARA y devuelve cuántos frames entregó."""
+    frames = 0
+    tope = time.monotonic() + limite
+    while time.monotonic() < tope:
+        frame = fuente.leer()
+        if frame is FIN_CAMARA:
+            return frames
+        if frame is not None:
+            frames += 1
+        time.sleep(0.002)
+    raise AssertionError("La fuente no terminó")
+
+
+class PruebasFuenteCaptura(unittest.TestCase):
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.carpeta.name, "clip.avi")
+        escribir_clip(self.ruta)
+
+    def tearDown(self):
+        self.carpeta.cleanup()
+
+    def test_video_entrega_sus_frames_y_termina(self):
+        fuente = FuenteCaptura(self.ruta)
+        fuente.iniciar()
+        try:
+            entregados = leer_hasta_el_fin(fuente)
+            self.assertEqual(fuente.frames_leidos, FRAMES_CLIP)
+            self.assertEqual(entregados + fuente.frames_descartados, FRAMES_CLIP)
+            self.assertEqual(fuente.estado, "Terminada")
+            # Terminada, sigue devolviendo FIN_CAMARA
+            self.assertIs(fuente.leer(), FIN_CAMARA)
+        finally:
+            fuente.detener()
+
+    def test_detener_e_iniciar_vuelve_a_empezar(self):
+        fuente = FuenteCaptura(self.ruta)
+        fuente.iniciar()
+        try:
+            leer_hasta_el_fin(fuente)
+            self.assertTrue(fuente.detener())
+            self.assertEqual(fuente.estado, "Desconectada")
+
+            fuente.iniciar()
+            self.assertIsNot(fuente.leer(), FIN_CAMARA)
+            leer_hasta_el_fin(fuente)
+            self.assertEqual(fuente.frames_leidos, 2 * FRAMES_CLIP)
+        finally:
+            fuente.detener()
+
+    def test_origen_invalido_reintenta_con_espera_exponencial(self):
+        aperturas = []
+        abrir = cv2.VideoCapture
+
+        def abrir_contando(origen):
+            aperturas.append(time.monotonic())
+            return abrir(origen)
+
+        with mock.patch.object(captura.cv2, "VideoCapture", abrir_contando):
+            fuente = FuenteCaptura(os.path.join(self.carpeta.name, "no_existe", "camara"),
+                                   reintento_inicial=0.05, reintento_maximo=0.2)
+            fuente.iniciar()
+            time.sleep(1.0)
+            self.assertTrue(fuente.detener())
+
+        self.assertEqual(fuente.estado, "Desconectada")
+        self.assertFalse(fuente.conectada.is_set())
+        # Esperas de 0.05, 0.1 y después 0.2 s: unos 6 intentos en un segundo
+        self.assertGreaterEqual(len(aperturas), 4)
+        self.assertLessEqual(len(aperturas), 9)
+        esperas = [b - a for a, b in zip(aperturas, aperturas[1:])]
+        self.assertLess(esperas[0], esperas[2])
+        self.assertGreaterEqual(min(esperas[2:]), 0.15)
+        self.assertLess(max(esperas), 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
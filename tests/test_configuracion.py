@@ -0,0 +1,120 @@
+import os
+import json
+import tempfile
+import unittest
+from types import SimpleNamespace
+from configuracion import ConfigCamara, RegistroCamaras
+from umbrales import TablaUmbrales
+from tests.auxiliares import esperar
+
+
+class _MotorFalso:
+    """Registra lo que RegistroCamaras le pide al motor."""
+
+    def __init__(self):
+        self.modelo = SimpleNamespace(umbrales=TablaUmbrales())
+        self.llamadas = []
+
+    def agregar_camara_config(self, config):
+        self.llamadas.append(("agregar", config.id_camara))
+        return True
+
+    def quitar_camara(self, id_camara):
+        self.llamadas.append(("quitar", id_camara))
+
+    def reconfigurar_camara(self, anterior, nueva):
+        self.llamadas.append(("reconfigurar", nueva.id_camara))
+
+
+class PruebasRegistroCamaras(unittest.TestCase):
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.carpeta.name, "camaras.json")
+        self.motor = _MotorFalso()
+        self.avisos = []
+        self.registro = RegistroCamaras(self.motor, self.ruta, intervalo=0.02,
+                                        al_avisar=lambda mensaje, error: self.avisos.append((mensaje, error)))
+
+    def tearDown(self):
+        self.registro.detener()
+        self.carpeta.cleanup()
+
+    def escribir(self, camaras, **extra):
+        with open(self.ruta, "w", encoding="utf-8") as archivo:
+            json.dump(dict(extra, camaras=camaras), archivo)
+
+    def test_la_primera_carga_agrega_todas(self):
+        self.escribir([{"id": "a"}, {"id": "b", "fps": 5}])
+        self.assertEqual(self.registro.cargar(), (["a", "b"], [], []))
+        self.assertEqual(self.motor.llamadas, [("agregar", "a"), ("agregar", "b")])
+        self.assertEqual(self.registro.configuraciones["b"].fps, 5)
+
+    def test_recarga_solo_toca_lo_que_cambio(self):
+        self.escribir([{"id": "a"}, {"id": "b"}, {"id": "c", "roi": [[0, 0, 0.5, 0.5]]}])
+        self.registro.cargar()
+        self.motor.llamadas.clear()
+
+        self.escribir([{"id": "a"}, {"id": "c", "roi": [[0.5, 0, 0.5, 0.5]]}, {"id": "d"}])
+        self.assertEqual(self.registro.cargar(), (["d"], ["b"], ["c"]))
+        self.assertEqual(self.motor.llamadas, [("quitar", "b"), ("reconfigurar", "c"), ("agregar", "d")])
+        self.assertEqual(list(self.registro.configuraciones), ["a", "c", "d"])
+        self.assertEqual(self.registro.configuraciones["c"].roi, [(0.5, 0, 0.5, 0.5)])
+
+        # Sin cambios no se toca nada
+        self.motor.llamadas.clear()
+        self.assertEqual(self.registro.cargar(), ([], [], []))
+        self.assertEqual(self.motor.llamadas, [])
+
+    def test_umbrales_por_tipo_del_archivo(self):
+        self.escribir([{"id": "a"}], umbrales={"Intruso": 60})
+        self.registro.cargar()
+        self.assertEqual(self.motor.modelo.umbrales.umbral("a", "Intruso"), 60)
+        self.escribir([{"id": "a"}])
+        self.registro.cargar()
+        self.assertEqual(self.motor.modelo.umbrales.umbral("a", "Intruso"), 80)
+
+    def test_archivo_invalido_conserva_la_configuracion(self):
+        self.escribir([{"id": "a"}])
+        self.registro.cargar()
+        for camaras in ([{"id": "a"}, {"id": "a"}], [{"nombre": "b"}], [{"id": "b", "fps": 0}],
+                        [{"id": "b", "roi": [[1, 2]]}], [{"id": "b", "color": "rojo"}],
+                        [{"id": "b", "fps": "10"}], [{"id": "b", "roi": [1, 2]}], [{"id": "b", "ancho": 640.5, "alto": 480}]):
+            self.escribir(camaras)
+            with self.assertRaises(ValueError):
+                self.registro.cargar()
+        self.assertEqual(list(self.registro.configuraciones), ["a"])
+        self.assertEqual(self.motor.llamadas, [("agregar", "a")])
+
+    def test_vigilancia_recarga_y_avisa(self):
+        self.escribir([{"id": "a"}])
+        self.registro.cargar()
+        self.registro.iniciar()
+
+        self.escribir([{"id": "a", "fps": 3}, {"id": "b"}])
+        esperar(lambda: self.avisos, limite=3.0)
+        self.assertEqual(self.avisos[0], ("Configuración de cámaras recargada: 1 agregadas, 0 quitadas, "
+                                          "1 cambiadas", False))
+        self.assertEqual(self.registro.configuraciones["a"].fps, 3)
+
+        with open(self.ruta, "w", encoding="utf-8") as archivo:
+            archivo.write("{ no es json")
+        esperar(lambda: len(self.avisos) == 2, limite=3.0)
+        self.assertTrue(self.avisos[1][1])
+        self.assertEqual(self.registro.errores, 1)
+        self.assertEqual(list(self.registro.configuraciones), ["a", "b"])
+
+
+class PruebasConfigCamara(unittest.TestCase):
+    def test_cambia_fuente_solo_con_campos_de_la_fuente(self):
+        base = ConfigCamara.desde_dict({"id": "a", "origen": 0, "fps": 10})
+        self.assertFalse(base.cambia_fuente(ConfigCamara.desde_dict({"id": "a", "origen": 0, "fps": 5,
+                                                                      "umbral": 70})))
+        self.assertTrue(base.cambia_fuente(ConfigCamara.desde_dict({"id": "a", "origen": 0, "ancho": 640,
+                                                                     "alto": 480})))
+        self.assertFalse(base.cambia_fuente(ConfigCamara.desde_dict({"id": "a", "origen": 0, "fps": 10,
+                                                                      "nombre": "Portón",
+                                                                      "ubicacion": "Entrada"})))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import time
+import datetime
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+import motor
+from alertas import Alerta
+from nodos import ConsolaCentral, NodoBorde
+from telemetria import Telemetria
+from tests.auxiliares import esperar
+
+
+class _MotorFalso:
+    """Lo mínimo de MotorMonitoreo que usa NodoBorde, sin cámaras corriendo."""
+
+    def __init__(self, camaras):
+        self.telemetria = Telemetria()
+        self.modelo = SimpleNamespace(camaras_activas={
+            c: {"id": c, "nombre": f"Cam {c}", "ubicacion": "Prueba", "roi": None} for c in camaras})
+        self._suscriptores = {}
+
+    def suscribir(self, evento, funcion):
+        self._suscriptores.setdefault(evento, []).append(funcion)
+
+    def notificar(self, evento, *args):
+        for funcion in self._suscriptores.get(evento, ()):
+            funcion(*args)
+
+
+def alerta(id_alerta, id_camara):
+    return Alerta(id_alerta, id_camara, "Intruso", 90, datetime.datetime.now())
+
+
+class PruebasNodos(unittest.TestCase):
+    def setUp(self):
+        self.conectados = {}  # id_nodo -> cámaras del saludo
+        self.alertas = []  # (id_nodo, registro)
+        self.consolas = []
+        self.nodos = []
+
+    def tearDown(self):
+        for nodo in self.nodos:
+            nodo.detener()
+        for consola in self.consolas:
+            consola.detener()
+
+    def _consola(self, direccion=("127.0.0.1", 0), al_lote=None):
+        consola = ConsolaCentral(direccion, al_conectar=self._al_conectar, al_lote=al_lote or self._al_lote)
+        consola.iniciar()
+        self.consolas.append(consola)
+        return consola
+
+    def _nodo(self, consola, id_nodo, camaras):
+        motor = _MotorFalso(camaras)
+        nodo = NodoBorde(motor, id_nodo, consola.direccion, intervalo_lote=0.05, reintento_inicial=0.05,
+                         reintento_maximo=0.2)
+        nodo.iniciar()
+        self.nodos.append(nodo)
+        return motor, nodo
+
+    def _al_conectar(self, id_nodo, sesion, camaras):
+        self.conectados[id_nodo] = camaras
+
+    def _al_lote(self, id_nodo, sesion, alertas, estados, miniaturas):
+        self.alertas.extend((id_nodo, registro) for registro in alertas)
+
+    def test_saludo_registra_camaras_y_las_alertas_se_confirman(self):
+        consola = self._consola()
+        motor1, nodo1 = self._nodo(consola, "n1", ["a", "b"])
+        motor2, nodo2 = self._nodo(consola, "n2", ["c"])
+
+        esperar(lambda: len(self.conectados) == 2)
+        self.assertEqual([c[0] for c in self.conectados["n1"]], ["a", "b"])
+        self.assertEqual(self.conectados["n2"], [["c", "Cam c", "Prueba"]])
+
+        motor1.notificar("alerta", alerta(1, "a"))
+        motor2.notificar("alerta", alerta(1, "c"))
+        esperar(lambda: len(self.alertas) == 2)
+        self.assertEqual(sorted((n, r[0], r[1]) for n, r in self.alertas), [("n1", 1, "a"), ("n2", 1, "c")])
+
+        esperar(lambda: all(n.estadisticas()["lotes_sin_confirmar"] == 0 for n in (nodo1, nodo2)))
+        self.assertEqual(consola.nodos["n1"]["lotes"], nodo1.lotes_enviados)
+
+    def test_alertas_sin_confirmar_se_reenvian_al_reconectar(self):
+        recibido = threading.Event()
+        soltar = threading.Event()
+
+        def al_lote_sin_confirmar(id_nodo, sesion, alertas, estados, miniaturas):
+            # El lote llega pero la conexión se corta antes de confirmarlo
+            if alertas:
+                recibido.set()
+                soltar.wait(5)
+
+        consola = self._consola(al_lote=al_lote_sin_confirmar)
+        motor, nodo = self._nodo(consola, "n1", ["a"])
+        esperar(lambda: nodo.conectado)
+        motor.notificar("alerta", alerta(7, "a"))
+        self.assertTrue(recibido.wait(5))
+
+        consola.detener(timeout=0.2)
+        soltar.set()
+        esperar(lambda: not nodo.conectado)
+
+        self._consola(direccion=consola.direccion)
+        esperar(lambda: self.alertas)
+        self.assertEqual([(n, r[0]) for n, r in self.alertas], [("n1", 7)])
+        self.assertGreaterEqual(nodo.reconexiones, 1)
+        esperar(lambda: nodo.estadisticas()["lotes_sin_confirmar"] == 0)
+        self.assertEqual(nodo.estadisticas()["alertas_pendientes"], 0)
+
+
+class PruebasAlertasRemotas(unittest.TestCase):
+    def setUp(self):
+        self.motor = motor.MotorMonitoreo(ruta_diario=None, carpeta_clips=None)
+
+    def registro(self, id_remoto, cantidad=1):
+        ahora = time.time()
+        return [id_remoto, "cam1", "Intruso", 90, ahora, ahora, cantidad]
+
+    def test_actualizacion_de_una_alerta_remota_no_la_duplica(self):
+        alerta = self.motor.registrar_alerta_remota("n1", "s1", self.registro(7))
+        actualizada = self.motor.registrar_alerta_remota("n1", "s1", self.registro(7, cantidad=3))
+        self.assertIs(actualizada, alerta)
+        self.assertEqual(alerta.cantidad, 3)
+        self.assertEqual(len(self.motor.modelo.historial_alertas), 1)
+
+    def test_las_alertas_remotas_recordadas_estan_acotadas(self):
+        with mock.patch.object(motor, "MAXIMO_ALERTAS_REMOTAS", 3):
+            primera = self.motor.registrar_alerta_remota("n1", "s1", self.registro(1))
+            for id_remoto in range(2, 5):
+                self.motor.registrar_alerta_remota("n1", "s1", self.registro(id_remoto))
+                # La primera sigue recibiendo actualizaciones y no es la menos reciente
+                self.assertIs(self.motor.registrar_alerta_remota("n1", "s1", self.registro(1)), primera)
+        self.assertEqual([c[2] for c in self.motor._alertas_remotas], [3, 4, 1])
+
+    def test_una_sesion_nueva_olvida_las_anteriores(self):
+        self.motor.registrar_alerta_remota("n1", "s1", self.registro(1))
+        self.motor.registrar_alerta_remota("n2", "s1", self.registro(1))
+        self.motor._nodo_conectado("n1", "s2", [])
+        self.assertEqual(list(self.motor._alertas_remotas), [("n2", "s1", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
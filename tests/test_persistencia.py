@@ -0,0 +1,53 @@
+import os
+import sqlite3
+import datetime
+import tempfile
+import unittest
+from alertas import Alerta
+from persistencia import DiarioAlertas, _ESQUEMA
+from tests.auxiliares import esperar
+
+
+def alerta(id_alerta):
+    ahora = datetime.datetime.now()
+    return Alerta(id_alerta, "sim1", "Intruso", 90, ahora, ultimo=ahora)
+
+
+class PruebasDiarioAlertas(unittest.TestCase):
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.carpeta.name, "alertas.db")
+        self.diario = DiarioAlertas(self.ruta, intervalo_lote=0.02, reintentos=1)
+
+    def tearDown(self):
+        self.diario.cerrar()
+        self.carpeta.cleanup()
+
+    def test_guarda_y_pagina(self):
+        for i in range(1, 6):
+            self.diario.guardar(alerta(i))
+        esperar(lambda: len(self.diario.cargar_recientes(10)) == 5)
+        self.assertEqual([a.id_alerta for a in self.diario.cargar_recientes(2)], [4, 5])
+        self.assertEqual([a.id_alerta for a in self.diario.cargar_anteriores(4, 2)], [2, 3])
+
+    def test_un_lote_fallido_no_detiene_la_escritura(self):
+        self.diario.guardar(alerta(1))
+        esperar(lambda: self.diario.cargar_recientes(10))
+
+        with sqlite3.connect(self.ruta) as otra:
+            otra.execute("DROP TABLE alertas")
+        self.diario.guardar(alerta(2))
+        esperar(lambda: self.diario.alertas_perdidas == 1)
+        self.assertEqual(self.diario.lotes_fallidos, 2)  # El intento y su reintento
+        self.assertIn("alertas", self.diario.ultimo_error)
+
+        with sqlite3.connect(self.ruta) as otra:
+            otra.executescript(_ESQUEMA)
+        self.diario.guardar(alerta(3))
+        esperar(lambda: self.diario.cargar_recientes(10))
+        self.assertEqual([a.id_alerta for a in self.diario.cargar_recientes(10)], [3])
+        self.assertEqual(self.diario.pendientes(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
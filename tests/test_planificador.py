@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+from planificador import PlanificadorAdaptativo
+
+
+class PruebasPlanificador(unittest.TestCase):
+    def setUp(self):
+        self.ahora = 1000.0
+        parche = mock.patch("planificador.time.monotonic", lambda: self.ahora)
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.planificador = PlanificadorAdaptativo(fps_activa=15, fps_normal=10, fps_inactiva=2,
+                                                   segundos_actividad=5, segundos_inactividad=30)
+        self.planificador.agregar_camara("sim1")
+
+    def test_frecuencia_segun_actividad(self):
+        self.assertEqual(self.planificador.fps_objetivo("sim1"), 10)
+
+        self.planificador.registrar_actividad("sim1")
+        self.ahora += 4
+        self.assertEqual(self.planificador.fps_objetivo("sim1"), 15)
+
+        self.ahora += 2
+        self.assertEqual(self.planificador.fps_objetivo("sim1"), 10)
+
+        self.ahora += 30
+        self.assertEqual(self.planificador.fps_objetivo("sim1"), 2)
+        self.assertAlmostEqual(self.planificador.intervalo("sim1"), 0.5)
+
+    def test_camara_desconocida_usa_la_frecuencia_normal(self):
+        self.assertEqual(self.planificador.fps_objetivo("otra"), 10)
+        self.planificador.registrar_actividad("otra")
+        self.planificador.quitar_camara("sim1")
+        self.assertEqual(self.planificador.fps_objetivo("sim1"), 10)
+
+    def test_retroceso_global_y_recuperacion(self):
+        for _ in range(100):
+            self.ahora += 0.1
+            self.planificador.registrar_frame("sim1", 1.0)
+        self.assertAlmostEqual(self.planificador.factor_global, self.planificador.factor_minimo)
+        self.assertAlmostEqual(self.planificador.fps_objetivo("sim1"), 10 * self.planificador.factor_minimo)
+
+        for _ in range(1000):
+            self.ahora += 0.1
+            self.planificador.registrar_frame("sim1", 0.0)
+        self.assertEqual(self.planificador.factor_global, 1.0)
+
+    def test_estadisticas_de_fps_logrado(self):
+        for _ in range(50):
+            self.ahora += 0.1
+            self.planificador.registrar_frame("sim1", 0.0)
+        estadisticas = self.planificador.estadisticas()["sim1"]
+        self.assertEqual(estadisticas["fps_objetivo"], 10)
+        self.assertAlmostEqual(estadisticas["fps_logrado"], 10, delta=0.1)
+
+        # Si la cámara deja de entregar frames, la cifra cae
+        self.ahora += 2
+        self.assertAlmostEqual(self.planificador.estadisticas()["sim1"]["fps_logrado"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+import numpy as np
+import motor
+from simulacion import FuenteSimulada
+
+
+class PruebasFuenteSimulada(unittest.TestCase):
+    def test_frame_sigue_intacto_mientras_no_se_recicla_su_buffer(self):
+        fuente = FuenteSimulada("A", "B", puntos=50, buffers=3)
+        frame = fuente.leer()
+        copia = frame.copy()
+        fuente.leer()
+        fuente.leer()
+        np.testing.assert_array_equal(frame, copia)
+
+    def test_rotular_cambia_el_fondo(self):
+        fuente = FuenteSimulada("A", "B", puntos=0, prob_intruso=0)
+        antes = fuente.leer().copy()
+        fuente.rotular("Portón", "Entrada")
+        self.assertTrue((fuente.leer() != antes).any())
+
+
+class PruebasBuffersDelMotor(unittest.TestCase):
+    def setUp(self):
+        self.motor = motor.MotorMonitoreo(ruta_diario=None, carpeta_clips=None)
+
+    def test_anillo_supera_lo_que_retiene_el_pipeline(self):
+        self.motor.pipeline.capacidad_cola = 3
+        self.motor.agregar_camara_simulada("a", "A", "B", buffers=1)
+        buffers = len(self.motor.fuentes_simuladas["a"]._buffers)
+        self.assertGreater(buffers, self.motor.pipeline.frames_por_camara())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+from telemetria import Telemetria
+
+
+class PruebasTelemetria(unittest.TestCase):
+    def setUp(self):
+        self.telemetria = Telemetria()
+
+    def test_cada_medidor_usa_su_etiqueta(self):
+        self.telemetria.registrar_medidor("cola_frames", lambda: {"sim1": 2})
+        self.telemetria.registrar_medidor("arranque_ms", lambda: {"motor": 340}, etiqueta="etapa")
+        self.telemetria.registrar_medidor("alertas_total", lambda: 7)
+        texto = self.telemetria.a_prometheus()
+        self.assertIn('seguridad_cola_frames{camara="sim1"} 2\n', texto)
+        self.assertIn('seguridad_arranque_ms{etapa="motor"} 340\n', texto)
+        self.assertIn("seguridad_alertas_total 7\n", texto)
+        self.assertNotIn('camara="motor"', texto)
+
+    def test_valores_de_etiqueta_escapados(self):
+        raro = 'pasillo "b"\\1\nnorte'
+        self.telemetria.contar_frame(raro)
+        self.telemetria.observar("deteccion", raro, 0.003)
+        self.telemetria.registrar_medidor("cola_frames", lambda: {raro: 1})
+        texto = self.telemetria.a_prometheus()
+        escapado = 'pasillo \\"b\\"\\\\1\\nnorte'
+        self.assertIn(f'seguridad_frames_total{{camara="{escapado}"}} 1\n', texto)
+        self.assertIn(f'seguridad_latencia_segundos_count{{etapa="deteccion",camara="{escapado}"}} 1\n', texto)
+        self.assertIn(f'seguridad_cola_frames{{camara="{escapado}"}} 1\n', texto)
+        # Cada muestra ocupa una sola línea
+        self.assertFalse([linea for linea in texto.splitlines() if linea.startswith("norte")])
+
+    def test_un_medidor_que_falla_se_omite(self):
+        self.telemetria.registrar_medidor("roto", lambda: 1 / 0)
+        self.telemetria.registrar_medidor("sano", lambda: 1)
+        self.assertEqual(self.telemetria.instantanea()["medidores"], {"sano": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import threading
+import unittest
+from umbrales import TablaUmbrales
+
+
+class PruebasTablaUmbrales(unittest.TestCase):
+    def setUp(self):
+        self.tabla = TablaUmbrales(umbral_global=80)
+
+    def test_gana_el_umbral_mas_especifico(self):
+        self.tabla.fijar_tipos({"Intruso": 70})
+        self.tabla.fijar_camara("a", 60)
+        self.tabla.fijar_camara("b", None, {"Intruso": 90})
+        self.tabla.fijar_camara("c", 55, {"Objeto abandonado": 95})
+
+        self.assertEqual(self.tabla.umbral("x", "Otro"), 80)  # Global
+        self.assertEqual(self.tabla.umbral("x", "Intruso"), 70)  # Tipo
+        self.assertEqual(self.tabla.umbral("a", "Intruso"), 60)  # La cámara pesa más que el tipo
+        self.assertEqual(self.tabla.umbral("b", "Intruso"), 90)  # Cámara y tipo
+        self.assertEqual(self.tabla.umbral("b", "Otro"), 80)
+        self.assertEqual(self.tabla.umbral("c", "Objeto abandonado"), 95)
+        self.assertEqual(self.tabla.umbral("c", "Intruso"), 55)
+
+    def test_los_cambios_se_propagan_a_las_combinaciones(self):
+        self.tabla.fijar_camara("b", None, {"Intruso": 90})
+        self.tabla.cambiar_global(65)
+        self.tabla.fijar_tipos({"Objeto abandonado": 75})
+        self.assertEqual(self.tabla.umbral_global, 65)
+        self.assertEqual(self.tabla.umbral("b", "Otro"), 65)
+        self.assertEqual(self.tabla.umbral("b", "Objeto abandonado"), 75)
+
+        self.tabla.fijar_camara("b")  # Sin umbrales propios vuelve a los generales
+        self.assertEqual(self.tabla.umbral("b", "Intruso"), 65)
+
+    def test_evaluar_cuenta_candidatos_y_suprimidos(self):
+        self.tabla.fijar_camara("a", 60)
+        self.assertTrue(self.tabla.evaluar("a", "Intruso", 60))
+        self.assertFalse(self.tabla.evaluar("a", "Intruso", 59))
+        self.assertFalse(self.tabla.evaluar("b", "Intruso", 70))
+        self.tabla.contar_suprimido("a", "Movimiento")
+
+        self.assertEqual(self.tabla.estadisticas(), {
+            "a": {"Intruso": {"umbral": 60, "candidatos": 2, "suprimidos": 1},
+                  "Movimiento": {"umbral": 60, "candidatos": 1, "suprimidos": 1}},
+            "b": {"Intruso": {"umbral": 80, "candidatos": 1, "suprimidos": 1}},
+        })
+        self.assertEqual(self.tabla.suprimidos_por_camara(), {"a": 2, "b": 1})
+
+        self.tabla.quitar_camara("a")
+        self.assertEqual(self.tabla.suprimidos_por_camara(), {"b": 1})
+        self.assertEqual(self.tabla.umbral("a", "Intruso"), 80)
+
+    def test_contadores_desde_varios_hilos(self):
+        def evaluar_muchos():
+            for i in range(5000):
+                self.tabla.evaluar("a", "Intruso", i % 100)
+
+        hilos = [threading.Thread(target=evaluar_muchos) for _ in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        estadisticas = self.tabla.estadisticas()["a"]["Intruso"]
+        self.assertEqual(estadisticas["candidatos"], 20000)
+        self.assertEqual(estadisticas["suprimidos"], 4 * 50 * 80)
+
+    def test_combinaciones_conocidas_se_cuentan_sin_candado(self):
+        self.tabla.fijar_camara("a", 60)
+        self.tabla.fijar_camara("b", 70)
+        self.tabla.evaluar("a", "Intruso", 10)  # Reserva el tipo en todas las cámaras conocidas
+
+        class _CandadoProhibido:
+            def __enter__(self):
+                raise AssertionError("evaluar() tomó el candado")
+
+            def __exit__(self, *args):
+                return False
+
+        candado, self.tabla._lock = self.tabla._lock, _CandadoProhibido()
+        try:
+            self.assertFalse(self.tabla.evaluar("b", "Intruso", 10))
+            self.assertTrue(self.tabla.evaluar("b", "Intruso", 75))
+            self.tabla.contar_suprimido("a", "Intruso")
+        finally:
+            self.tabla._lock = candado
+        self.assertEqual(self.tabla.suprimidos_por_camara(), {"a": 2, "b": 1})
+        self.assertEqual(self.tabla.estadisticas()["b"]["Intruso"]["candidatos"], 2)
+
+    def test_evaluar_usa_el_umbral_que_recibe(self):
+        self.tabla.cambiar_global(90)
+        self.assertTrue(self.tabla.evaluar("a", "Intruso", 85, umbral=80))
+        self.assertFalse(self.tabla.evaluar("a", "Intruso", 85))
+
+    def test_camara_quitada_empieza_de_cero(self):
+        self.tabla.fijar_camara("a", 60)
+        self.tabla.evaluar("a", "Intruso", 10)
+        self.tabla.quitar_camara("a")
+        self.tabla.fijar_camara("a", 60)
+        self.assertEqual(self.tabla.estadisticas(), {})
+        self.tabla.evaluar("a", "Intruso", 70)
+        self.assertEqual(self.tabla.estadisticas()["a"]["Intruso"]["suprimidos"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import threading
+from array import array
+
+_SIN_POSICIONES = {}  # Para cámaras sin contadores reservados (nunca se modifica)
+
+
+class TablaUmbrales:
+    def __init__(self, umbral_global=80):
+        """Umbrales de confianza por cámara y por tipo de anomalía.
+
+        Gana el más específico: cámara y tipo, después el de la cámara, después el
+        del tipo y por último el global. Las combinaciones se resuelven al cambiar
+        algún umbral (algo poco frecuente) en un diccionario por cámara y se publican
+        reemplazando una sola referencia, así la búsqueda del umbral no toma candado:
+        son dos búsquedas en diccionarios y una detección rechazada no crea ningún
+        objeto.
+
+        Por cámara y tipo se cuentan los candidatos evaluados y los que el umbral
+        suprimió. La tabla publicada también asigna a cada cámara y tipo conocidos una
+        posición de contadores, y cada hilo suma en su propio arreglo sin candado;
+        estadisticas() suma los arreglos de todos los hilos. Solo una combinación
+        nunca vista toma el candado, una vez, para reservar su posición.
+        """
+        self._lock = threading.Lock()
+        self._global = umbral_global
+        self._tipos = {}  # tipo_anomalia -> umbral
+        self._camaras = {}  # id_camara -> (umbral o None, {tipo_anomalia: umbral})
+        self._conocidas = set()  # Cámaras con contadores reservados
+        self._tipos_vistos = set()  # Tipos evaluados alguna vez (se reservan en todas las cámaras)
+        self._siguiente_posicion = 0  # Las posiciones no se reutilizan
+        self._contadores = []  # Arreglo de cada hilo: candidatos y suprimidos por posición
+        self._local = threading.local()
+        # (umbrales generales, umbrales por cámara, {id_camara: {tipo_anomalia: posición}})
+        self._vigente = ({None: umbral_global}, {}, {})
+
+    @property
+    def umbral_global(self):
+        """Umbral que se aplica cuando no hay uno más específico."""
+        return self._global
+
+    def cambiar_global(self, umbral):
+        """Cambia el umbral global."""
+        with self._lock:
+            self._global = umbral
+            self._publicar()
+
+    def fijar_tipos(self, por_tipo):
+        """Reemplaza los umbrales por tipo de anomalía ({tipo: umbral})."""
+        with self._lock:
+            self._tipos = dict(por_tipo)
+            self._publicar()
+
+    def fijar_camara(self, id_camara, umbral=None, por_tipo=None):
+        """Fija el umbral de una cámara y los de sus tipos; sin ninguno, la cámara usa los generales."""
+        with self._lock:
+            if umbral is None and not por_tipo:
+                self._camaras.pop(id_camara, None)
+            else:
+                self._camaras[id_camara] = (umbral, dict(por_tipo or {}))
+            self._conocidas.add(id_camara)
+            self._publicar()
+
+    def quitar_camara(self, id_camara):
+        """Olvida los umbrales y los contadores de una cámara."""
+        with self._lock:
+            self._camaras.pop(id_camara, None)
+            self._conocidas.discard(id_camara)
+            self._publicar()
+
+    def umbral(self, id_camara, tipo_anomalia):
+        """Devuelve el umbral que le corresponde a una cámara y un tipo de anomalía."""
+        generales, por_camara, _ = self._vigente
+        umbrales = por_camara.get(id_camara, generales)
+        umbral = umbrales.get(tipo_anomalia)
+        return umbrales[None] if umbral is None else umbral
+
+    def evaluar(self, id_camara, tipo_anomalia, confianza, umbral=None):
+        """Cuenta un candidato y devuelve True si su confianza alcanza el umbral.
+
+        umbral es el que ya resolvió quien llama, para decidir con el mismo valor que
+        usó antes; sin él se busca en la tabla vigente.
+        """
+        if umbral is None:
+            umbral = self.umbral(id_camara, tipo_anomalia)
+        aceptado = confianza >= umbral
+        self._contar(id_camara, tipo_anomalia, 0 if aceptado else 1)
+        return aceptado
+
+    def contar_suprimido(self, id_camara, tipo_anomalia):
+        """Cuenta un candidato que terminó sin alcanzar el umbral (por ejemplo, un movimiento leve)."""
+        self._contar(id_camara, tipo_anomalia, 1)
+
+    def estadisticas(self):
+        """Devuelve por cámara y tipo el umbral, los candidatos y los suprimidos."""
+        return {id_camara: {tipo: {"umbral": self.umbral(id_camara, tipo), "candidatos": n[0], "suprimidos": n[1]}
+                            for tipo, n in tipos.items()}
+                for id_camara, tipos in self._sumar().items()}
+
+    def suprimidos_por_camara(self):
+        """Devuelve por cámara cuántos candidatos suprimieron los umbrales."""
+        return {c: sum(n[1] for n in tipos.values()) for c, tipos in self._sumar().items()}
+
+    def _contar(self, id_camara, tipo_anomalia, suprimido):
+        """Suma un candidato en los contadores del hilo actual, sin candado."""
+        posicion = self._vigente[2].get(id_camara, _SIN_POSICIONES).get(tipo_anomalia)
+        if posicion is None:
+            posicion = self._reservar(id_camara, tipo_anomalia)
+        contadores = getattr(self._local, "contadores", None)
+        if contadores is None or len(contadores) <= 2 * posicion:
+            contadores = self._crecer_contadores(contadores)
+        contadores[2 * posicion] += 1
+        contadores[2 * posicion + 1] += suprimido
+
+    def _reservar(self, id_camara, tipo_anomalia):
+        """Reserva contadores para una combinación nunca vista y devuelve su posición."""
+        with self._lock:
+            self._conocidas.add(id_camara)
+            self._tipos_vistos.add(tipo_anomalia)
+            self._publicar()
+            return self._vigente[2][id_camara][tipo_anomalia]
+
+    def _crecer_contadores(self, contadores):
+        """Crea o agranda el arreglo de contadores del hilo actual hasta cubrir todas las posiciones."""
+        with self._lock:
+            if contadores is None:
+                contadores = self._local.contadores = array("q")
+                self._contadores.append(contadores)
+            contadores.extend([0] * (2 * self._siguiente_posicion - len(contadores)))
+        return contadores
+
+    def _sumar(self):
+        """Suma los arreglos de todos los hilos: {id_camara: {tipo: (candidatos, suprimidos)}}."""
+        posiciones = self._vigente[2]
+        with self._lock:
+            arreglos = [contadores.tolist() for contadores in self._contadores]
+        totales = [0] * (2 * max((len(a) // 2 for a in arreglos), default=0))
+        for arreglo in arreglos:
+            for i, valor in enumerate(arreglo):
+                totales[i] += valor
+
+        cuentas = {}
+        for id_camara, tipos in posiciones.items():
+            for tipo, posicion in tipos.items():
+                if 2 * posicion < len(totales) and totales[2 * posicion]:
+                    cuentas.setdefault(id_camara, {})[tipo] = (totales[2 * posicion], totales[2 * posicion + 1])
+        return cuentas
+
+    def _publicar(self):
+        """Resuelve las combinaciones y publica la tabla nueva (con el candado tomado)."""
+        generales = dict(self._tipos)
+        generales[None] = self._global
+        por_camara = {}
+        for id_camara, (umbral, por_tipo) in self._camaras.items():
+            # El umbral propio de la cámara pesa más que los generales por tipo
+            umbrales = {None: umbral} if umbral is not None else dict(generales)
+            umbrales.update(por_tipo)
+            por_camara[id_camara] = umbrales
+
+        # Cada cámara conocida tiene contadores para todos los tipos conocidos
+        tipos = self._tipos_vistos.union(self._tipos)
+        for _, por_tipo in self._camaras.values():
+            tipos.update(por_tipo)
+        anteriores = self._vigente[2]
+        posiciones = {}
+        for id_camara in self._conocidas:
+            propias = anteriores.get(id_camara, _SIN_POSICIONES)
+            faltantes = tipos.difference(propias)
+            if faltantes:
+                propias = dict(propias)
+                for tipo in faltantes:
+                    propias[tipo] = self._siguiente_posicion
+                    self._siguiente_posicion += 1
+            posiciones[id_camara] = propias
+        self._vigente = (generales, por_camara, posiciones)
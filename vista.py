@@ -1,8 +1,9 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import cv2
-from PIL import Image, ImageTk
+from tkinter import messagebox
 import datetime
+from tabla_historial import TablaHistorialVirtual
+from panel_alertas import PanelAlertasActivas
+from muro_video import MuroVideo
 
 class SistemaSeguridadVista:
     def __init__(self, root):
@@ -13,8 +14,7 @@ class SistemaSeguridadVista:
         self.root.configure(bg="#f0f0f0")
 
         # Variables de control
-        self.threshold_var = tk.IntVar(value=70)
-        self.video_captures = {}
+        self.threshold_var = tk.IntVar(value=80)
 
         # Título principal
         self.titulo_principal = tk.Label(
@@ -106,9 +106,13 @@ class SistemaSeguridadVista:
         )
         self.frame_camaras.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
         
-        # Crear grid para las cámaras
-        self.frame_grid_camaras = tk.Frame(self.frame_camaras, bg="#f0f0f0")
-        self.frame_grid_camaras.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Muro de video paginado: la grilla se adapta a la cantidad de cámaras
+        self.muro_video = MuroVideo(self.frame_camaras, por_pagina=9,
+                                    al_alternar=lambda id_camara: self.alternar_camara(id_camara))
+        self.muro_video.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.frame_grid_camaras = self.muro_video.frame
+        self.video_captures = self.muro_video.paneles
+        self.botones_camara = self.muro_video.botones  # id_camara -> botón Pausar/Reanudar
         
         # Columna derecha: Alertas
         self.frame_alertas = tk.LabelFrame(
@@ -127,8 +131,11 @@ class SistemaSeguridadVista:
             bg="#f0f0f0"
         ).pack(fill="x", anchor="w", pady=(5, 0))
         
-        self.frame_alertas_activas = tk.Frame(self.frame_alertas, bg="#ffcccc", height=120)
-        self.frame_alertas_activas.pack(fill="x", expand=False, pady=5)
+        # Un número fijo de filas reutilizables; el resto se resume como "N más"
+        self.panel_alertas = PanelAlertasActivas(self.frame_alertas, filas=4,
+                                                 al_revisar=lambda id_alerta: self.marcar_revisada(id_alerta))
+        self.panel_alertas.pack(fill="x", expand=False, pady=5)
+        self.frame_alertas_activas = self.panel_alertas.frame
         
         # Historial de eventos
         tk.Label(
@@ -138,15 +145,10 @@ class SistemaSeguridadVista:
             bg="#f0f0f0"
         ).pack(fill="x", anchor="w", pady=(10, 0))
         
-        # Tabla de historial
-        columns = ("ID", "Fecha/Hora", "Cámara", "Tipo") #esto puede cambiar mas adelante
-        self.history_tree = ttk.Treeview(self.frame_alertas, columns=columns, show="headings", height=10)
-        
-        for col in columns:
-            self.history_tree.heading(col, text=col)
-            self.history_tree.column(col, width=100)
-        
-        self.history_tree.pack(fill="both", expand=True, pady=5)
+        # Tabla de historial virtualizada: solo se crean las filas visibles
+        self.tabla_historial = TablaHistorialVirtual(self.frame_alertas, filas_visibles=10)
+        self.tabla_historial.pack(fill="both", expand=True, pady=5)
+        self.history_tree = self.tabla_historial.tree
         
         # Botón para agregar cámara, esto es mas adorno, dependiendo si se agregaran mas o no 
         self.btn_agregar_camara = tk.Button(
@@ -168,6 +170,10 @@ class SistemaSeguridadVista:
         )
         self.label_fecha_hora.pack(side=tk.LEFT, padx=10)
         
+        # Último aviso de la configuración de cámaras (recargas y errores)
+        self.label_configuracion = tk.Label(self.frame_barra_estado, text="", bg="#d9d9d9")
+        self.label_configuracion.pack(side=tk.RIGHT, padx=10)
+        
         # Actualizar la fecha y hora cada segundo
         self.actualizar_fecha_hora()
         
@@ -185,6 +191,11 @@ class SistemaSeguridadVista:
             fg="red"
         )
 
+    def mostrar_aviso_configuracion(self, mensaje, error):
+        """Muestra en la barra inferior el último aviso del archivo de cámaras."""
+        hora = datetime.datetime.now().strftime('%H:%M:%S')
+        self.label_configuracion.config(text=f"[{hora}] {mensaje}", fg="red" if error else "black")
+
     def mostrar_mensaje(self, titulo, mensaje):
         """Muestra un mensaje emergente."""
         messagebox.showinfo(titulo, mensaje)
@@ -192,66 +203,41 @@ class SistemaSeguridadVista:
     def mostrar_alerta(self, alerta):
         """Muestra una nueva alerta en la interfaz."""
         # Agregar al historial
-        self.history_tree.insert("", "end", values=(
-            alerta["id_alerta"], 
-            alerta["timestamp"].strftime("%H:%M:%S"),
-            f"Cámara {alerta['id_camara'].replace('sim', '')}",
-            alerta["tipo_anomalia"]
-        ))
+        self.agregar_al_historial(alerta)
         
         # Mostrar alerta activa
-        alerta_frame = tk.Frame(self.frame_alertas_activas, bg="#ffcccc", pady=5)
-        alerta_frame.pack(fill="x", padx=5, pady=2)
-        
-        tk.Label(
-            alerta_frame,
-            text=f"¡ALERTA! {alerta['tipo_anomalia']} detectado en Cámara {alerta['id_camara'].replace('sim', '')}",
-            bg="#ffcccc",
-            fg="red",
-            font=("Arial", 10, "bold")
-        ).pack(side=tk.LEFT, padx=5)
-        
-        tk.Button(
-            alerta_frame,
-            text="Revisar",
-            command=lambda a=alerta["id_alerta"], f=alerta_frame: self.revisar_alerta(a, f)
-        ).pack(side=tk.RIGHT, padx=5)
+        self.panel_alertas.agregar(alerta)
 
-    def revisar_alerta(self, id_alerta, frame):
-        """Marca una alerta como revisada y elimina la notificación."""
-        self.marcar_revisada(id_alerta)
-        frame.destroy()
+    def actualizar_alerta(self, alerta):
+        """Refleja en la interfaz una alerta que agrupó otro evento repetido."""
+        self.panel_alertas.actualizar(alerta)
+        self.tabla_historial.refrescar()
 
-    def crear_feed_video(self, id_camara, nombre):
-        """Crea un marco de video para una cámara."""
-        # Obtener el número de cámaras actuales para determinar la posición en el grid
-        num_camaras = len(self.video_captures)
-        fila = num_camaras // 2
-        columna = num_camaras % 2
-        
-        # Crear el frame para la cámara
-        frame = tk.Frame(self.frame_grid_camaras, borderwidth=1, relief="sunken", bg="white")
-        frame.grid(row=fila, column=columna, padx=5, pady=5, sticky="nsew")
-        
-        # Configurar el nombre de la cámara
-        label_nombre = tk.Label(
-            frame, 
-            text=nombre,
-            bg="white",
-            font=("Arial", 9)
-        )
-        label_nombre.pack(anchor="w", padx=5, pady=2)
-        
-        # Panel de video
-        video_panel = tk.Label(frame, width=200, height=150, bg="black")
-        video_panel.pack(padx=5, pady=2)
-        
-        # Guardar referencia al panel de video
-        self.video_captures[id_camara] = video_panel
-        
-        # Configurar el grid para que se expanda correctamente
-        self.frame_grid_camaras.grid_columnconfigure(0, weight=1)
-        self.frame_grid_camaras.grid_columnconfigure(1, weight=1)
+    def agregar_al_historial(self, alerta):
+        """Agrega una alerta a la tabla de historial."""
+        self.tabla_historial.notificar_nueva(alerta)
+
+    def crear_feed_video(self, id_camara, nombre, pausable=True):
+        """Crea un marco de video para una cámara (doble clic lo agranda)."""
+        self.muro_video.agregar(id_camara, nombre, pausable)
+
+    def actualizar_feed_video(self, id_camara, nombre):
+        """Cambia el nombre mostrado de una cámara reconfigurada."""
+        self.muro_video.renombrar(id_camara, nombre)
+
+    def quitar_feed_video(self, id_camara):
+        """Elimina el marco de video de una cámara quitada."""
+        self.muro_video.quitar(id_camara)
+
+    def marcar_camara(self, id_camara, estado):
+        """Refleja en el panel de una cámara si está detenida, desconectada o activa."""
+        panel = self.video_captures.get(id_camara)
+        if estado in ("Detenida", "Desconectada") and panel is not None:
+            panel.configure(image="")
+            panel.imgtk = None
+        boton = self.botones_camara.get(id_camara)
+        if boton is not None:
+            boton.config(text="Reanudar" if estado == "Detenida" else "Pausar")
 
     # Métodos que serán reemplazados por el controlador
     def iniciar_monitoreo(self):
@@ -263,6 +249,9 @@ class SistemaSeguridadVista:
     def aplicar_umbral(self):
         pass
         
+    def alternar_camara(self, id_camara):
+        pass
+        
     def agregar_camara(self):
         pass
         